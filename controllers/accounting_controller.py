@@ -1,20 +1,23 @@
 from sqlalchemy.orm import Session
 from datetime import date
 from models.BankAccount import BankAccount
-from sqlalchemy import text
+from sqlalchemy import text, insert
 import traceback
 from models.account_journal import AccountJournal
 from models.ledger_current import LedgerCurrent
 from models.ledger_history import LedgerHistory
+from controllers.ledger_snapshot_controller import LedgerSnapshotController
+from controllers.sequence_controller import SequenceController, TRANSACTION_REF
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timedelta
 from models.teanant_trans_history import TeanantTransHistory
 from data.common_head_data import common_head_data as commonHeadData
+from utils.sql_profiler import profiled
 
 class AccountingController:
 
     @staticmethod
-    def manage_ledger_current(session: Session, head_id: int, amount: float, drcr_type: str):
+    def manage_ledger_current(session: Session, head_id: int, amount: float, drcr_type: str, trans_date=None):
         try:
             ledger = session.query(LedgerCurrent).filter_by(head_id=head_id).first()
             # print("ledger",ledger)
@@ -29,22 +32,8 @@ class AccountingController:
 
             session.flush()
 
-            # Clear today's ledger history
-            session.query(LedgerHistory).filter(LedgerHistory.ledger_date == date.today()).delete()
-
-            # Re-insert all from ledger_current into ledger_history
-            # all_ledgers = session.query(LedgerHistory).all()
-            # print("all_ledgers",all_ledgers)
-            # if ledger:
-            #     for entry in ledger:
-            #         history = LedgerHistory(
-            #             head_id=entry.head_id,
-            #             amount=entry.amount,
-            #             drcr_type=entry.drcr_type,
-            #             ledger_date=date.today()
-            #         )
-            #     session.add(history)
-            #     session.commit()
+            # ledger_history is written by the end-of-day snapshot
+            LedgerSnapshotController.mark_dirty(head_id, trans_date)
         except Exception as e:
             traceback.print_exc()
             print(f"Error saving ledger current: {str(e)}")
@@ -115,7 +104,7 @@ class AccountingController:
                     session.add(new_journal)
                     session.flush()
 
-                    AccountingController.manage_ledger_current(session, head_id, amount, drcr_type)
+                    AccountingController.manage_ledger_current(session, head_id, amount, drcr_type, trans_date)
 
             return rtn
         except Exception as e:
@@ -125,11 +114,86 @@ class AccountingController:
 
             print(f"Error saving transaction: {str(e)}")
             return 1
-            
-    
+
+    @staticmethod
+    @profiled("AccountingController.post_batch")
+    def post_batch(session: Session, lines: list):
+        """
+        Post all lines of one voucher in a single pass.
+
+        Each line has the same shape as the transaction_info list taken by
+        manage_transaction. Journal rows are bulk inserted, ledger_current
+        deltas are folded per head in memory and each head is touched once.
+        """
+        journal_rows = []
+        head_deltas = {}
+        try:
+            for transaction_info in lines:
+                (
+                    operation_type, action_type, head_id, trans_ref_id, trans_date, amount,
+                    account_id, user, prev_jour_id, col_name, ref_number, drcr_type, remarks
+                ) = transaction_info
+                if action_type != "insert" or trans_ref_id == 0:
+                    continue
+
+                row = {
+                    "head_id": head_id,
+                    "trans_date": trans_date,
+                    "amount": amount,
+                    "entry_by": user,
+                    "transaction_ref": ref_number,
+                    "drcr_type": drcr_type,
+                    "remarks": remarks,
+                    "bill_info_id": None,
+                    "bill_colct_id": None,
+                    "jrnlVocr_ref_id": None,
+                }
+                if col_name:
+                    row[col_name] = trans_ref_id
+                journal_rows.append(row)
+
+                # Keep the net movement per head as dr-positive, plus the side of the
+                # first line so a new ledger_current row is opened the same way
+                # manage_ledger_current would have opened it.
+                signed = Decimal(str(amount)) if drcr_type == "dr" else -Decimal(str(amount))
+                if head_id in head_deltas:
+                    head_deltas[head_id]["net"] += signed
+                else:
+                    head_deltas[head_id] = {"net": signed, "drcr_type": drcr_type}
+                LedgerSnapshotController.mark_dirty(head_id, trans_date)
+
+            if not journal_rows:
+                return 0
+
+            session.execute(insert(AccountJournal), journal_rows)
+
+            ledgers = session.query(LedgerCurrent).filter(LedgerCurrent.head_id.in_(list(head_deltas))).all()
+            ledger_by_head = {int(ledger.head_id): ledger for ledger in ledgers}
+            for head_id, delta in head_deltas.items():
+                ledger = ledger_by_head.get(int(head_id))
+                if not ledger:
+                    net = delta["net"] if delta["drcr_type"] == "dr" else -delta["net"]
+                    session.add(LedgerCurrent(head_id=head_id, amount=net, drcr_type=delta["drcr_type"]))
+                elif ledger.drcr_type == "dr":
+                    ledger.amount += delta["net"]
+                else:
+                    ledger.amount -= delta["net"]
+
+            session.flush()
+            return 0
+        except Exception as e:
+            traceback.print_exc()
+            print(f"Error posting batch: {str(e)}")
+            raise
+
+
+    @staticmethod
+    def head_balance_query(session: Session, head_id: int):
+        return session.query(LedgerCurrent).filter_by(head_id=head_id)
+
     @staticmethod
     def get_head_balance(session: Session, head_id: int):
-        head_balance = session.query(LedgerCurrent).filter_by(head_id=head_id).first()
+        head_balance = AccountingController.head_balance_query(session, head_id).first()
         return head_balance.amount
     
     @staticmethod
@@ -139,11 +203,12 @@ class AccountingController:
     
     @staticmethod
     def getTransRefNumber(session: Session):
-        sql = text('select IFNULL(MAX(transaction_ref),0)+1 AS rtnValue FROM account_journal')
-        refNumber = session.execute(sql).scalar()
-        return refNumber
+        # From the sequence allocator; MAX(transaction_ref)+1 scanned the
+        # journal and gave two terminals posting together the same number
+        return SequenceController.next_value(TRANSACTION_REF)
     
     @staticmethod
+    @profiled("AccountingController.get_trial_balance")
     def get_trial_balance(session: Session, tb_date: str = None):
         trial_balance = []
         print("tb_date",tb_date)
@@ -157,51 +222,38 @@ class AccountingController:
                 ORDER BY acc_head_of_accounts.id
             """)
             result = session.execute(sql)
-            print("result all",result.fetchall())
             trial_balance = result.fetchall()
         
         else:
             # A date was posted
             search_date = datetime.strptime(tb_date, "%Y-%m-%d").date()
 
-            # Try to fetch from ledger_history for exact date
-            sql = text("""
-                SELECT acc_head_of_accounts.head_name, acc_head_of_accounts.id as ref_id,
-                        ledger_history.amount, ledger_history.drcr_type, ledger_history.ledger_date
-                FROM ledger_history
-                INNER JOIN acc_head_of_accounts ON acc_head_of_accounts.id = ledger_history.head_id
-                WHERE ledger_history.ledger_date = :search_date
-                ORDER BY acc_head_of_accounts.id
-            """)
-            result = session.execute(sql, {"search_date": search_date})
-            trial_balance = result.fetchall()
-
-            # If no records found, fallback to last available ledger_dt
-            if not trial_balance:
-                last_date_sql = text("""
-                    SELECT ledger_date FROM ledger_history
-                    WHERE ledger_date < :search_date
-                    GROUP BY ledger_date
-                    ORDER BY ledger_date DESC
-                    LIMIT 1
-                """)
-                last_date_result = session.execute(last_date_sql, {"search_date": search_date}).fetchone()
-                if last_date_result:
-                    last_ledger_date = last_date_result[0]
-                    fallback_sql = text("""
-                        SELECT acc_head_of_accounts.head_name, acc_head_of_accounts.id as ref_id,
-                               ledger_history.amount, ledger_history.drcr_type, ledger_history.ledger_date
-                        FROM ledger_history
-                        INNER JOIN acc_head_of_accounts ON acc_head_of_accounts.id = ledger_history.head_id
-                        WHERE ledger_history.ledger_date = :last_ledger_date
-                        ORDER BY acc_head_of_accounts.id
-                    """)
-                    result = session.execute(fallback_sql, {"last_ledger_date": last_ledger_date})
-                    trial_balance = result.fetchall()
+            # Closing rows are compact (one per head per day it moved), so the
+            # balance as of a date is each head's latest row up to that date.
+            LedgerSnapshotController.ensure_snapshot(search_date)
+            trial_balance = LedgerSnapshotController.get_balances(session, search_date)
 
         return trial_balance
 	
     @staticmethod
+    def ledger_journal_statement(head_id: int, frm_dt: str, to_dt: str):
+        """The head's journal lines in the period, parameters bound."""
+        return text("""SELECT CONCAT(DAY(trans_date),'/',MONTH(trans_date),'/',RIGHT(YEAR(trans_date),2)) AS trans_date,
+			account_journal.remarks AS particulars,
+			account_journal.transaction_ref,account_journal.amount,account_journal.drcr_type
+			FROM account_journal 
+			WHERE (trans_date between :frm_dt AND :to_dt) AND head_id=:head_id
+            """).bindparams(frm_dt=frm_dt, to_dt=to_dt, head_id=head_id)
+
+    @staticmethod
+    def ledger_opening_statement(head_id: int, frm_dt: str):
+        """The head's last closing row before the period, parameters bound."""
+        return text("""select amount,drcr_type from ledger_history 
+			where head_id=:head_id and ledger_date < :frm_dt order by ledger_date desc limit 1""")\
+            .bindparams(frm_dt=frm_dt, head_id=head_id)
+
+    @staticmethod
+    @profiled("AccountingController.get_ledger_balance")
     def get_ledger_balance(session: Session, head_id: int, frm_dt: str, to_dt: str):
 
         # check all arg is not null
@@ -209,19 +261,13 @@ class AccountingController:
         # print("to_dt",to_dt)
         # print("head_id",head_id)
         try:
-            sql = text("""SELECT CONCAT(DAY(trans_date),'/',MONTH(trans_date),'/',RIGHT(YEAR(trans_date),2)) AS trans_date,
-			account_journal.remarks AS particulars,
-			account_journal.transaction_ref,account_journal.amount,account_journal.drcr_type
-			FROM account_journal 
-			WHERE (trans_date between :frm_dt AND :to_dt) AND head_id=:head_id
-            """)
-            result = session.execute(sql, {"frm_dt": frm_dt, "to_dt": to_dt, "head_id": head_id})
+            prev_date = datetime.strptime(str(frm_dt)[:10], "%Y-%m-%d").date() - timedelta(days=1)
+            LedgerSnapshotController.ensure_snapshot(prev_date)
+
+            result = session.execute(AccountingController.ledger_journal_statement(head_id, frm_dt, to_dt))
             ledger_balance = result.fetchall()
 
-            sqlPrevAmount = text("""select amount,drcr_type from ledger_history 
-			where head_id=:head_id and ledger_date < :frm_dt order by ledger_date desc limit 1""")
-            
-            prev_amount_data = session.execute(sqlPrevAmount, {"frm_dt": frm_dt, "head_id": head_id}).fetchone()
+            prev_amount_data = session.execute(AccountingController.ledger_opening_statement(head_id, frm_dt)).fetchone()
             prev_amount = prev_amount_data[0] if prev_amount_data else 0
             prev_drcr_type = prev_amount_data[1] if prev_amount_data else ''
 
@@ -0,0 +1,220 @@
+import calendar
+import traceback
+from collections import defaultdict, namedtuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import and_, exists, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.bill_info import BillInfo
+from models.bill_particular import BillParticular
+from models.billing_fact import BillingFact
+from models.receivable_aging import ReceivableAging
+from models.shop_owner_profile import ShopOwnerProfile
+from models.shop_profile import ShopProfile
+from models.shop_renter_profile import ShopRenterProfile
+from controllers.billing_fact_controller import BillingFactController, particular_head
+from utils.database import get_engine, session_factory
+from utils.sql_profiler import profiled
+
+# Bucket label -> most days past due it holds; the last bucket is open ended
+AGING_BUCKETS = [("Current", 0), ("1-30", 30), ("31-60", 60), ("61-90", 90), ("91-120", 120), ("Over 120", None)]
+AGING_LABELS = [label for label, _ in AGING_BUCKETS]
+
+# Facts committed this long after their updated_at are still picked up by the next refresh
+REFRESH_OVERLAP = timedelta(minutes=10)
+
+BY_TENANT = "tenant"
+BY_OWNER = "owner"
+
+# One summary line: tenant or owner id and name, head (tenant lines only),
+# amounts per AGING_BUCKETS and their total
+AgingRow = namedtuple("AgingRow", "key name head_id buckets total")
+
+
+def bucket_index(days_past_due):
+    for index, (_, limit) in enumerate(AGING_BUCKETS):
+        if limit is None or days_past_due <= limit:
+            return index
+
+
+def due_date(last_pay_date, bill_date, bill_year, bill_month):
+    """The bill's last pay date, else its bill date, else the end of the bill month."""
+    value = last_pay_date or bill_date
+    if value is None:
+        return date(bill_year, bill_month, calendar.monthrange(bill_year, bill_month)[1])
+    return value.date() if isinstance(value, datetime) else value
+
+
+class AgingController:
+    """
+    Receivables aging from open bill particulars.
+
+    receivable_aging keeps the open dues per shop, renter, bill period and
+    head with the date they fell due. refresh() re-walks only the (shop,
+    period)s whose billing_fact rows changed since the last run, so a summary
+    is one ordered pass over the kept items.
+
+    The watermark is the newest billing_fact.updated_at the last run saw,
+    so terminals with different clocks agree on it, and each run re-walks
+    REFRESH_OVERLAP before it to catch facts committed after it was read.
+    """
+
+    @staticmethod
+    def open_items(session: Session, bill_year, bill_month, shop_ids, computed_at):
+        """Item row dicts of the open "Bill" dues of shop_ids for one bill period."""
+        renters = BillingFactController.bill_renters()
+        rows = session.query(
+            BillInfo.shop_id,
+            renters.c.renter_id,
+            BillInfo.last_pay_date,
+            BillInfo.bill_date,
+            BillParticular.bill_particular,
+            func.sum(BillParticular.due_amount),
+        ).join(BillParticular, and_(BillParticular.bill_id == BillInfo.id, BillParticular.bill_type == "Bill"))\
+        .outerjoin(renters, renters.c.bill_info_id == BillInfo.id)\
+        .filter(
+            BillInfo.bill_year == bill_year,
+            BillInfo.bill_month == bill_month,
+            BillInfo.shop_id.in_(shop_ids),
+            BillParticular.due_amount > 0,
+        ).group_by(BillInfo.shop_id, renters.c.renter_id, BillInfo.last_pay_date, BillInfo.bill_date,
+                   BillParticular.bill_particular)\
+        .all()
+
+        allocated = BillingFactController.allocated_renters(session, {row[0] for row in rows if row[1] is None})
+        items = defaultdict(Decimal)
+        for shop_id, renter_id, last_pay_date, bill_date, name, due in rows:
+            if renter_id is None:
+                renter_id = allocated.get(shop_id) or 0
+            key = (shop_id, renter_id, particular_head(name), due_date(last_pay_date, bill_date, bill_year, bill_month))
+            items[key] += Decimal(str(due))
+
+        return [
+            {
+                "shop_id": shop_id, "renter_id": renter_id, "bill_year": bill_year, "bill_month": bill_month,
+                "head_id": head_id, "due_date": due_on, "open_amount": amount, "computed_at": computed_at,
+            }
+            for (shop_id, renter_id, head_id, due_on), amount in items.items()
+        ]
+
+    @staticmethod
+    def walk(session: Session, keys, computed_at):
+        """Replace the items of each (shop_id, bill_year, bill_month) in keys; returns the items written."""
+        shops_by_period = defaultdict(set)
+        for shop_id, bill_year, bill_month in keys:
+            shops_by_period[(bill_year, bill_month)].add(shop_id)
+
+        written = 0
+        for (bill_year, bill_month), shop_ids in sorted(shops_by_period.items()):
+            session.query(ReceivableAging).filter(
+                ReceivableAging.bill_year == bill_year,
+                ReceivableAging.bill_month == bill_month,
+                ReceivableAging.shop_id.in_(shop_ids),
+            ).delete(synchronize_session=False)
+            items = AgingController.open_items(session, bill_year, bill_month, shop_ids, computed_at)
+            if items:
+                session.execute(insert(ReceivableAging), items)
+            written += len(items)
+        return written
+
+    @staticmethod
+    def changed_periods(session: Session, since):
+        """(shop_id, bill_year, bill_month)s to re-walk: billed or paid since `since`, or no longer billed."""
+        keys = set(
+            session.query(BillingFact.shop_id, BillingFact.bill_year, BillingFact.bill_month)
+            .filter(BillingFact.updated_at >= since).distinct().all()
+        )
+        billed = exists().where(
+            BillingFact.shop_id == ReceivableAging.shop_id,
+            BillingFact.bill_year == ReceivableAging.bill_year,
+            BillingFact.bill_month == ReceivableAging.bill_month,
+        )
+        keys.update(
+            session.query(ReceivableAging.shop_id, ReceivableAging.bill_year, ReceivableAging.bill_month)
+            .filter(~billed).distinct().all()
+        )
+        return keys
+
+    @staticmethod
+    @profiled("aging refresh")
+    def refresh(full=False):
+        """
+        Bring receivable_aging up to date and return the items written.
+
+        Without a previous run (or with full) every period with an open due
+        is walked. Runs in its own transaction so a report built afterwards
+        reads committed items.
+        """
+        session = session_factory(bind=get_engine())
+        try:
+            computed_at = session.query(func.max(BillingFact.updated_at)).scalar() or datetime.now()
+            last_run = None if full else session.query(func.max(ReceivableAging.computed_at)).scalar()
+            if last_run is None:
+                session.query(ReceivableAging).delete(synchronize_session=False)
+                keys = session.query(BillingFact.shop_id, BillingFact.bill_year, BillingFact.bill_month)\
+                    .filter(BillingFact.due > 0).distinct().all()
+            else:
+                keys = AgingController.changed_periods(session, last_run - REFRESH_OVERLAP)
+            written = AgingController.walk(session, keys, computed_at)
+            session.commit()
+            return written
+        except IntegrityError:
+            # Another terminal refreshed the same periods first; their items stand
+            session.rollback()
+            return 0
+        except Exception as e:
+            session.rollback()
+            traceback.print_exc()
+            print(f"Error refreshing receivables aging: {str(e)}")
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    @profiled("report aging")
+    def summary(session: Session, as_of=None, by=BY_TENANT):
+        """
+        AgingRows as of a date (default today), per tenant and head or per owner.
+
+        Bills for periods after as_of are left out and the rest are aged by
+        days from their due date to as_of. The amounts are what is open now:
+        payments made after a past as_of are not added back.
+
+        The items are read ordered by tenant or owner, so each line is
+        finished and emitted as soon as the next one starts.
+        """
+        as_of = as_of or date.today()
+        if by == BY_OWNER:
+            key_column, name_column, head_column = ShopOwnerProfile.id, ShopOwnerProfile.ownner_name, None
+        else:
+            key_column, name_column, head_column = ShopRenterProfile.id, ShopRenterProfile.renter_name, ReceivableAging.head_id
+
+        group_columns = [key_column] + ([head_column] if head_column is not None else [])
+        query = session.query(
+            *group_columns, name_column, ReceivableAging.due_date, func.sum(ReceivableAging.open_amount)
+        ).join(ShopProfile, ShopProfile.id == ReceivableAging.shop_id)
+        if by == BY_OWNER:
+            query = query.outerjoin(ShopOwnerProfile, ShopOwnerProfile.id == ShopProfile.shop_owner_id)
+        else:
+            query = query.outerjoin(ShopRenterProfile, ShopRenterProfile.id == ReceivableAging.renter_id)
+        rows = query.filter(
+            ReceivableAging.bill_year * 100 + ReceivableAging.bill_month <= as_of.year * 100 + as_of.month
+        ).group_by(*group_columns, name_column, ReceivableAging.due_date)\
+            .order_by(name_column, *group_columns, ReceivableAging.due_date)\
+            .all()
+
+        lines = []
+        current = None
+        for row in rows:
+            *group, name, due_on, amount = row
+            group = tuple(group)
+            if current is None or current[0] != group:
+                current = (group, name, [Decimal("0")] * len(AGING_BUCKETS))
+                lines.append(current)
+            current[2][bucket_index((as_of - due_on).days)] += Decimal(str(amount or 0))
+
+        return [
+            AgingRow(group[0], name, group[1] if len(group) > 1 else None, buckets, sum(buckets))
+            for group, name, buckets in lines
+        ]
@@ -0,0 +1,402 @@
+import csv
+import traceback
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from models.bill_info import BillInfo
+from models.bill_particular import BillParticular
+from models.shop_allocation import ShopAllocation
+from models.shop_profile import ShopProfile
+from models.teanant_trans_history import TeanantTransHistory
+from models.UtilitySetting import UtilitySetting
+from controllers.accounting_controller import AccountingController
+from utils.session_scope import session_scope
+
+CENT = Decimal("0.01")
+
+# Bill particular -> (debit head, credit head, provision head). Same postings as CreateBillInfoView.
+BILL_PARTICULAR_HEADS = {
+    "House Rent": (6, 21, 0),
+    "Common Areal Maintenance": (28, 29, 0),
+    "Electricity": (7, 23, 27),
+    "Gas": (9, 25, 0),
+    "WASA": (8, 24, 0),
+    "Internet": (10, 26, 0),
+}
+
+# Metered utilities: (particular, tariff head, bill_info opening column, closing column)
+METERED_UTILITIES = [
+    ("Electricity", 7, "elect_op_unit", "elect_closing_unit"),
+    ("WASA", 8, "wasa_op_unit", "wasa_closing_unit"),
+    ("Gas", 9, "gas_op_unit", "gas_closing_unit"),
+]
+
+ELECTRICITY_VAT_RATE = Decimal("0.15")
+ELECTRICITY_DEMAND_CHARGE = Decimal("40.00")
+
+
+def _money(value):
+    return Decimal(str(value or 0)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _period_key(year, month):
+    return year * 12 + month
+
+
+def bill_journal_lines(bill_id, particulars, trans_date, user="1"):
+    """Journal lines for one bill, in the manage_transaction/post_batch list format."""
+    lines = []
+    for name, amount in particulars:
+        dr_head_id, cr_head_id, provision_head_id = BILL_PARTICULAR_HEADS.get(name, (0, 0, 0))
+        lines.append([
+            "+", "insert", dr_head_id, bill_id, trans_date, amount,
+            None, user, None, "bill_info_id", bill_id, "cr", f"Bill Bill Generations for {name}-cr"
+        ])
+        lines.append([
+            "+", "insert", cr_head_id, bill_id, trans_date, amount,
+            None, user, None, "bill_info_id", bill_id, "dr", f"Bill Generations for {name}-dr"
+        ])
+        if name == "Electricity":
+            # Provision for the 15% VAT and the fixed demand charge
+            lines.append([
+                "-", "insert", provision_head_id, bill_id, trans_date, _money(amount) * ELECTRICITY_VAT_RATE,
+                None, user, None, "bill_info_id", bill_id, "cr", "Bill Generations Vat Charge"
+            ])
+            lines.append([
+                "-", "insert", provision_head_id, bill_id, trans_date, ELECTRICITY_DEMAND_CHARGE,
+                None, user, None, "bill_info_id", bill_id, "cr", "Bill Generations Demand Charge"
+            ])
+    return lines
+
+
+def load_readings(path):
+    """
+    Read closing meter units from a CSV with a shop_id or shop_no column and any of
+    elect_closing_unit, gas_closing_unit, wasa_closing_unit.
+    """
+    readings = {}
+    with open(path, newline="", encoding="utf-8-sig") as csv_file:
+        for line_no, row in enumerate(csv.DictReader(csv_file), start=2):
+            row = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+            if row.get("shop_id"):
+                key = ("shop_id", row["shop_id"])
+            elif row.get("shop_no"):
+                key = ("shop_no", row["shop_no"])
+            else:
+                raise ValueError(f"Line {line_no}: shop_id or shop_no is required")
+            reading = {}
+            for _, _, _, closing_column in METERED_UTILITIES:
+                if row.get(closing_column):
+                    reading[closing_column] = Decimal(row[closing_column])
+            readings[key] = reading
+    return readings
+
+
+class ShopBill:
+    """One shop's computed bill, before anything is written."""
+
+    def __init__(self, allocation_id, shop_id, shop_label, renter_profile_id):
+        self.allocation_id = allocation_id
+        self.shop_id = shop_id
+        self.shop_label = shop_label
+        self.renter_profile_id = renter_profile_id
+        self.units = {}
+        self.particulars = []
+        self.prev_due = Decimal("0")
+        # The shop's elect_demand_chrge. CreateBillInfoView adds it to the total
+        # it shows but not to the particulars it saves, so it is not billed
+        # here either; the preview shows it so the two totals can be compared.
+        self.demand_charge = Decimal("0")
+        self.warnings = []
+        self.bill_id = None
+
+    @property
+    def total(self):
+        return sum((p["sub_amount"] for p in self.particulars), Decimal("0"))
+
+
+class BillRunResult:
+    def __init__(self, bill_year, bill_month, dry_run):
+        self.bill_year = bill_year
+        self.bill_month = bill_month
+        self.dry_run = dry_run
+        self.bills = []
+        # (shop_id, shop label, message)
+        self.errors = []
+        self.written = 0
+        self.tariff_version = None
+
+    @property
+    def total_amount(self):
+        return sum((bill.total for bill in self.bills), Decimal("0"))
+
+    @property
+    def total_demand_charge(self):
+        return sum((bill.demand_charge for bill in self.bills), Decimal("0"))
+
+
+class BillRunController:
+    """
+    Month-end bill generation for every active shop allocation.
+
+    Inputs are loaded in a handful of set-based queries, every bill is
+    computed in memory, and the rows are written in chunks with bulk inserts.
+    """
+
+    CHUNK_SIZE = 200
+
+    @staticmethod
+    def load_inputs(session: Session, bill_year: int, bill_month: int):
+        period = _period_key(bill_year, bill_month)
+
+        allocations = (
+            session.query(ShopAllocation, ShopProfile)
+            .outerjoin(ShopProfile, ShopProfile.id == ShopAllocation.shop_profile_id)
+            .filter(ShopAllocation.close_status == 0)
+            .order_by(ShopAllocation.shop_profile_id, ShopAllocation.id)
+            .all()
+        )
+
+        tariffs, tariff_version = UtilitySetting.load_tariffs(session)
+
+        # Latest earlier bill per shop: its closing units are this month's opening units.
+        bill_period = BillInfo.bill_year * 12 + BillInfo.bill_month
+        last_periods = (
+            session.query(BillInfo.shop_id, func.max(bill_period).label("period"))
+            .filter(bill_period < period)
+            .group_by(BillInfo.shop_id)
+            .subquery()
+        )
+        previous_bills = {}
+        for bill in (
+            session.query(BillInfo)
+            .join(last_periods, (last_periods.c.shop_id == BillInfo.shop_id)
+                  & (last_periods.c.period == bill_period))
+            .order_by(BillInfo.id)
+            .all()
+        ):
+            previous_bills[bill.shop_id] = bill
+
+        billed_shops = {
+            shop_id for (shop_id,) in session.query(BillInfo.shop_id)
+            .filter(BillInfo.bill_year == bill_year, BillInfo.bill_month == bill_month)
+            .distinct()
+        }
+
+        prev_dues = dict(
+            session.query(BillInfo.shop_id, func.coalesce(func.sum(BillInfo.prev_due), 0))
+            .group_by(BillInfo.shop_id)
+            .all()
+        )
+
+        return allocations, tariffs, tariff_version, previous_bills, billed_shops, prev_dues
+
+    @staticmethod
+    def compute_bill(allocation, shop, tariffs, previous_bill, prev_due, reading):
+        """Build one ShopBill; raises ValueError for anything that needs fixing first."""
+        if shop is None:
+            raise ValueError("Allocation has no shop profile")
+        if not allocation.renter_profile_id:
+            raise ValueError("Allocation has no renter")
+
+        bill = ShopBill(allocation.id, shop.id, f"{shop.shop_name} - {shop.shop_no}", allocation.renter_profile_id)
+        bill.prev_due = _money(prev_due)
+        bill.demand_charge = _money(shop.elect_demand_chrge)
+
+        if shop.rent_type == "Contractual":
+            if shop.rent_amount is None:
+                raise ValueError("Contractual shop has no rent amount")
+            rent = _money(shop.rent_amount)
+        else:
+            if shop.per_sqr_fit_amt is None or shop.shop_size is None:
+                raise ValueError("Shop has no size or per square feet rate")
+            rent = _money(Decimal(str(shop.per_sqr_fit_amt)) * Decimal(str(shop.shop_size)))
+
+        if reading is None:
+            reading = {}
+            bill.warnings.append("No meter readings, utilities billed at 0 units")
+
+        for name, head_id, opening_column, closing_column in METERED_UTILITIES:
+            opening = Decimal(str(getattr(previous_bill, closing_column, None) or 0))
+            closing = reading.get(closing_column, opening)
+            if closing < opening:
+                raise ValueError(f"{name} closing unit {closing} is below opening unit {opening}")
+            used = closing - opening
+            bill.units[opening_column] = opening
+            bill.units[closing_column] = closing
+
+            tariff = tariffs.get(head_id)
+            unit_price = Decimal(str(tariff["unit_price"])) if tariff else Decimal("0")
+            amount = _money(used * unit_price)
+            bill.particulars.append({
+                "bill_particular": name,
+                "bill_qty": used,
+                "bill_unit": tariff["unit"] if tariff else "UNIT",
+                "bill_rate": _money(amount / used) if used else Decimal("0"),
+                "sub_amount": amount,
+                "vat": _money(tariff["vat"]) if tariff and name == "Electricity" else Decimal("0"),
+                "demand_charge": _money(tariff["demand_charge"]) if tariff and name == "Electricity" else Decimal("0"),
+            })
+
+        for name, amount in (("Internet", _money(shop.internet_bill)), ("House Rent", rent)):
+            bill.particulars.append({
+                "bill_particular": name,
+                "bill_qty": Decimal("1"),
+                "bill_unit": "MONTH",
+                "bill_rate": amount,
+                "sub_amount": amount,
+                "vat": Decimal("0"),
+                "demand_charge": Decimal("0"),
+            })
+        return bill
+
+    @staticmethod
+    def prepare(session: Session, bill_year: int, bill_month: int, readings=None, dry_run=True):
+        """Compute every bill for the period and collect per-shop errors."""
+        readings = readings or {}
+        result = BillRunResult(bill_year, bill_month, dry_run)
+        allocations, tariffs, result.tariff_version, previous_bills, billed_shops, prev_dues = \
+            BillRunController.load_inputs(session, bill_year, bill_month)
+
+        for _, head_id, _, _ in METERED_UTILITIES:
+            if head_id not in tariffs:
+                result.errors.append((None, "All shops", f"No utility setting for head {head_id}, billed at 0"))
+
+        seen_shops = set()
+        for allocation, shop in allocations:
+            shop_id = allocation.shop_profile_id
+            shop_label = f"{shop.shop_name} - {shop.shop_no}" if shop else f"Allocation {allocation.id}"
+            try:
+                if shop_id in seen_shops:
+                    raise ValueError("Shop has more than one active allocation, billed once")
+                seen_shops.add(shop_id)
+                if shop_id in billed_shops:
+                    raise ValueError(f"Already billed for {bill_month}/{bill_year}")
+                if allocation.from_year and allocation.from_month and \
+                        _period_key(allocation.from_year, allocation.from_month) > _period_key(bill_year, bill_month):
+                    raise ValueError("Allocation starts after the bill period")
+
+                reading = readings.get(("shop_id", str(shop_id)))
+                if reading is None and shop is not None:
+                    reading = readings.get(("shop_no", str(shop.shop_no)))
+                bill = BillRunController.compute_bill(
+                    allocation, shop, tariffs, previous_bills.get(shop_id), prev_dues.get(shop_id), reading
+                )
+                result.bills.append(bill)
+            except ValueError as e:
+                result.errors.append((shop_id, shop_label, str(e)))
+        return result
+
+    @staticmethod
+    def write_chunk(session: Session, bills, bill_year, bill_month, bill_date, last_pay_date, user="1",
+                    tariff_version=None):
+        """Bulk insert bills, particulars, tenant history and journal for one chunk."""
+        now = datetime.now()
+        session.execute(insert(BillInfo), [
+            {
+                "shop_id": bill.shop_id,
+                "bill_year": bill_year,
+                "bill_month": bill_month,
+                "bill_date": bill_date,
+                "last_pay_date": last_pay_date,
+                "bill_amount": bill.total,
+                "prev_due": bill.prev_due,
+                "bill_gen_by": user,
+                "bill_gen_at": now,
+                "status": 1,
+                "tariff_version": tariff_version,
+                **bill.units,
+            }
+            for bill in bills
+        ])
+
+        # MySQL has no RETURNING, so read the new ids back through the (shop, period) index.
+        bill_ids = dict(
+            session.query(BillInfo.shop_id, func.max(BillInfo.id))
+            .filter(BillInfo.shop_id.in_([bill.shop_id for bill in bills]),
+                    BillInfo.bill_year == bill_year, BillInfo.bill_month == bill_month)
+            .group_by(BillInfo.shop_id)
+            .all()
+        )
+
+        particular_rows = []
+        history_rows = []
+        journal_lines = []
+        trans_date = bill_date.date() if isinstance(bill_date, datetime) else bill_date
+        for bill in bills:
+            bill.bill_id = bill_ids[bill.shop_id]
+            tenant_amount = Decimal("0")
+            for particular in bill.particulars:
+                particular_rows.append({
+                    **particular,
+                    "bill_id": bill.bill_id,
+                    "paid_amount": 0,
+                    "due_amount": particular["sub_amount"],
+                    "bill_type": "Bill",
+                })
+                name = particular["bill_particular"]
+                tenant_amount += particular["sub_amount"]
+                history_rows.append({
+                    "head_id": BILL_PARTICULAR_HEADS[name][0],
+                    "teanant_id": bill.renter_profile_id,
+                    "bill_info_id": bill.bill_id,
+                    "collect_id": None,
+                    "trans_dt": trans_date,
+                    "trans_amount": particular["sub_amount"],
+                    "crdr_type": "dr",
+                    "closing_amt": str(tenant_amount),
+                    "closing_crdr_type": "dr",
+                    "remarks": f"Bill Generations for {name}-dr",
+                    "entry_user": user,
+                })
+            journal_lines.extend(bill_journal_lines(
+                bill.bill_id,
+                [(p["bill_particular"], p["sub_amount"]) for p in bill.particulars],
+                trans_date,
+                user,
+            ))
+
+        session.execute(insert(BillParticular), particular_rows)
+        session.execute(insert(TeanantTransHistory), history_rows)
+        AccountingController.post_batch(session, journal_lines)
+
+        # Imported here: billing_fact_controller maps particulars with BILL_PARTICULAR_HEADS from this module
+        from controllers.billing_fact_controller import BillingFactController
+        BillingFactController.refresh_periods(session, [(bill.shop_id, bill_year, bill_month) for bill in bills])
+
+    @staticmethod
+    def run(bill_year: int, bill_month: int, bill_date=None, last_pay_date=None, readings=None,
+            dry_run=True, user="1", chunk_size=None):
+        """
+        Compute (and unless dry_run, write) the bills for one month.
+
+        Each chunk commits on its own; a failing chunk is rolled back and its
+        shops are reported as errors while the other chunks still go through.
+        """
+        bill_date = bill_date or date.today()
+        chunk_size = chunk_size or BillRunController.CHUNK_SIZE
+        with session_scope() as session:
+            result = BillRunController.prepare(session, bill_year, bill_month, readings, dry_run)
+            # Detach the computed rows from the read session before writing.
+            session.expunge_all()
+
+        if dry_run:
+            return result
+
+        for start in range(0, len(result.bills), chunk_size):
+            chunk = result.bills[start:start + chunk_size]
+            try:
+                with session_scope() as session:
+                    BillRunController.write_chunk(
+                        session, chunk, bill_year, bill_month, bill_date, last_pay_date, user,
+                        result.tariff_version
+                    )
+                result.written += len(chunk)
+            except Exception as e:
+                traceback.print_exc()
+                message = str(e).splitlines()[0] if str(e) else type(e).__name__
+                for bill in chunk:
+                    bill.bill_id = None
+                    result.errors.append((bill.shop_id, bill.shop_label, f"Not written: {message}"))
+        return result
@@ -0,0 +1,181 @@
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import and_, func, insert, select
+from sqlalchemy.orm import Session
+from models.bill_info import BillInfo
+from models.bill_particular import BillParticular
+from models.billing_fact import BillingFact
+from models.shop_allocation import ShopAllocation
+from models.teanant_trans_history import TeanantTransHistory
+from controllers.bill_run_controller import BILL_PARTICULAR_HEADS
+from utils.sql_profiler import profiled
+
+HOUSE_RENT_HEAD = BILL_PARTICULAR_HEADS["House Rent"][0]
+# Debit head -> bill particular, for labelling fact rows the way the bills name them
+HEAD_PARTICULARS = {dr_head_id: name for name, (dr_head_id, _, _) in BILL_PARTICULAR_HEADS.items()}
+UNMAPPED_HEAD = 0
+# Other spellings found on bills, e.g. the one the collection view checks for
+PARTICULAR_ALIASES = {"Common Area Maintenance": "Common Areal Maintenance"}
+
+
+def particular_head(name):
+    return BILL_PARTICULAR_HEADS.get(PARTICULAR_ALIASES.get(name, name), (UNMAPPED_HEAD, 0, 0))[0]
+
+
+def head_label(head_id, bill_particular=""):
+    """The bill particular a fact row stands for."""
+    return HEAD_PARTICULARS.get(head_id) or bill_particular or "Other"
+
+
+class BillingFactController:
+    """
+    billing_fact: billed, paid and due per (shop, renter, bill period, head).
+    Particulars with no head in BILL_PARTICULAR_HEADS get a row per name.
+
+    Saving a bill or a collection recomputes the facts of the (shop, period)
+    it touched from bill_info and its "Bill" particulars, in the same
+    transaction, so the reports read a few summed rows instead of joining
+    every bill particular. rebuild() backfills from scratch.
+    """
+
+    @staticmethod
+    def bill_renters():
+        """Subquery of (bill_info_id, renter_id): the tenant each bill was posted to in the tenant history."""
+        return select(
+            TeanantTransHistory.bill_info_id,
+            func.max(TeanantTransHistory.teanant_id).label("renter_id"),
+        ).where(TeanantTransHistory.bill_info_id != None, TeanantTransHistory.collect_id == None)\
+        .group_by(TeanantTransHistory.bill_info_id)\
+        .subquery()
+
+    @staticmethod
+    def allocated_renters(session: Session, shop_ids):
+        """{shop_id: renter_id} of the open allocations, for bills without tenant history."""
+        if not shop_ids:
+            return {}
+        return dict(
+            session.query(ShopAllocation.shop_profile_id, func.max(ShopAllocation.renter_profile_id))
+            .filter(ShopAllocation.shop_profile_id.in_(shop_ids), ShopAllocation.close_status == 0)
+            .group_by(ShopAllocation.shop_profile_id)
+            .all()
+        )
+
+    @staticmethod
+    def fact_query(session: Session, *filters):
+        """Bill particular sums per shop, renter, period and particular of the bills matching filters."""
+        renters = BillingFactController.bill_renters()
+        return session.query(
+            BillInfo.shop_id,
+            renters.c.renter_id,
+            BillInfo.bill_year,
+            BillInfo.bill_month,
+            BillParticular.bill_particular,
+            func.sum(BillParticular.sub_amount),
+            func.sum(BillParticular.paid_amount),
+            func.sum(BillParticular.due_amount),
+        ).join(BillParticular, and_(BillParticular.bill_id == BillInfo.id, BillParticular.bill_type == "Bill"))\
+        .outerjoin(renters, renters.c.bill_info_id == BillInfo.id)\
+        .filter(BillInfo.shop_id != None, BillInfo.bill_year != None, BillInfo.bill_month != None, *filters)\
+        .group_by(BillInfo.shop_id, renters.c.renter_id, BillInfo.bill_year, BillInfo.bill_month,
+                  BillParticular.bill_particular)
+
+    @staticmethod
+    def fact_rows(session: Session, *filters):
+        """Fact row dicts aggregated from the bills matching filters."""
+        rows = BillingFactController.fact_query(session, *filters).all()
+
+        allocated = BillingFactController.allocated_renters(session, {row[0] for row in rows if row[1] is None})
+
+        facts = defaultdict(lambda: [Decimal("0"), Decimal("0"), Decimal("0")])
+        for shop_id, renter_id, bill_year, bill_month, name, billed, paid, due in rows:
+            if renter_id is None:
+                renter_id = allocated.get(shop_id) or 0
+            head_id = particular_head(name)
+            particular = "" if head_id != UNMAPPED_HEAD else (name or "")
+            amounts = facts[(shop_id, renter_id, bill_year, bill_month, head_id, particular)]
+            amounts[0] += Decimal(str(billed or 0))
+            amounts[1] += Decimal(str(paid or 0))
+            amounts[2] += Decimal(str(due or 0))
+
+        return [
+            {
+                "shop_id": shop_id, "renter_id": renter_id, "bill_year": bill_year, "bill_month": bill_month,
+                "head_id": head_id, "bill_particular": particular, "billed": billed, "paid": paid, "due": due,
+            }
+            for (shop_id, renter_id, bill_year, bill_month, head_id, particular), (billed, paid, due) in facts.items()
+        ]
+
+    @staticmethod
+    def period_facts(session: Session, bill_year, bill_month, shop_ids):
+        return session.query(BillingFact).filter(
+            BillingFact.bill_year == bill_year,
+            BillingFact.bill_month == bill_month,
+            BillingFact.shop_id.in_(shop_ids),
+        )
+
+    @staticmethod
+    def refresh_periods(session: Session, keys):
+        """Recompute the facts of each (shop_id, bill_year, bill_month) in keys."""
+        shops_by_period = defaultdict(set)
+        for shop_id, bill_year, bill_month in keys:
+            if shop_id is not None and bill_year is not None and bill_month is not None:
+                shops_by_period[(bill_year, bill_month)].add(shop_id)
+
+        # Flush first so pending bill and particular changes are in the sums
+        session.flush()
+        written = 0
+        for (bill_year, bill_month), shop_ids in shops_by_period.items():
+            BillingFactController.period_facts(session, bill_year, bill_month, shop_ids)\
+                .delete(synchronize_session=False)
+            rows = BillingFactController.fact_rows(
+                session,
+                BillInfo.bill_year == bill_year,
+                BillInfo.bill_month == bill_month,
+                BillInfo.shop_id.in_(shop_ids),
+            )
+            if rows:
+                session.execute(insert(BillingFact), rows)
+            written += len(rows)
+        return written
+
+    @staticmethod
+    def bill_periods(session: Session, bill_ids):
+        """(shop_id, bill_year, bill_month) of the given bills."""
+        bill_ids = [bill_id for bill_id in bill_ids if bill_id is not None]
+        if not bill_ids:
+            return []
+        return session.query(BillInfo.shop_id, BillInfo.bill_year, BillInfo.bill_month)\
+            .filter(BillInfo.id.in_(bill_ids)).distinct().all()
+
+    @staticmethod
+    def refresh_bills(session: Session, bill_ids):
+        """Recompute the facts of the shops and periods of the given bills."""
+        return BillingFactController.refresh_periods(session, BillingFactController.bill_periods(session, bill_ids))
+
+    @staticmethod
+    @profiled("billing fact rebuild")
+    def rebuild(session: Session, bill_year=None, bill_month=None):
+        """
+        Replace the facts of every bill period, or of one year or month, from
+        the bill tables; one grouped query per period. Returns the rows written.
+        """
+        bill_filters, fact_filters = [], []
+        if bill_year is not None:
+            bill_filters.append(BillInfo.bill_year == bill_year)
+            fact_filters.append(BillingFact.bill_year == bill_year)
+        if bill_month is not None:
+            bill_filters.append(BillInfo.bill_month == bill_month)
+            fact_filters.append(BillingFact.bill_month == bill_month)
+
+        session.query(BillingFact).filter(*fact_filters).delete(synchronize_session=False)
+        periods = session.query(BillInfo.bill_year, BillInfo.bill_month)\
+            .filter(BillInfo.bill_year != None, BillInfo.bill_month != None, *bill_filters)\
+            .distinct().all()
+
+        written = 0
+        for year, month in sorted(periods):
+            rows = BillingFactController.fact_rows(session, BillInfo.bill_year == year, BillInfo.bill_month == month)
+            if rows:
+                session.execute(insert(BillingFact), rows)
+            written += len(rows)
+        return written
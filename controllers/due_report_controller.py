@@ -0,0 +1,77 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from models.billing_fact import BillingFact
+from models.shop_allocation import ShopAllocation
+from models.shop_owner_profile import ShopOwnerProfile
+from models.shop_profile import ShopProfile
+from controllers.billing_fact_controller import HOUSE_RENT_HEAD, head_label
+from utils.pivot_report import PivotTable, period_filter
+from utils.sql_profiler import profiled
+
+
+class DueReportController:
+    """
+    Due amounts per shop and bill period, pivoted into month columns with one
+    grouped query over billing_fact.
+    """
+
+    @staticmethod
+    def due_rows_query(session: Session, periods, *filters):
+        """(shop_id, head_id, bill_particular, bill_year, bill_month, due) for the periods window."""
+        return session.query(
+            BillingFact.shop_id,
+            BillingFact.head_id,
+            BillingFact.bill_particular,
+            BillingFact.bill_year,
+            BillingFact.bill_month,
+            func.sum(BillingFact.due),
+        ).filter(*period_filter(BillingFact.bill_year, BillingFact.bill_month, periods), *filters)\
+        .group_by(BillingFact.shop_id, BillingFact.head_id, BillingFact.bill_particular,
+                  BillingFact.bill_year, BillingFact.bill_month)
+
+    @staticmethod
+    def due_rows(session: Session, periods, *filters):
+        return DueReportController.due_rows_query(session, periods, *filters).all()
+
+    @staticmethod
+    def active_shop_ids():
+        return select(ShopAllocation.shop_profile_id).where(ShopAllocation.close_status == 0)
+
+    @staticmethod
+    @profiled("report owner due")
+    def owner_due_pivot(session: Session, periods):
+        """Shops and a PivotTable keyed by (shop_id, bill particular) of positive dues."""
+        shops = session.query(ShopProfile.id, ShopProfile.shop_name, ShopProfile.shop_no).all()
+        rows = DueReportController.due_rows(session, periods, BillingFact.due > 0)
+        return shops, PivotTable.from_rows(periods, rows, row_key=lambda row: (row[0], head_label(row[1], row[2])))
+
+    @staticmethod
+    @profiled("report renter due")
+    def renter_due_pivot(session: Session, periods):
+        """Owners with their active shops and a PivotTable keyed by shop_id of house rent dues."""
+        allocations = session.query(
+            ShopOwnerProfile.id.label("owner_id"),
+            ShopOwnerProfile.ownner_name,
+            ShopProfile.id.label("shop_id"),
+            ShopProfile.shop_name,
+            ShopProfile.shop_no
+        ).join(ShopProfile, ShopProfile.shop_owner_id == ShopOwnerProfile.id)\
+        .filter(ShopProfile.id.in_(DueReportController.active_shop_ids()))\
+        .distinct().all()
+
+        # Structure: {owner_id: {"ownner_name": str, "shops": [(shop_id, "Shop (No)")]}}
+        owner_data = {}
+        for row in allocations:
+            owner = owner_data.setdefault(row.owner_id, {
+                "ownner_name": row.ownner_name,
+                "shops": []
+            })
+            owner["shops"].append((row.shop_id, f"{row.shop_name} ({row.shop_no})"))
+
+        # IN rather than a join so a shop with two open allocations isn't counted twice
+        rows = DueReportController.due_rows(
+            session, periods,
+            BillingFact.head_id == HOUSE_RENT_HEAD,
+            BillingFact.shop_id.in_(DueReportController.active_shop_ids()),
+        )
+        return owner_data, PivotTable.from_rows(periods, rows)
@@ -0,0 +1,257 @@
+import threading
+import traceback
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import case, func, insert, text
+from sqlalchemy.orm import Session
+from models.account_journal import AccountJournal
+from models.ledger_current import LedgerCurrent
+from models.ledger_history import LedgerHistory
+from utils.database import get_engine, session_factory
+
+# head_id -> earliest trans date posted since the last close
+_dirty_heads = {}
+_dirty_lock = threading.Lock()
+
+
+def _as_date(value):
+    """Normalise DATE()/DateTime values coming back from the driver."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+class LedgerSnapshotController:
+    """
+    Keeps ledger_history as one closing row per head per date the head moved.
+
+    Postings only mark their heads dirty. Closing rows are written by
+    close_day (explicitly or lazily from ensure_snapshot) by walking
+    account_journal forward from the last closed balance of each head.
+
+    Each closing row records the account_journal id the snapshot covered, so
+    journal rows past that watermark (posted by another terminal, or before
+    a restart) re-close their day even though this process never saw them.
+    """
+
+    @staticmethod
+    def mark_dirty(head_id, trans_date=None):
+        trans_date = _as_date(trans_date) or date.today()
+        with _dirty_lock:
+            current = _dirty_heads.get(head_id)
+            if current is None or trans_date < current:
+                _dirty_heads[head_id] = trans_date
+
+    @staticmethod
+    def get_last_closed_date(session: Session):
+        return _as_date(session.query(func.max(LedgerHistory.ledger_date)).scalar())
+
+    @staticmethod
+    def get_watermark(session: Session):
+        """Highest account_journal id the closing rows cover."""
+        return int(session.query(func.max(LedgerHistory.journal_id)).scalar() or 0)
+
+    @staticmethod
+    def pending_from(session: Session, watermark=None):
+        """Earliest trans date of the journal rows past the watermark."""
+        if watermark is None:
+            watermark = LedgerSnapshotController.get_watermark(session)
+        return _as_date(
+            session.query(func.min(AccountJournal.trans_date)).filter(AccountJournal.id > watermark).scalar()
+        )
+
+    @staticmethod
+    def close_day(session: Session, ledger_date: date = None):
+        """
+        Write closing rows up to ledger_date (default today) for every head
+        that moved: days after the last close, days with journal rows past
+        the watermark or marked dirty here, and always the current day.
+        """
+        ledger_date = _as_date(ledger_date) or date.today()
+        with _dirty_lock:
+            dirty = dict(_dirty_heads)
+
+        last_closed = LedgerSnapshotController.get_last_closed_date(session)
+        candidates = [
+            last_closed + timedelta(days=1) if last_closed else None,
+            LedgerSnapshotController.pending_from(session),
+            min(dirty.values()) if dirty else None,
+            # Today's rows keep changing, so today is never taken as closed
+            date.today() if ledger_date >= date.today() else None,
+        ]
+        candidates = [candidate for candidate in candidates if candidate is not None]
+        start_date = min(candidates) if candidates else None
+        if start_date is not None and start_date > ledger_date:
+            return 0
+
+        # A back-dated posting invalidates every closed day after it as well.
+        to_date = max(ledger_date, last_closed) if last_closed else ledger_date
+        written = LedgerSnapshotController.backfill(session, start_date, to_date)
+
+        with _dirty_lock:
+            for head_id, trans_date in dirty.items():
+                if _dirty_heads.get(head_id) == trans_date and trans_date <= ledger_date:
+                    del _dirty_heads[head_id]
+        return written
+
+    @staticmethod
+    def backfill(session: Session, from_date: date = None, to_date: date = None):
+        """
+        Rebuild closing rows for [from_date, to_date] from account_journal.
+
+        Existing rows in the range are replaced, so the call is idempotent.
+        Without from_date the whole journal is replayed.
+        """
+        to_date = _as_date(to_date) or date.today()
+        from_date = _as_date(from_date)
+        try:
+            # Start early enough to take in every journal row past the watermark,
+            # or stamping the new rows would mark those as covered.
+            watermark = LedgerSnapshotController.get_watermark(session)
+            if from_date:
+                pending = LedgerSnapshotController.pending_from(session, watermark)
+                if pending is not None and pending < from_date:
+                    from_date = pending
+            # Rows past the watermark dated after the range stay pending
+            journal_id = session.query(func.max(AccountJournal.id)).scalar() or 0
+            later = session.query(func.min(AccountJournal.id)).filter(
+                AccountJournal.id > watermark,
+                AccountJournal.trans_date >= datetime.combine(to_date + timedelta(days=1), datetime.min.time()),
+            ).scalar()
+            if later is not None:
+                journal_id = min(journal_id, later - 1)
+
+            # Opening balance of each head is its last closing row before the range (dr-positive).
+            balances = {}
+            if from_date:
+                last_rows = (
+                    session.query(LedgerHistory.head_id, func.max(LedgerHistory.ledger_date).label("ledger_date"))
+                    .filter(LedgerHistory.ledger_date < datetime.combine(from_date, datetime.min.time()))
+                    .group_by(LedgerHistory.head_id)
+                    .subquery()
+                )
+                opening = (
+                    session.query(LedgerHistory.head_id, LedgerHistory.amount, LedgerHistory.drcr_type)
+                    .join(last_rows, (last_rows.c.head_id == LedgerHistory.head_id)
+                          & (last_rows.c.ledger_date == LedgerHistory.ledger_date))
+                    .all()
+                )
+                for head_id, amount, drcr_type in opening:
+                    amount = Decimal(str(amount or 0))
+                    balances[int(head_id)] = amount if drcr_type == "dr" else -amount
+
+            # Heads keep the side ledger_current has them on.
+            sides = {int(head_id): drcr_type for head_id, drcr_type in
+                     session.query(LedgerCurrent.head_id, LedgerCurrent.drcr_type).all()}
+
+            trans_day = func.date(AccountJournal.trans_date)
+            movements = session.query(
+                AccountJournal.head_id,
+                trans_day.label("trans_day"),
+                func.sum(case((AccountJournal.drcr_type == "dr", AccountJournal.amount), else_=0)).label("dr_amount"),
+                func.sum(case((AccountJournal.drcr_type != "dr", AccountJournal.amount), else_=0)).label("cr_amount"),
+            ).filter(
+                AccountJournal.trans_date < datetime.combine(to_date + timedelta(days=1), datetime.min.time())
+            )
+            if from_date:
+                movements = movements.filter(
+                    AccountJournal.trans_date >= datetime.combine(from_date, datetime.min.time())
+                )
+            movements = movements.group_by(AccountJournal.head_id, trans_day).order_by(trans_day).all()
+
+            rows = []
+            for head_id, trans_day, dr_amount, cr_amount in movements:
+                if head_id is None:
+                    continue
+                head_id = int(head_id)
+                net = balances.get(head_id, Decimal("0")) \
+                    + Decimal(str(dr_amount or 0)) - Decimal(str(cr_amount or 0))
+                balances[head_id] = net
+                side = sides.get(head_id) or ("dr" if net >= 0 else "cr")
+                rows.append({
+                    "head_id": head_id,
+                    "amount": net if side == "dr" else -net,
+                    "drcr_type": side,
+                    "branch_id": 0,
+                    "ledger_date": datetime.combine(_as_date(trans_day), datetime.min.time()),
+                    "journal_id": journal_id,
+                })
+
+            clear = session.query(LedgerHistory).filter(
+                LedgerHistory.ledger_date < datetime.combine(to_date + timedelta(days=1), datetime.min.time())
+            )
+            if from_date:
+                clear = clear.filter(LedgerHistory.ledger_date >= datetime.combine(from_date, datetime.min.time()))
+            clear.delete(synchronize_session=False)
+
+            if rows:
+                session.execute(insert(LedgerHistory), rows)
+            session.flush()
+            return len(rows)
+        except Exception as e:
+            traceback.print_exc()
+            print(f"Error building ledger snapshot: {str(e)}")
+            raise
+
+    @staticmethod
+    def ensure_snapshot(as_of: date):
+        """
+        Lazily close any days up to as_of that have no snapshot yet, or have
+        journal rows newer than their snapshot.
+
+        Runs in its own session and transaction so read-only callers that
+        never commit still keep the closing rows, and the caller's session
+        is left alone.
+        """
+        as_of = _as_date(as_of)
+        with _dirty_lock:
+            earliest_dirty = min(_dirty_heads.values()) if _dirty_heads else None
+        session = session_factory(bind=get_engine())
+        try:
+            last_closed = LedgerSnapshotController.get_last_closed_date(session)
+            last_posted = _as_date(
+                session.query(func.max(AccountJournal.trans_date))
+                .filter(AccountJournal.trans_date < datetime.combine(as_of + timedelta(days=1), datetime.min.time()))
+                .scalar()
+            )
+            pending = LedgerSnapshotController.pending_from(session)
+            stale = (earliest_dirty is not None and earliest_dirty <= as_of) \
+                or (pending is not None and pending <= as_of) \
+                or (as_of >= date.today()) \
+                or (last_posted is not None and (last_closed is None or last_posted > last_closed))
+            if stale:
+                LedgerSnapshotController.close_day(session, as_of)
+                session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def balances_statement(as_of: date):
+        """The balances query of get_balances, parameters bound."""
+        next_date = datetime.combine(_as_date(as_of) + timedelta(days=1), datetime.min.time())
+        return text("""
+            SELECT acc_head_of_accounts.head_name, acc_head_of_accounts.id as ref_id,
+                   ledger_history.amount, ledger_history.drcr_type, ledger_history.ledger_date
+            FROM ledger_history
+            INNER JOIN (
+                SELECT head_id, MAX(ledger_date) AS ledger_date
+                FROM ledger_history
+                WHERE ledger_date < :next_date
+                GROUP BY head_id
+            ) last_close ON last_close.head_id = ledger_history.head_id
+                        AND last_close.ledger_date = ledger_history.ledger_date
+            INNER JOIN acc_head_of_accounts ON acc_head_of_accounts.id = ledger_history.head_id
+            ORDER BY acc_head_of_accounts.id
+        """).bindparams(next_date=next_date)
+
+    @staticmethod
+    def get_balances(session: Session, as_of: date):
+        """Closing balance of every head as of a date, one row per head."""
+        return session.execute(LedgerSnapshotController.balances_statement(as_of)).fetchall()
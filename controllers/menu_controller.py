@@ -0,0 +1,112 @@
+import threading
+from collections import namedtuple
+from sqlalchemy.orm import Session
+from models.business_role_content import BusinessRoleContent
+from models.url_sub_menu import UrlSubMenu
+from models.url_top_menu import UrlTopMenu
+from utils.database import get_engine, session_factory
+from utils.sql_profiler import profiled
+
+MenuItem = namedtuple("MenuItem", "id sub_menu_name command_name method_name")
+MenuTop = namedtuple("MenuTop", "id menu_name menu_order icon items")
+
+# Every top menu with all its sub menus, shared by all roles
+_full_tree = None
+# role id -> tuple of MenuTop the role may use
+_role_trees = {}
+_lock = threading.Lock()
+
+
+def method_name(command_name):
+    """DashboardView method a sub menu's command_name points at."""
+    return (command_name or "").lower().replace(" ", "_")
+
+
+class MenuController:
+    """
+    Menu tree for the menubar, the dashboard tiles and the permission screen.
+
+    The top and sub menus are read with one joined query and the role's
+    BusinessRoleContent rows with a second; the resulting tree is cached
+    per role until invalidate() is called.
+    """
+
+    @staticmethod
+    def load_tree(session: Session):
+        """Every top menu (menu_order) with its sub menus (sub_menu_order)."""
+        rows = session.query(
+            UrlTopMenu.id, UrlTopMenu.menu_name, UrlTopMenu.menu_order, UrlTopMenu.icon,
+            UrlSubMenu.id, UrlSubMenu.sub_menu_name, UrlSubMenu.command_name
+        ).outerjoin(UrlSubMenu, UrlSubMenu.top_menu_id == UrlTopMenu.id)\
+        .order_by(UrlTopMenu.menu_order, UrlTopMenu.id, UrlSubMenu.sub_menu_order, UrlSubMenu.id)\
+        .all()
+
+        tops = {}
+        for top_id, menu_name, menu_order, icon, sub_id, sub_menu_name, command_name in rows:
+            top = tops.setdefault(top_id, (menu_name, menu_order, icon, []))
+            if sub_id is not None:
+                top[3].append(MenuItem(sub_id, sub_menu_name, command_name, method_name(command_name)))
+        return tuple(
+            MenuTop(top_id, menu_name, menu_order, icon, tuple(items))
+            for top_id, (menu_name, menu_order, icon, items) in tops.items()
+        )
+
+    @staticmethod
+    def allowed_sub_menu_ids(session: Session, role_id):
+        rows = session.query(BusinessRoleContent.sub_menu_id)\
+            .filter(BusinessRoleContent.user_role_id == role_id).all()
+        return {row[0] for row in rows}
+
+    @staticmethod
+    def filter_tree(tree, allowed):
+        """Keep the allowed sub menus and drop top menus left empty."""
+        filtered = []
+        for top in tree:
+            items = tuple(item for item in top.items if item.id in allowed)
+            if items:
+                filtered.append(top._replace(items=items))
+        return tuple(filtered)
+
+    @staticmethod
+    @profiled("menu tree")
+    def menu_tree(role_id=None):
+        """
+        Cached menu tree for a role, or the full tree when role_id is None.
+
+        A role without any BusinessRoleContent rows has not been configured
+        yet and sees the full tree, as every user did before permissions
+        were applied to the menu.
+        """
+        global _full_tree
+        with _lock:
+            if role_id is None and _full_tree is not None:
+                return _full_tree
+            if role_id is not None and role_id in _role_trees:
+                return _role_trees[role_id]
+            full_tree = _full_tree
+
+        session = session_factory(bind=get_engine())
+        try:
+            if full_tree is None:
+                full_tree = MenuController.load_tree(session)
+            allowed = MenuController.allowed_sub_menu_ids(session, role_id) if role_id is not None else None
+        finally:
+            session.close()
+
+        tree = MenuController.filter_tree(full_tree, allowed) if allowed else full_tree
+        with _lock:
+            _full_tree = full_tree
+            if role_id is not None:
+                _role_trees[role_id] = tree
+        return tree
+
+    @staticmethod
+    def invalidate(role_id=None):
+        """Forget one role's tree (after its permissions change), or every cached tree."""
+        global _full_tree
+        with _lock:
+            if role_id is None:
+                _full_tree = None
+                _role_trees.clear()
+            else:
+                _role_trees.pop(role_id, None)
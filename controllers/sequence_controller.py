@@ -0,0 +1,139 @@
+import threading
+import traceback
+from sqlalchemy import Integer, cast, func, select, table, column
+from sqlalchemy.exc import IntegrityError
+from models.sequence_counter import SequenceCounter
+from utils.database import get_engine, session_factory
+
+TRANSACTION_REF = "transaction_ref"
+PURCHASE_NO = "purchase_no"
+DEMAND_NO = "demand_no"
+ISSUE_NO = "issue_no"
+
+# name -> (table, column the numbers end up in, numbers reserved per trip)
+# The table and column seed a new counter from the numbers already used.
+SEQUENCES = {
+    TRANSACTION_REF: ("account_journal", "transaction_ref", 20),
+    PURCHASE_NO: ("product_purchase", "purchase_no", 5),
+    DEMAND_NO: ("demand_product", "demand_no", 5),
+    ISSUE_NO: ("product_issue", "issue_no", 5),
+}
+
+# name -> [next number to hand out, first number past the reserved block]
+_blocks = {}
+_lock = threading.Lock()
+
+
+class SequenceController:
+    """
+    Document numbers from the sequence_counter table.
+
+    Each process reserves a block of numbers with one locked increment of the
+    counter row and hands them out from memory, so two terminals never get
+    the same number and the counter row is only touched once per block.
+    Numbers left in a block when the program exits are not reused, so a
+    sequence can have gaps; it never has duplicates.
+    """
+
+    @staticmethod
+    def seed_value(session, name):
+        """First number after the largest one already stored for the sequence."""
+        table_name, column_name, _ = SEQUENCES[name]
+        source = table(table_name, column(column_name))
+        largest = session.execute(
+            select(func.max(cast(source.c[column_name], Integer)))
+        ).scalar()
+        return int(largest or 0) + 1
+
+    @staticmethod
+    def locked_counter(session, name):
+        """The sequence's counter row locked for update, created from seed_value when missing."""
+        for attempt in range(2):
+            counter = session.query(SequenceCounter)\
+                .filter(SequenceCounter.name == name)\
+                .with_for_update().first()
+            if counter is not None:
+                return counter
+            counter = SequenceCounter(name=name, next_value=SequenceController.seed_value(session, name))
+            session.add(counter)
+            try:
+                session.flush()
+                return counter
+            except IntegrityError:
+                # Another terminal created the row first, lock theirs
+                session.rollback()
+        raise RuntimeError(f"Could not lock the counter of sequence {name}")
+
+    @staticmethod
+    def reserve_block(name, size):
+        """
+        Move the counter past size numbers and return (first, end).
+
+        Runs in its own transaction so the reservation is committed, and the
+        row lock released, before the caller's document is saved.
+        """
+        session = session_factory(bind=get_engine())
+        try:
+            counter = SequenceController.locked_counter(session, name)
+            first = int(counter.next_value)
+            counter.next_value = first + size
+            session.commit()
+            return first, first + size
+        except Exception as e:
+            session.rollback()
+            traceback.print_exc()
+            print(f"Error reserving sequence {name}: {str(e)}")
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def claim(name, value):
+        """
+        Move the sequence past a number typed in by hand so it is not handed
+        out again: the counter row in its own transaction, and this process's
+        reserved block. Numbers another terminal already reserved are beyond
+        reach until it restarts.
+        """
+        value = int(value)
+        session = session_factory(bind=get_engine())
+        try:
+            counter = SequenceController.locked_counter(session, name)
+            if int(counter.next_value) <= value:
+                counter.next_value = value + 1
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            traceback.print_exc()
+            print(f"Error claiming {value} in sequence {name}: {str(e)}")
+            raise
+        finally:
+            session.close()
+
+        with _lock:
+            block = _blocks.get(name)
+            if block is not None and block[0] <= value:
+                block[0] = value + 1
+
+    @staticmethod
+    def next_value(name):
+        """Next number of a sequence, reserving a new block when this process has used its last one."""
+        with _lock:
+            block = _blocks.get(name)
+            if block is None or block[0] >= block[1]:
+                block = list(SequenceController.reserve_block(name, SEQUENCES[name][2]))
+                _blocks[name] = block
+            value = block[0]
+            block[0] += 1
+            return value
+
+    @staticmethod
+    def next_number(name):
+        """next_value as the string stored in the String document number columns."""
+        return str(SequenceController.next_value(name))
+
+    @staticmethod
+    def reset():
+        """Drop this process's reserved blocks, e.g. after switching databases."""
+        with _lock:
+            _blocks.clear()
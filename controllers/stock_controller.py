@@ -0,0 +1,333 @@
+import traceback
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import case, func, insert
+from sqlalchemy.orm import Session
+from models.demand_details import DemandDetails
+from models.demand_product import DemandProduct
+from models.product import Product
+from models.product_issue import ProductIssue
+from models.product_purchase import ProductPurchase
+from models.purchase_details import PurchaseDetails
+from models.stock_balance import StockBalance
+from models.stock_movement import StockMovement
+from models.stock_snapshot import StockSnapshot
+from models.unit import Unit
+from controllers.sequence_controller import SequenceController, ISSUE_NO
+from utils.database import get_engine, session_factory
+from utils.sql_profiler import profiled
+
+SOURCE_PURCHASE = "purchase"
+SOURCE_ISSUE = "issue"
+
+
+def _as_datetime(value):
+    """Start of the day for a date, the value itself for a datetime."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+
+
+def _period(year, month):
+    return year * 100 + month
+
+
+def _next_month(year, month):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _previous_month(year, month):
+    return (year - 1, 12) if month == 1 else (year, month - 1)
+
+
+def _month_start(year, month):
+    return datetime(year, month, 1)
+
+
+class StockController:
+    """
+    Stock on hand from receipts and issues.
+
+    Every movement is a stock_movement row, and stock_balance is adjusted in
+    the same transaction, so the current quantity is one row read.
+    stock_snapshot holds closing quantities per month; stock as of a past
+    date is the last closed month plus that month's movements up to the date.
+    """
+
+    @staticmethod
+    def adjust_balance(session: Session, product_id, qty):
+        updated = session.query(StockBalance)\
+            .filter(StockBalance.product_id == product_id)\
+            .update({StockBalance.qty: StockBalance.qty + qty, StockBalance.updated_at: datetime.now()},
+                    synchronize_session=False)
+        if not updated:
+            session.add(StockBalance(product_id=product_id, qty=qty))
+            session.flush()
+
+    @staticmethod
+    def record_movements(session: Session, source_type, source_id, movement_date, lines):
+        """
+        Replace the movements of one source document with lines [(product_id, qty)].
+
+        qty is positive for receipts and negative for issues. Saving the same
+        document again swaps its old movements out, so edits stay balanced.
+        """
+        StockController.remove_movements(session, source_type, source_id)
+        movement_date = _as_datetime(movement_date or datetime.now())
+
+        totals = defaultdict(int)
+        for product_id, qty in lines:
+            if product_id and qty:
+                totals[int(product_id)] += int(qty)
+        rows = [
+            {
+                "product_id": product_id,
+                "movement_date": movement_date,
+                "qty": qty,
+                "source_type": source_type,
+                "source_id": source_id,
+                "created_at": datetime.now(),
+            }
+            for product_id, qty in totals.items() if qty
+        ]
+        if not rows:
+            return 0
+        session.execute(insert(StockMovement), rows)
+        for row in rows:
+            StockController.adjust_balance(session, row["product_id"], row["qty"])
+        StockController.invalidate_snapshots(session, movement_date)
+        return len(rows)
+
+    @staticmethod
+    def remove_movements(session: Session, source_type, source_id):
+        """Take one source document's movements back out of the balances."""
+        existing = session.query(
+            StockMovement.product_id,
+            func.sum(StockMovement.qty),
+            func.min(StockMovement.movement_date),
+        ).filter(StockMovement.source_type == source_type, StockMovement.source_id == source_id)\
+        .group_by(StockMovement.product_id).all()
+        if not existing:
+            return 0
+        for product_id, qty, _ in existing:
+            StockController.adjust_balance(session, product_id, -int(qty or 0))
+        session.query(StockMovement)\
+            .filter(StockMovement.source_type == source_type, StockMovement.source_id == source_id)\
+            .delete(synchronize_session=False)
+        StockController.invalidate_snapshots(session, min(row[2] for row in existing))
+        return len(existing)
+
+    @staticmethod
+    def record_purchase(session: Session, purchase_id):
+        """Receive an approved purchase into stock."""
+        purchase = session.query(ProductPurchase).get(purchase_id)
+        if purchase is None:
+            return 0
+        lines = session.query(PurchaseDetails.product_id, PurchaseDetails.quantity)\
+            .filter(PurchaseDetails.purchase_id == purchase_id).all()
+        return StockController.record_movements(
+            session, SOURCE_PURCHASE, purchase_id, purchase.purchase_date or purchase.created_at, lines
+        )
+
+    @staticmethod
+    def record_issue(session: Session, issue: ProductIssue):
+        """Issue stock out for a saved ProductIssue row, numbering it if it has no issue_no."""
+        if not issue.issue_no:
+            issue.issue_no = SequenceController.next_number(ISSUE_NO)
+        return StockController.record_movements(
+            session, SOURCE_ISSUE, issue.id, issue.issue_date or issue.created_at,
+            [(issue.product_id, -(issue.qty or 0))]
+        )
+
+    @staticmethod
+    def issue_demand(session: Session, demand_id, issue_date=None):
+        """
+        Issue an approved demand's products to its shop: one ProductIssue per
+        demand line under a shared issue_no, each moved out of stock.
+
+        A demand that already has issues is left as it is.
+        """
+        demand = session.query(DemandProduct).get(demand_id)
+        if demand is None:
+            return []
+        if session.query(ProductIssue.id).filter(ProductIssue.demand_id == demand_id).first():
+            return []
+        lines = session.query(DemandDetails.product_id, DemandDetails.quantity)\
+            .filter(DemandDetails.demand_id == demand_id).all()
+        lines = [(product_id, qty) for product_id, qty in lines if product_id and qty]
+        if not lines:
+            return []
+
+        issue_no = SequenceController.next_number(ISSUE_NO)
+        issue_date = issue_date or datetime.now()
+        issues = []
+        for product_id, qty in lines:
+            issue = ProductIssue(
+                product_id=product_id, demand_id=demand_id, shop_id=demand.shop_id,
+                qty=qty, issue_date=issue_date, issue_no=issue_no,
+            )
+            session.add(issue)
+            session.flush()
+            StockController.record_issue(session, issue)
+            issues.append(issue)
+        return issues
+
+    @staticmethod
+    def cancel_demand_issues(session: Session, demand_id):
+        """Put a demand's issued products back into stock and delete its issues."""
+        issues = session.query(ProductIssue).filter(ProductIssue.demand_id == demand_id).all()
+        for issue in issues:
+            StockController.remove_movements(session, SOURCE_ISSUE, issue.id)
+            session.delete(issue)
+        return len(issues)
+
+    # Monthly snapshots
+
+    @staticmethod
+    def invalidate_snapshots(session: Session, movement_date):
+        """A movement dated into a closed month reopens that month and every later one."""
+        movement_date = _as_datetime(movement_date)
+        period = _period(movement_date.year, movement_date.month)
+        session.query(StockSnapshot)\
+            .filter(StockSnapshot.snapshot_year * 100 + StockSnapshot.snapshot_month >= period)\
+            .delete(synchronize_session=False)
+
+    @staticmethod
+    def last_closed_period(session: Session, up_to=None):
+        """(year, month) of the last snapshot, optionally no later than up_to."""
+        query = session.query(func.max(StockSnapshot.snapshot_year * 100 + StockSnapshot.snapshot_month))
+        if up_to is not None:
+            query = query.filter(StockSnapshot.snapshot_year * 100 + StockSnapshot.snapshot_month <= _period(*up_to))
+        period = query.scalar()
+        return divmod(int(period), 100) if period else None
+
+    @staticmethod
+    def close_months(session: Session, year, month):
+        """Write closing rows for every month after the last snapshot up to (year, month)."""
+        try:
+            last = StockController.last_closed_period(session)
+            balances = {}
+            if last:
+                if _period(*last) >= _period(year, month):
+                    return 0
+                balances = dict(session.query(StockSnapshot.product_id, StockSnapshot.closing_qty)
+                                .filter(StockSnapshot.snapshot_year == last[0], StockSnapshot.snapshot_month == last[1])
+                                .all())
+                current = _next_month(*last)
+            else:
+                first_date = session.query(func.min(StockMovement.movement_date)).scalar()
+                if first_date is None:
+                    return 0
+                first_date = _as_datetime(first_date)
+                current = (first_date.year, first_date.month)
+
+            written = 0
+            while _period(*current) <= _period(year, month):
+                following = _next_month(*current)
+                sums = session.query(StockMovement.product_id, func.sum(StockMovement.qty))\
+                    .filter(StockMovement.movement_date >= _month_start(*current),
+                            StockMovement.movement_date < _month_start(*following))\
+                    .group_by(StockMovement.product_id).all()
+                for product_id, qty in sums:
+                    balances[product_id] = balances.get(product_id, 0) + int(qty or 0)
+                rows = [
+                    {"product_id": product_id, "snapshot_year": current[0],
+                     "snapshot_month": current[1], "closing_qty": qty}
+                    for product_id, qty in balances.items()
+                ]
+                if rows:
+                    session.execute(insert(StockSnapshot), rows)
+                    written += len(rows)
+                current = following
+            session.flush()
+            return written
+        except Exception as e:
+            traceback.print_exc()
+            print(f"Error closing stock months: {str(e)}")
+            raise
+
+    @staticmethod
+    def ensure_snapshots(as_of):
+        """
+        Close every month before the one as_of falls in.
+
+        Runs in its own session and transaction so read-only callers keep
+        the rows and the caller's session is left alone.
+        """
+        as_of = _as_datetime(as_of)
+        session = session_factory(bind=get_engine())
+        try:
+            StockController.close_months(session, *_previous_month(as_of.year, as_of.month))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    # Queries
+
+    @staticmethod
+    def current_balances(session: Session):
+        return dict(session.query(StockBalance.product_id, StockBalance.qty).all())
+
+    @staticmethod
+    def stock_as_of(session: Session, as_of):
+        """
+        {product_id: qty} at the end of as_of.
+
+        The last snapshot before as_of's month gives the opening quantity and
+        only the movements after it are summed, never the whole history.
+        """
+        as_of = _as_datetime(as_of)
+        next_day = as_of + timedelta(days=1)
+        later = session.query(StockMovement.id).filter(StockMovement.movement_date >= next_day).first()
+        if later is None:
+            # Nothing dated after as_of, so stock_balance is the answer
+            return StockController.current_balances(session)
+
+        balances = {}
+        last = StockController.last_closed_period(session, up_to=_previous_month(as_of.year, as_of.month))
+        delta = session.query(StockMovement.product_id, func.sum(StockMovement.qty))\
+            .filter(StockMovement.movement_date < next_day)
+        if last:
+            balances = dict(session.query(StockSnapshot.product_id, StockSnapshot.closing_qty)
+                            .filter(StockSnapshot.snapshot_year == last[0], StockSnapshot.snapshot_month == last[1])
+                            .all())
+            delta = delta.filter(StockMovement.movement_date >= _month_start(*_next_month(*last)))
+        for product_id, qty in delta.group_by(StockMovement.product_id).all():
+            balances[product_id] = balances.get(product_id, 0) + int(qty or 0)
+        return balances
+
+    @staticmethod
+    @profiled("report stock")
+    def stock_report(session: Session, from_date, to_date):
+        """
+        (product_id, product, unit, opening, received, issued, closing) per product
+        that had stock or moved in [from_date, to_date].
+        """
+        from_date, to_date = _as_datetime(from_date), _as_datetime(to_date)
+        opening = StockController.stock_as_of(session, from_date - timedelta(days=1))
+        closing = StockController.stock_as_of(session, to_date)
+        moved = {
+            product_id: (int(received or 0), int(issued or 0))
+            for product_id, received, issued in session.query(
+                StockMovement.product_id,
+                func.sum(case((StockMovement.qty > 0, StockMovement.qty), else_=0)),
+                func.sum(case((StockMovement.qty < 0, -StockMovement.qty), else_=0)),
+            ).filter(StockMovement.movement_date >= from_date,
+                     StockMovement.movement_date < to_date + timedelta(days=1))
+            .group_by(StockMovement.product_id).all()
+        }
+
+        products = session.query(Product.id, Product.name, Unit.unit_name)\
+            .outerjoin(Unit, Unit.id == Product.unit_id).order_by(Product.name).all()
+        rows = []
+        for product_id, name, unit_name in products:
+            received, issued = moved.get(product_id, (0, 0))
+            start, end = opening.get(product_id, 0), closing.get(product_id, 0)
+            if start or received or issued or end:
+                rows.append((product_id, name, unit_name or "", start, received, issued, end))
+        return rows
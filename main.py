@@ -2,6 +2,7 @@ import ttkbootstrap as ttk # type: ignore
 from views.login_view import LoginView
 from views.dashboard_view import DashboardView
 from utils.database import setup_database, Session
+from utils import reference_data
 
 
 class App:
@@ -55,10 +56,16 @@ class App:
     def on_login(self, user=None):
         """Handle successful login."""
         # print(f"Login successful for user: {user}")
+        try:
+            reference_data.load_reference_data()
+        except Exception as e:
+            # Forms load what they need on first use instead
+            print(f"Error loading reference data: {e}")
         self.show_dashboard(user)
     
     def on_logout(self):
         """Handle logout."""
+        reference_data.clear()
         self.show_login()
     
     def run(self):
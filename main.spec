@@ -1,12 +1,17 @@
 # -*- mode: python ; coding: utf-8 -*-
+import sys
 
+# Dashboard views are imported by name when first opened (utils/view_registry.py),
+# so PyInstaller has to be told about them.
+sys.path.insert(0, SPECPATH)
+from utils.view_registry import view_modules
 
 a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    hiddenimports=view_modules(),
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
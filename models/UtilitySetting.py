@@ -1,7 +1,13 @@
+import hashlib
+import threading
 from .base import Base
-from sqlalchemy import Column, Integer, String, DECIMAL
+from sqlalchemy import Column, Integer, String, DECIMAL, event
 from utils.database import Session
 
+# releted_head_id -> tariff dict, loaded in one query and kept until a setting is written
+_tariff_cache = {"tariffs": None, "version": None, "generation": 0}
+_tariff_lock = threading.Lock()
+
 class UtilitySetting(Base):
     __tablename__ = 'utility_setting'
     
@@ -39,20 +45,74 @@ class UtilitySetting(Base):
             session.close()
 
     @staticmethod
-    def get_unit_price(head_id):
-        session = Session()
+    def load_tariffs(session=None):
+        """
+        All tariffs keyed by releted_head_id plus a version stamp of their contents.
+
+        The first setting per head (lowest id) wins, like the filter_by(...).first()
+        lookups this replaces. Served from memory until invalidate_tariffs().
+        """
+        with _tariff_lock:
+            if _tariff_cache["tariffs"] is not None:
+                return _tariff_cache["tariffs"], _tariff_cache["version"]
+            generation = _tariff_cache["generation"]
+
+        own_session = session is None
+        session = session or Session()
         try:
-            utility_setting = session.query(UtilitySetting).filter_by(releted_head_id=head_id).first()
-            if utility_setting:
-                return {
-                    "unit_price": float(utility_setting.utility_rate),
-                    "unit": utility_setting.utility_unit,
-                    "vat": float(utility_setting.vat),
-                    "demand_charge": float(utility_setting.demand_charge)
+            tariffs = {}
+            for setting in session.query(UtilitySetting).order_by(UtilitySetting.id).all():
+                if setting.releted_head_id is None or setting.releted_head_id in tariffs:
+                    continue
+                tariffs[setting.releted_head_id] = {
+                    "id": setting.id,
+                    "unit_price": float(setting.utility_rate or 0),
+                    "unit": setting.utility_unit,
+                    "vat": float(setting.vat or 0),
+                    "demand_charge": float(setting.demand_charge or 0)
                 }
+        finally:
+            if own_session:
+                session.close()
+
+        # Same tariffs give the same stamp in every process, so bills can be traced back.
+        digest = hashlib.sha1(repr(sorted(
+            (head_id, t["unit_price"], t["unit"], t["vat"], t["demand_charge"]) for head_id, t in tariffs.items()
+        )).encode("utf-8")).hexdigest()[:12]
+
+        with _tariff_lock:
+            # Don't cache a load that raced with a write.
+            if _tariff_cache["generation"] == generation:
+                _tariff_cache["tariffs"] = tariffs
+                _tariff_cache["version"] = digest
+        return tariffs, digest
+
+    @staticmethod
+    def get_tariff_version():
+        return UtilitySetting.load_tariffs()[1]
+
+    @staticmethod
+    def invalidate_tariffs():
+        with _tariff_lock:
+            _tariff_cache["tariffs"] = None
+            _tariff_cache["version"] = None
+            _tariff_cache["generation"] += 1
+
+    @staticmethod
+    def get_unit_price(head_id):
+        try:
+            tariffs, _ = UtilitySetting.load_tariffs()
+            tariff = tariffs.get(head_id)
+            if tariff:
+                return dict(tariff)
             return {"unit_price": 0.0, "unit": "", "vat": 0.0, "demand_charge": 0.0}
         except Exception as e:
             print(f"Error getting unit price: {str(e)}")
             return {"unit_price": 0.0, "unit": "", "vat": 0.0, "demand_charge": 0.0}
-        finally:
-            session.close()
\ No newline at end of file
+
+
+@event.listens_for(UtilitySetting, "after_insert")
+@event.listens_for(UtilitySetting, "after_update")
+@event.listens_for(UtilitySetting, "after_delete")
+def _invalidate_tariffs_on_write(mapper, connection, target):
+    UtilitySetting.invalidate_tariffs()
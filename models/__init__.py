@@ -23,6 +23,13 @@ from .product_purchase import ProductPurchase
 from .purchase_details import PurchaseDetails
 from .demand_product import DemandProduct
 from .demand_details import DemandDetails
+from .product_issue import ProductIssue
+from .stock_movement import StockMovement
+from .stock_balance import StockBalance
+from .stock_snapshot import StockSnapshot
+from .sequence_counter import SequenceCounter
+from .billing_fact import BillingFact
+from .receivable_aging import ReceivableAging
 from .acc_head_of_accounts import AccHeadOfAccounts
 
 from .teanant_trans_history import TeanantTransHistory
@@ -54,6 +61,13 @@ __all__ = [
     'PurchaseDetails',
     'DemandProduct',
     'DemandDetails',
+    'ProductIssue',
+    'StockMovement',
+    'StockBalance',
+    'StockSnapshot',
+    'SequenceCounter',
+    'BillingFact',
+    'ReceivableAging',
     'AccHeadOfAccounts',
     'TeanantTransHistory',
     'Unit'
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey, Index
 from .base import Base
 
 class AccountJournal(Base):
     __tablename__ = 'account_journal'
+    __table_args__ = (
+        Index('ix_account_journal_head_date', 'head_id', 'trans_date'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     head_id = Column(Integer)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey, Index
 from .base import Base
 from sqlalchemy.orm import relationship
 from utils.database import Session
 
 class BillInfo(Base):
     __tablename__ = 'bill_info'
+    __table_args__ = (
+        Index('ix_bill_info_shop_period', 'shop_id', 'bill_year', 'bill_month'),
+        Index('ix_bill_info_period', 'bill_year', 'bill_month'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     # shop_id = Column(Integer, nullable=True)
@@ -27,6 +31,7 @@ class BillInfo(Base):
     bill_gen_by = Column(String(20), nullable=True)
     bill_gen_at = Column(DateTime, nullable=True)
     status = Column(Integer, nullable=True)
+    tariff_version = Column(String(16), nullable=True)
     
     
     # shop = relationship("ShopProfile", back_populates="bills")
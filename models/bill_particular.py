@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey, Index
 from .base import Base
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import Session
 class BillParticular(Base):
     __tablename__ = 'bill_particular'
+    __table_args__ = (
+        Index('ix_bill_particular_bill_type', 'bill_id', 'bill_type'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     # bill_id = Column(Integer, nullable=True)
@@ -23,10 +26,13 @@ class BillParticular(Base):
 
 
     @staticmethod
-    def get_bill_particular_by_bill_id(session: Session, bill_id: int):
+    def bill_particular_query(session: Session, bill_id: int):
         return session.query(BillParticular) \
-            .filter(BillParticular.bill_id == bill_id, BillParticular.bill_type == "Bill") \
-            .all()
+            .filter(BillParticular.bill_id == bill_id, BillParticular.bill_type == "Bill")
+
+    @staticmethod
+    def get_bill_particular_by_bill_id(session: Session, bill_id: int):
+        return BillParticular.bill_particular_query(session, bill_id).all()
     
     @staticmethod
     def get_bill_particular_by_bill_collection_id(session: Session, bill_collection_id: int):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -6,6 +6,9 @@ from utils.database import Session
 
 class BillParticularDraft(Base):
     __tablename__ = 'bill_particular_draft'
+    __table_args__ = (
+        Index('ix_bill_particular_draft_shop_period', 'shop_id', 'bill_month', 'bill_year'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     shop_id = Column(Integer, nullable=True)
@@ -38,15 +41,16 @@ class BillParticularDraft(Base):
         finally:
             session.close()
 
+    @staticmethod
+    def draft_query(session, shop_id, bill_month, bill_year):
+        return session.query(BillParticularDraft)\
+            .filter_by(shop_id=shop_id, bill_month=bill_month, bill_year=bill_year)
+
     @staticmethod
     def get_bill_particular_draft_by_shop_id(shop_id, bill_month, bill_year, session):
         # session = Session()
         try:
-            return (
-                session.query(BillParticularDraft)
-                .filter_by(shop_id=shop_id, bill_month=bill_month, bill_year=bill_year)
-                .all()
-            )
+            return BillParticularDraft.draft_query(session, shop_id, bill_month, bill_year).all()
         finally:
             print("Inserted")
             # session.close()
@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, Index
+from .base import Base
+
+
+class BillingFact(Base):
+    """Billed, paid and due amounts per shop, renter, bill period and head of account."""
+    __tablename__ = 'billing_fact'
+    __table_args__ = (
+        Index('ix_billing_fact_period', 'bill_year', 'bill_month'),
+        Index('ix_billing_fact_renter_period', 'renter_id', 'bill_year', 'bill_month'),
+    )
+
+    shop_id = Column(Integer, primary_key=True, autoincrement=False)
+    # 0 when the bill has no renter on record
+    renter_id = Column(Integer, primary_key=True, autoincrement=False)
+    bill_year = Column(Integer, primary_key=True, autoincrement=False)
+    bill_month = Column(Integer, primary_key=True, autoincrement=False)
+    # Receivable (debit) head of the bill particular, 0 for unmapped particulars
+    head_id = Column(Integer, primary_key=True, autoincrement=False)
+    # The bill particular for rows on head 0, so unmapped items keep their names; empty otherwise
+    bill_particular = Column(String(200), primary_key=True, default="")
+    billed = Column(DECIMAL(12, 2), nullable=False, default=0)
+    paid = Column(DECIMAL(12, 2), nullable=False, default=0)
+    due = Column(DECIMAL(12, 2), nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from utils.database import Base
 from datetime import datetime
 
 class DemandProduct(Base):
     __tablename__ = "demand_product"
+    __table_args__ = (
+        Index('ix_demand_product_date_id', 'demand_date', 'id'),
+    )
     id = Column(Integer, primary_key=True)
     demand_date = Column(DateTime, default=datetime.now)
     demand_no = Column(String(50), nullable=True)
@@ -1,11 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey, Index
 from .base import Base
 
 class LedgerCurrent(Base):
     __tablename__ = 'ledger_current'
+    __table_args__ = (
+        Index('ix_ledger_current_head', 'head_id'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     amount = Column(DECIMAL(10,2))
-    head_id = Column(String(50))
+    head_id = Column(Integer)
     branch_id = Column(Integer)
     drcr_type = Column(String(2))
\ No newline at end of file
@@ -1,12 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey, Index
 from .base import Base
 
 class LedgerHistory(Base):
     __tablename__ = 'ledger_history'
+    __table_args__ = (
+        Index('ix_ledger_history_head_date', 'head_id', 'ledger_date'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     amount = Column(DECIMAL(10,2))
-    head_id = Column(String(50))
+    head_id = Column(Integer)
     branch_id = Column(Integer, default=0)
     drcr_type = Column(String(2))
-    ledger_date = Column(DateTime)
\ No newline at end of file
+    ledger_date = Column(DateTime)
+    # Highest account_journal id the snapshot covered when the row was written
+    journal_id = Column(Integer, nullable=True)
\ No newline at end of file
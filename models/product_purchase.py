@@ -1,12 +1,15 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from utils.database import Base
 
 class ProductPurchase(Base):
     __tablename__ = "product_purchase"
+    __table_args__ = (
+        Index('ix_product_purchase_date_id', 'purchase_date', 'id'),
+    )
     id = Column(Integer, primary_key=True)
-    demand_id = Column(Integer, ForeignKey("demand.id"), nullable=True)
+    demand_id = Column(Integer, ForeignKey("demand_product.id"), nullable=True)
     purchase_date = Column(DateTime, nullable=True)
     purchase_no = Column(String(50), nullable=True)
     shop_id = Column(Integer, ForeignKey("shop_profile.id"), nullable=True)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Date, DateTime, DECIMAL, Index
+from .base import Base
+
+
+class ReceivableAging(Base):
+    """Open bill dues per shop, renter, bill period and head with the date they fell due."""
+    __tablename__ = 'receivable_aging'
+    __table_args__ = (
+        Index('ix_receivable_aging_item', 'shop_id', 'bill_year', 'bill_month', 'renter_id', 'head_id', 'due_date',
+              unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    shop_id = Column(Integer, nullable=False)
+    renter_id = Column(Integer, nullable=False)
+    bill_year = Column(Integer, nullable=False)
+    bill_month = Column(Integer, nullable=False)
+    head_id = Column(Integer, nullable=False)
+    # The bill's last pay date; days past it decide the aging bucket
+    due_date = Column(Date, nullable=False)
+    open_amount = Column(DECIMAL(12, 2), nullable=False, default=0)
+    computed_at = Column(DateTime, nullable=False)
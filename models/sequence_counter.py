@@ -0,0 +1,12 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, DateTime, String
+from .base import Base
+
+
+class SequenceCounter(Base):
+    """Next unreserved number of one document sequence, see controllers/sequence_controller.py."""
+    __tablename__ = 'sequence_counter'
+
+    name = Column(String(50), primary_key=True)
+    next_value = Column(BigInteger, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
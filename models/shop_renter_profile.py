@@ -1,8 +1,9 @@
 from models.shop_allocation import ShopAllocation
 from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from utils.database import Session
+from utils.blob_stream import iter_blob, read_blob
 from .base import Base
 
 class ShopRenterProfile(Base):
@@ -14,14 +15,16 @@ class ShopRenterProfile(Base):
     email = Column(String(50), nullable=True)
     address = Column(String(255), nullable=True)
     nid_number = Column(String(20), nullable=True)
-    nid_front = Column(LargeBinary, nullable=True)
-    nid_back = Column(LargeBinary, nullable=True)
+    # Scans are not read by renter queries; use get_document()/iter_document()
+    # or options(undefer_group("documents")).
+    nid_front = deferred(Column(LargeBinary, nullable=True), group="documents")
+    nid_back = deferred(Column(LargeBinary, nullable=True), group="documents")
     created_by = Column(Integer, nullable=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=True)
     update_by = Column(Integer, nullable=True)
     update_at = Column(DateTime, onupdate=func.now(), nullable=True)
     active_status = Column(Integer, default=1, nullable=True)  # 1 = active
-    documents = Column(LargeBinary, nullable=True)
+    documents = deferred(Column(LargeBinary, nullable=True), group="documents")
 
     # Relationships
     # allocations = relationship("ShopAllocation", back_populates="renter_profile")
@@ -31,6 +34,24 @@ class ShopRenterProfile(Base):
 
     @staticmethod
     def get_tenants(session):
-        """Get all tenants."""
-        tenants = session.query(ShopRenterProfile).select_from(ShopRenterProfile).join(ShopAllocation, ShopRenterProfile.id == ShopAllocation.renter_profile_id).all()
-        return tenants  
+        """Get (id, renter_name) of every renter with an allocation."""
+        tenants = session.query(ShopRenterProfile.id, ShopRenterProfile.renter_name)\
+            .join(ShopAllocation, ShopRenterProfile.id == ShopAllocation.renter_profile_id)\
+            .distinct().all()
+        return tenants
+
+    @staticmethod
+    def get_document(session, renter_id, name):
+        """Bytes of one scan ("nid_front", "nid_back" or "documents"), or None."""
+        return read_blob(session, ShopRenterProfile.document_column(name), renter_id)
+
+    @staticmethod
+    def iter_document(session, renter_id, name):
+        """Stream one scan in chunks, e.g. straight into a file."""
+        return iter_blob(session, ShopRenterProfile.document_column(name), renter_id)
+
+    @staticmethod
+    def document_column(name):
+        if name not in ("nid_front", "nid_back", "documents"):
+            raise ValueError(f"Unknown renter document: {name}")
+        return getattr(ShopRenterProfile, name)
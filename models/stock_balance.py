@@ -0,0 +1,12 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime
+from .base import Base
+
+
+class StockBalance(Base):
+    """Current quantity on hand per product, kept in step with stock_movement."""
+    __tablename__ = 'stock_balance'
+
+    product_id = Column(Integer, primary_key=True, autoincrement=False)
+    qty = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
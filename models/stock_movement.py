@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from .base import Base
+
+
+class StockMovement(Base):
+    """One receipt (qty > 0) or issue (qty < 0) of a product, written by StockController."""
+    __tablename__ = 'stock_movement'
+    __table_args__ = (
+        Index('ix_stock_movement_product_date', 'product_id', 'movement_date'),
+        Index('ix_stock_movement_date', 'movement_date'),
+        Index('ix_stock_movement_source', 'source_type', 'source_id'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    product_id = Column(Integer, nullable=False)
+    movement_date = Column(DateTime, nullable=False)
+    qty = Column(Integer, nullable=False)
+    # 'purchase' (product_purchase.id) or 'issue' (product_issue.id)
+    source_type = Column(String(20), nullable=False)
+    source_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Index
+from .base import Base
+
+
+class StockSnapshot(Base):
+    """Closing quantity per product at the end of a month."""
+    __tablename__ = 'stock_snapshot'
+    __table_args__ = (
+        Index('ix_stock_snapshot_period_product', 'snapshot_year', 'snapshot_month', 'product_id', unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    product_id = Column(Integer, nullable=False)
+    snapshot_year = Column(Integer, nullable=False)
+    snapshot_month = Column(Integer, nullable=False)
+    closing_qty = Column(Integer, nullable=False, default=0)
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, ForeignKey, Index
 from .base import Base
 
 class TeanantTransHistory(Base):
     __tablename__ = 'teanant_trans_history'
+    __table_args__ = (
+        Index('ix_teanant_trans_history_tenant_date', 'teanant_id', 'trans_dt'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     head_id = Column(Integer, nullable=True)
@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, LargeBinary, Boolean
-from sqlalchemy.orm import relationship, joinedload
+from sqlalchemy.orm import relationship, joinedload, deferred
 from sqlalchemy.sql import func
 from utils.database import Session
+from utils.blob_stream import read_blob
 from .base import Base
 from datetime import datetime
 
@@ -15,7 +16,11 @@ class User(Base):
     phone = Column(String(20), nullable=False)
     password = Column(String(255), nullable=False)
     role_id = Column(Integer, ForeignKey("user_role.id"), nullable=False)
-    avatar = Column(LargeBinary, nullable=True)
+    # Not read by user queries; use get_avatar() or options(undefer(User.avatar)).
+    avatar = deferred(Column(LargeBinary, nullable=True), group="images")
+    # Made by set_avatar(); the list reads these instead of decoding avatar.
+    avatar_thumb = deferred(Column(LargeBinary, nullable=True), group="thumbnails")
+    avatar_hash = Column(String(12), nullable=True)
     ptext = Column(String(255), nullable=True)
     created_by = Column(Integer, nullable=True)
     update_by = Column(Integer, nullable=True)
@@ -31,6 +36,26 @@ class User(Base):
     def __repr__(self):
         return f"<User(id={self.id}, login_id='{self.login_id}', email='{self.email}', role='{self.get_role_name()}')>"
 
+    def set_avatar(self, avatar_bytes):
+        """Store the avatar together with its list thumbnail and content hash."""
+        # PIL is only needed here, keep it out of every models import
+        from utils.image_uploader import content_hash, make_thumbnail
+
+        self.avatar = avatar_bytes
+        self.avatar_thumb = None
+        self.avatar_hash = None
+        if avatar_bytes:
+            try:
+                self.avatar_thumb = make_thumbnail(avatar_bytes)
+            except Exception as e:
+                print(f"Error making avatar thumbnail: {e}")
+            self.avatar_hash = content_hash(avatar_bytes)
+
+    @staticmethod
+    def get_avatar(session, user_id):
+        """Avatar bytes for one user, streamed in chunks, or None."""
+        return read_blob(session, User.avatar, user_id)
+
     def get_role_name(self):
         """
         Get the name of the user's role.
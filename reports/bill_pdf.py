@@ -0,0 +1,257 @@
+import os
+import re
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from fpdf import FPDF
+from sqlalchemy.orm import Session
+from models.bill_info import BillInfo
+from models.bill_particular import BillParticular
+from models.shop_profile import ShopProfile
+
+NOTO_FONT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fonts", "NotoSansBengali-Regular.ttf")
+COMPANY_NAME = "GLOBAL CITY MANAGEMENT"
+COMPANY_ADDRESS = "Bali Arcade, 227, Nawab Serajuddawla Road, Chwakbazar, Chattogram"
+
+# Everything one bill page needs, loaded up front so rendering never queries
+# and a worker process can be handed plain tuples.
+BillParticularLine = namedtuple("BillParticularLine", "bill_particular bill_qty bill_unit bill_rate")
+BillDocument = namedtuple("BillDocument", [
+    "bill_id", "bill_year", "bill_month", "bill_date", "status",
+    "elect_op_unit", "elect_closing_unit", "gas_op_unit", "gas_closing_unit",
+    "prev_due", "bill_amount", "cur_due", "last_pay_date", "pay_amount", "bill_gen_by", "bill_gen_at",
+    "shop_name", "shop_no", "floor_no", "elect_demand_chrge", "rent_amount",
+    "particulars",
+])
+
+_BILL_COLUMNS = (
+    BillInfo.id, BillInfo.bill_year, BillInfo.bill_month, BillInfo.bill_date, BillInfo.status,
+    BillInfo.elect_op_unit, BillInfo.elect_closing_unit, BillInfo.gas_op_unit, BillInfo.gas_closing_unit,
+    BillInfo.prev_due, BillInfo.bill_amount, BillInfo.cur_due, BillInfo.last_pay_date, BillInfo.pay_amount,
+    BillInfo.bill_gen_by, BillInfo.bill_gen_at,
+    ShopProfile.shop_name, ShopProfile.shop_no, ShopProfile.floor_no, ShopProfile.elect_demand_chrge,
+    ShopProfile.rent_amount,
+)
+
+
+def load_bills(session: Session, *filters):
+    """
+    BillDocuments matching filters, with their particulars, from one query.
+
+    Bills are outer joined to their shop and particulars and ordered by bill,
+    so each bill's rows arrive together and are folded into one document.
+    """
+    rows = session.query(
+        *_BILL_COLUMNS,
+        BillParticular.id, BillParticular.bill_particular, BillParticular.bill_qty,
+        BillParticular.bill_unit, BillParticular.bill_rate,
+    ).outerjoin(ShopProfile, ShopProfile.id == BillInfo.shop_id)\
+    .outerjoin(BillParticular, BillParticular.bill_id == BillInfo.id)\
+    .filter(*filters)\
+    .order_by(ShopProfile.shop_no, BillInfo.id, BillParticular.id)\
+    .all()
+
+    bills = []
+    width = len(_BILL_COLUMNS)
+    for row in rows:
+        if not bills or bills[-1].bill_id != row[0]:
+            bills.append(BillDocument(*row[:width], []))
+        if row[width] is not None:
+            bills[-1].particulars.append(BillParticularLine(*row[width + 1:]))
+    return bills
+
+
+def load_month(session: Session, bill_year, bill_month):
+    return load_bills(session, BillInfo.bill_year == bill_year, BillInfo.bill_month == bill_month)
+
+
+def load_bill(session: Session, bill_id):
+    bills = load_bills(session, BillInfo.id == bill_id)
+    return bills[0] if bills else None
+
+
+def bill_filename(bill):
+    """bill_<shop no>_<year>-<month>.pdf, so a month's bill never overwrites an earlier one."""
+    shop_no = re.sub(r"[^\w.-]+", "_", str(bill.shop_no or bill.bill_id))
+    return f"bill_{shop_no}_{bill.bill_year}-{int(bill.bill_month or 0):02d}.pdf"
+
+
+# The Noto entries of the first BillPdf in this process: (fonts, font_files)
+_noto_font = None
+
+
+class BillPdf(FPDF):
+    """
+    A PDF of one or more bills, one page each.
+
+    The company header is drawn by header() on every page. The Noto font is
+    loaded by the first BillPdf of a process; later ones copy its entries,
+    so a worker writing one file per bill loads the font metrics once per
+    process instead of once per bill. Each file still embeds its own subset.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.set_auto_page_break(auto=True, margin=15)
+        self.add_noto_font()
+
+    def add_noto_font(self):
+        global _noto_font
+        if _noto_font is None:
+            self.add_font("Noto", "", NOTO_FONT, uni=True)
+            _noto_font = (
+                {key: dict(entry) for key, entry in self.fonts.items()},
+                {key: dict(entry) for key, entry in self.font_files.items()},
+            )
+            return
+        fonts, font_files = _noto_font
+        # The glyph widths are shared read only; the subset and the object
+        # numbers written by output() are per document
+        for key, entry in fonts.items():
+            self.fonts[key] = dict(entry, subset=list(entry["subset"]))
+        for key, entry in font_files.items():
+            self.font_files[key] = dict(entry)
+
+    def header(self):
+        self.set_font("Noto", "", 16)
+        self.cell(0, 10, COMPANY_NAME, ln=True, align="C")
+        self.set_font("Noto", "", 8)
+        self.cell(0, 5, COMPANY_ADDRESS, ln=True, align="C")
+
+    def add_bill(self, bill):
+        self.add_page()
+
+        left_column = [
+            f"{bill.shop_name}" if bill.shop_name is not None else "Shop Info: N/A",
+            f"Floor {bill.floor_no}, Shop {bill.shop_no}" if bill.shop_name is not None else "",
+            "",
+        ]
+        right_column = [
+            ("Bill Date:", bill.bill_date.strftime("%Y-%m-%d") if bill.bill_date else "N/A"),
+            ("Billing Period:", f"{bill.bill_month}/{bill.bill_year}"),
+            ("Status:", "Paid" if bill.status == 2 else "Pending"),
+        ]
+        for i, (left, (label, value)) in enumerate(zip(left_column, right_column)):
+            # Bold only for first line (shop name)
+            self.set_font("Courier", "B" if i == 0 else "", 10)
+            self.cell(90, 8, left, border=0)
+            self.set_font("Courier", "", 10)
+            self.cell(30, 8, label, border=0)
+            self.cell(70, 8, value, border=0, ln=True)
+
+        self.ln(5)
+        self.set_font("Noto", "", 12)
+        self.cell(0, 10, "Bill Summary", ln=True, align="C")
+        self.set_font("Noto", "", 10)
+
+        def bdt(value):
+            return f"{value:.2f} BDT" if value else "N/A"
+
+        self.summary_row("Bill Date:", bill.bill_date.strftime("%Y-%m-%d") if bill.bill_date else "N/A",
+                         "Billing Period:", f"{bill.bill_month}/{bill.bill_year}")
+        self.summary_row("Status:", "Paid" if bill.status == 2 else "Pending",
+                         "Electricity Op:", bill.elect_op_unit)
+        self.summary_row("Electricity Cl:", bill.elect_closing_unit,
+                         "Demand Charge:", bill.elect_demand_chrge if bill.shop_name is not None else "N/A")
+        self.summary_row("Gas Opening:", bill.gas_op_unit,
+                         "Gas Closing:", bill.gas_closing_unit)
+        self.summary_row("Rent Amount:", bdt(bill.rent_amount), "Previous Due:", bdt(bill.prev_due))
+        self.summary_row("Current Charges:", bdt(bill.bill_amount), "Total Payable:", bdt(bill.cur_due))
+        self.summary_row("Last Pay Date:", bill.last_pay_date.strftime("%Y-%m-%d") if bill.last_pay_date else "N/A",
+                         "Last Pay Amount:", bdt(bill.pay_amount))
+
+        self.set_font("Noto", "", 10)
+        self.set_fill_color(200, 200, 200)
+        self.cell(10, 8, "No", border=1, align="C", fill=True)
+        self.cell(70, 8, "Particular", border=1, align="L", fill=True)
+        self.cell(20, 8, "Qty", border=1, align="C", fill=True)
+        self.cell(30, 8, "Rate (৳)", border=1, align="R", fill=True)
+        self.cell(30, 8, "Subtotal (৳)", border=1, align="R", fill=True)
+        self.ln()
+
+        if bill.particulars:
+            grand_total = 0.0
+            for i, p in enumerate(bill.particulars, start=1):
+                subtotal = float(p.bill_qty or 0) * float(p.bill_rate or 0)
+                self.cell(10, 8, str(i), border=1, align="C")
+                self.cell(70, 8, p.bill_particular or "", border=1)
+                self.cell(20, 8, f"{p.bill_qty} {p.bill_unit}", border=1, align="C")
+                self.cell(30, 8, f"{float(p.bill_rate or 0):.2f}", border=1, align="R")
+                self.cell(30, 8, f"{subtotal:.2f}", border=1, align="R")
+                self.ln()
+                grand_total += subtotal
+
+            self.set_fill_color(230, 230, 230)
+            self.cell(130, 8, "Grand Total", border=1, align="R", fill=True)
+            self.cell(30, 8, f"{grand_total:.2f}", border=1, align="R", fill=True)
+            self.ln()
+        else:
+            self.cell(0, 8, "No particulars found", ln=True)
+
+        self.set_font("Noto", "", 8)
+        self.ln(10)
+        generated_at = bill.bill_gen_at.strftime('%Y-%m-%d %H:%M') if bill.bill_gen_at else 'N/A'
+        self.cell(0, 8, f"Generated by {bill.bill_gen_by} on {generated_at}", ln=True)
+
+    def summary_row(self, label1, value1, label2, value2):
+        self.cell(50, 8, label1, border=0)
+        self.cell(45, 8, str(value1 if value1 is not None else "N/A"), border=0)
+        self.cell(50, 8, label2, border=0)
+        self.cell(45, 8, str(value2 if value2 is not None else "N/A"), border=0)
+        self.ln()
+
+
+def render_combined(bills, path):
+    """Every bill as a page of one PDF."""
+    pdf = BillPdf()
+    for bill in bills:
+        pdf.add_bill(bill)
+    pdf.output(path)
+    return path
+
+
+def render_files(bills, out_dir):
+    """One PDF per bill in out_dir; returns the paths."""
+    paths = []
+    for bill in bills:
+        pdf = BillPdf()
+        pdf.add_bill(bill)
+        path = os.path.join(out_dir, bill_filename(bill))
+        pdf.output(path)
+        paths.append(path)
+    return paths
+
+
+def _render_chunk(bills, out_dir):
+    try:
+        return render_files(bills, out_dir), None
+    except Exception as e:
+        traceback.print_exc()
+        return [], str(e)
+
+
+def render_bills(bills, out_dir, combined_name=None, workers=None):
+    """
+    Render bills into out_dir, as one combined PDF when combined_name is given
+    or as one file per bill spread over a process pool.
+
+    A combined document is built in one process: its pages share one font
+    registration and there is nothing to merge afterwards. Returns (paths, errors).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if combined_name:
+        return [render_combined(bills, os.path.join(out_dir, combined_name))], []
+    if not workers or workers <= 1 or len(bills) <= 1:
+        paths, error = _render_chunk(bills, out_dir)
+        return paths, [error] if error else []
+
+    # Contiguous chunks, a few per worker so a slow chunk doesn't hold the others up
+    chunk_size = max(1, -(-len(bills) // (workers * 4)))
+    chunks = [bills[i:i + chunk_size] for i in range(0, len(bills), chunk_size)]
+    paths, errors = [], []
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        for chunk_paths, error in pool.map(_render_chunk, chunks, [out_dir] * len(chunks)):
+            paths.extend(chunk_paths)
+            if error:
+                errors.append(error)
+    return paths, errors
@@ -0,0 +1,374 @@
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import partial
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from controllers.accounting_controller import AccountingController
+from controllers.aging_controller import AGING_LABELS, BY_OWNER, BY_TENANT, AgingController
+from controllers.billing_fact_controller import head_label
+from controllers.due_report_controller import DueReportController
+from models.acc_head_of_accounts import AccHeadOfAccounts
+from models.account_journal import AccountJournal
+from models.shop_renter_profile import ShopRenterProfile
+from reports.report_table import ReportTable
+from utils.database import get_engine, session_factory
+from utils.pivot_report import DEFAULT_REPORT_MONTHS, month_window
+
+# Bengali renter and head names need a Unicode font in the PDF
+NOTO_FONT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fonts", "NotoSansBengali-Regular.ttf")
+
+
+def _report_date():
+    return f"Report Date: {datetime.now().strftime('%B %d, %Y')}"
+
+
+def _as_date(value):
+    if value in (None, ""):
+        return None
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _periods(months, end):
+    return month_window(int(months or DEFAULT_REPORT_MONTHS), _as_date(end))
+
+
+def _money(value):
+    return f"{value:.2f}" if value else ""
+
+
+# Trial balance
+
+def trial_balance_table(result_rows, tb_date=None):
+    total_debit = 0
+    total_credit = 0
+    rows = []
+    for i, row in enumerate(result_rows, start=1):
+        head_name, ref_id, amount, drcr_type = row[0], row[1], float(row[2]), row[3]
+        debit = amount if drcr_type == 'dr' else 0.0
+        credit = amount if drcr_type == 'cr' else 0.0
+        total_debit += debit
+        total_credit += credit
+        rows.append([str(i), head_name, str(ref_id), f"{debit:.2f}", f"{credit:.2f}"])
+    rows.append(["", "", "Total", f"{total_debit:.2f}", f"{total_credit:.2f}"])
+    return ReportTable(
+        "trial_balance", "Trial Balance",
+        [f"As of: {tb_date}" if tb_date else "Current balances", _report_date()],
+        ["Sl", "Particular", "Ref. No", "Debit", "Credit"], rows,
+        widths=[15, 85, 30, 30, 30], aligns=["C", "L", "C", "R", "R"], font=NOTO_FONT,
+    )
+
+
+def build_trial_balance(session: Session, date=None):
+    """Trial balance as of date (YYYY-MM-DD), or from ledger_current without one."""
+    tb_date = str(date)[:10] if date else None
+    return trial_balance_table(AccountingController.get_trial_balance(session, tb_date=tb_date), tb_date)
+
+
+# Head ledger
+
+def ledger_balance_table(result, head_name="", from_date="", to_date=""):
+    ledger_balance, prev_amount, prev_drcr_type = result
+    rows = []
+    for row in ledger_balance:
+        amount = float(row[3])
+        if prev_drcr_type == 'dr':
+            balance = float(prev_amount) + amount
+        else:
+            balance = float(prev_amount) - amount
+        rows.append([str(row[0]), row[1] or "", str(row[2] or ""), f"{amount:.2f}", row[4], f"{balance:.2f}"])
+    return ReportTable(
+        "ledger_balance", "Ledger Balance",
+        [f"Head: {head_name}", f"Period: {from_date} to {to_date}", _report_date()],
+        ["Date", "Particulars", "Reference", "Amount", "Dr/Cr", "Balance"], rows,
+        widths=[25, 70, 25, 25, 15, 30], aligns=["C", "L", "C", "R", "C", "R"], font=NOTO_FONT,
+    )
+
+
+def build_ledger_balance(session: Session, head_id, from_date, to_date):
+    head_id = int(head_id)
+    head = session.query(AccHeadOfAccounts.head_name).filter(AccHeadOfAccounts.id == head_id).scalar()
+    result = AccountingController.get_ledger_balance(session, head_id=head_id, frm_dt=from_date, to_dt=to_date)
+    if not result:
+        raise ValueError(f"Could not load the ledger of head {head_id}")
+    return ledger_balance_table(result, f"{head or ''} (REF: {head_id})", from_date, to_date)
+
+
+# Journal
+
+# Rows fetched from the server per round trip while streaming the journal
+JOURNAL_FETCH_SIZE = 1000
+
+
+def journal_rows(from_date, to_date):
+    """
+    Journal lines between the dates, oldest first, streamed from a server-side
+    cursor so a year of account_journal is never held in memory.
+
+    Opens its own session: the rows are read when a writer asks for them,
+    after the report has been built.
+    """
+    start = _as_date(from_date)
+    end = _as_date(to_date) + timedelta(days=1)
+    session = session_factory(bind=get_engine())
+    try:
+        result = session.execute(
+            select(
+                AccountJournal.trans_date, AccountJournal.transaction_ref, AccHeadOfAccounts.head_name,
+                AccountJournal.remarks, AccountJournal.amount, AccountJournal.drcr_type,
+            ).outerjoin(AccHeadOfAccounts, AccHeadOfAccounts.id == AccountJournal.head_id)
+            .where(AccountJournal.trans_date >= start, AccountJournal.trans_date < end)
+            .order_by(AccountJournal.trans_date, AccountJournal.id)
+            .execution_options(yield_per=JOURNAL_FETCH_SIZE)
+        )
+        total_debit = 0.0
+        total_credit = 0.0
+        for trans_date, transaction_ref, head_name, remarks, amount, drcr_type in result:
+            amount = float(amount or 0)
+            debit = amount if drcr_type == 'dr' else 0.0
+            credit = amount if drcr_type == 'cr' else 0.0
+            total_debit += debit
+            total_credit += credit
+            yield [
+                trans_date.strftime("%Y-%m-%d") if trans_date else "", str(transaction_ref or ""),
+                head_name or "", remarks or "", f"{debit:.2f}", f"{credit:.2f}",
+            ]
+        yield ["Total", "", "", "", f"{total_debit:.2f}", f"{total_credit:.2f}"]
+    finally:
+        session.close()
+
+
+def build_journal(session: Session, from_date, to_date):
+    """Every journal line for a period, e.g. a financial year for the auditors."""
+    return ReportTable(
+        "journal", "Journal",
+        [f"Period: {from_date} to {to_date}", _report_date()],
+        ["Date", "Ref", "Head", "Particulars", "Debit", "Credit"],
+        partial(journal_rows, from_date, to_date),
+        widths=[22, 15, 50, 105, 30, 30], aligns=["C", "C", "L", "L", "R", "R"], orientation="L", font=NOTO_FONT,
+    )
+
+
+# Tenant ledger
+
+def tenant_ledger_statement(tenant_id, from_date, to_date):
+    """The tenant_ledger_rows query, parameters bound."""
+    return text("""
+        SELECT
+            acc_head_of_accounts.head_name,
+            acc_head_of_accounts.id AS head_id,
+            teanant_trans_history.*,
+            shop_renter_profile.renter_name
+        FROM teanant_trans_history
+        INNER JOIN shop_renter_profile ON shop_renter_profile.id = teanant_trans_history.teanant_id
+        INNER JOIN acc_head_of_accounts ON acc_head_of_accounts.id = teanant_trans_history.head_id
+        WHERE shop_renter_profile.id = :tenant_id
+        AND teanant_trans_history.trans_dt BETWEEN :from_date AND :to_date
+        ORDER BY acc_head_of_accounts.id ASC
+    """).bindparams(tenant_id=tenant_id, from_date=from_date, to_date=to_date)
+
+
+def tenant_ledger_rows(session: Session, tenant_id, from_date, to_date):
+    """Tenant transaction history for the period."""
+    return session.execute(tenant_ledger_statement(tenant_id, from_date, to_date)).fetchall()
+
+
+def tenant_ledger_table(ledger_rows, tenant_label="", from_date="", to_date=""):
+    total_debit = 0
+    total_credit = 0
+    rows = []
+    for row in ledger_rows:
+        amount = float(row.trans_amount)
+        debit = float(row.closing_amt) + amount if row.crdr_type == 'dr' else 0
+        credit = float(row.closing_amt) - amount if row.crdr_type == 'cr' else 0
+        rows.append([
+            row.trans_dt.strftime("%Y-%m-%d"), row.head_name, str(row.id),
+            f"{debit:,.2f}" if debit else "0",
+            f"{credit:,.2f}" if credit else "0",
+        ])
+        total_debit += debit
+        total_credit += credit
+    rows.append(["Total", "", "", f"{total_debit:,.2f}", f"{total_credit:,.2f}"])
+    return ReportTable(
+        "tenant_ledger", "Tenant Ledger",
+        [f"Tenant: {tenant_label}", f"Period: {from_date} to {to_date}"],
+        ["Date", "Head Name", "Reference", "Debit", "Credit"], rows,
+        widths=[30, 50, 30, 30, 30], aligns=["C", "C", "C", "C", "C"], font=NOTO_FONT,
+    )
+
+
+def build_tenant_ledger(session: Session, tenant_id, from_date, to_date):
+    tenant_id = int(tenant_id)
+    renter_name = session.query(ShopRenterProfile.renter_name)\
+        .filter(ShopRenterProfile.id == tenant_id).scalar()
+    return tenant_ledger_table(
+        tenant_ledger_rows(session, tenant_id, from_date, to_date),
+        f"{renter_name or ''} (REF: {tenant_id})", from_date, to_date
+    )
+
+
+# Due reports
+
+def owner_due_table(shops, pivot):
+    """One row per shop item with monthly dues and a blank row after each shop."""
+    width = 3 + len(pivot.labels)
+
+    # Items per shop in pivot row order: {shop_id: [item, ...]}
+    shop_items = {}
+    for shop_id, item in pivot.row_keys:
+        shop_items.setdefault(shop_id, []).append(item)
+
+    rows = []
+    for shop in shops:
+        first_item = True
+        for item in sorted(shop_items.get(shop.id, []), key=str):
+            amounts = pivot.row((shop.id, item))
+            total = sum(Decimal(str(a)) for a in amounts)
+
+            # Only show rows with non-zero total
+            if total == 0:
+                continue
+
+            values = [f"{shop.shop_name} ({shop.shop_no})" if first_item else "", item]
+            values.extend([f"{amt:.2f}" if amt > 0 else "" for amt in amounts])
+            values.append(f"{total:.2f}")
+            rows.append(values)
+            first_item = False
+
+        if not first_item:
+            rows.append([""] * width)
+
+    return ReportTable(
+        "owner_due", "Shop Owner Due Report", [_report_date()],
+        ["Shop Name", "Items"] + pivot.labels + ["Total"], rows,
+        widths=[40, 40] + [25] * len(pivot.labels) + [30],
+        aligns=["C", "L"] + ["C"] * (len(pivot.labels) + 1), orientation="L",
+    )
+
+
+def build_owner_due(session: Session, months=DEFAULT_REPORT_MONTHS, end=None):
+    """Positive dues per shop and bill particular for the last months up to end (default today)."""
+    shops, pivot = DueReportController.owner_due_pivot(session, _periods(months, end))
+    return owner_due_table(shops, pivot)
+
+
+def renter_due_table(owner_data, pivot):
+    """Owner -> shop house rent dues with owner totals and a grand total."""
+    months = len(pivot.labels)
+    grand_totals = [0.0] * months
+    grand_total_amount = Decimal("0.0")
+    rows = []
+
+    for owner in owner_data.values():
+        owner_inserted = False
+        owner_totals = [0.0] * months
+
+        for shop_id, shop_label in owner["shops"]:
+            dues = pivot.row(shop_id)
+            row_total = sum(Decimal(str(v)) for v in dues)
+            if row_total == 0:
+                continue
+
+            for i, v in enumerate(dues):
+                owner_totals[i] += v
+
+            values = [owner["ownner_name"] if not owner_inserted else "", shop_label]
+            values.extend([_money(v) for v in dues])
+            values.append(f"{row_total:.2f}")
+            rows.append(values)
+            owner_inserted = True
+
+        if owner_inserted:
+            total_sum = sum(Decimal(str(v)) for v in owner_totals)
+            rows.append(["", "Total"] + [_money(v) for v in owner_totals] + [f"{total_sum:.2f}"])
+            for i, v in enumerate(owner_totals):
+                grand_totals[i] += v
+            grand_total_amount += total_sum
+            rows.append([""] * (3 + months))
+
+    rows.append(["", "Grand Total"] + [_money(v) for v in grand_totals] + [f"{grand_total_amount:.2f}"])
+    return ReportTable(
+        "renter_due", "Due Report Shop Owner (Rent Only)", [_report_date()],
+        ["Owner Name", "Shops"] + pivot.labels + ["Total"], rows,
+        widths=[40, 40] + [25] * months + [30],
+        aligns=["C", "L"] + ["C"] * (months + 1), orientation="L",
+    )
+
+
+def build_renter_due(session: Session, months=DEFAULT_REPORT_MONTHS, end=None):
+    """House rent dues of active shops per owner for the last months up to end (default today)."""
+    owner_data, pivot = DueReportController.renter_due_pivot(session, _periods(months, end))
+    return renter_due_table(owner_data, pivot)
+
+
+# Receivables aging
+
+def _aging_subtitles(as_of):
+    # Amounts are what is open when the report runs, aged to as_of
+    return [f"Days past last pay date as of {as_of:%B %d, %Y}", f"Open amounts, {_report_date()}"]
+
+
+def _aging_values(amounts):
+    return [_money(amount) for amount in amounts]
+
+
+def tenant_aging_table(lines, as_of):
+    """Open dues per tenant and bill item in aging buckets, with tenant totals and a grand total."""
+    width = 2 + len(AGING_LABELS) + 1
+    grand = [Decimal("0")] * (len(AGING_LABELS) + 1)
+    rows = []
+    index = 0
+    while index < len(lines):
+        tenant = lines[index].key
+        tenant_total = [Decimal("0")] * len(grand)
+        first = True
+        while index < len(lines) and lines[index].key == tenant:
+            line = lines[index]
+            rows.append([(line.name or "Unknown") if first else "", head_label(line.head_id)]
+                        + _aging_values(line.buckets) + [f"{line.total:.2f}"])
+            for i, amount in enumerate(list(line.buckets) + [line.total]):
+                tenant_total[i] += amount
+            first = False
+            index += 1
+        rows.append(["", "Total"] + _aging_values(tenant_total[:-1]) + [f"{tenant_total[-1]:.2f}"])
+        rows.append([""] * width)
+        grand = [a + b for a, b in zip(grand, tenant_total)]
+
+    rows.append(["", "Grand Total"] + _aging_values(grand[:-1]) + [f"{grand[-1]:.2f}"])
+    return ReportTable(
+        "tenant_aging", "Receivables Aging by Tenant", _aging_subtitles(as_of),
+        ["Tenant", "Items"] + AGING_LABELS + ["Total"], rows,
+        widths=[55, 40] + [25] * len(AGING_LABELS) + [30],
+        aligns=["L", "L"] + ["R"] * (len(AGING_LABELS) + 1), orientation="L", font=NOTO_FONT,
+    )
+
+
+def owner_aging_table(lines, as_of):
+    """Open dues per shop owner in aging buckets with a grand total."""
+    grand = [Decimal("0")] * (len(AGING_LABELS) + 1)
+    rows = []
+    for line in lines:
+        rows.append([line.name or "Unknown"] + _aging_values(line.buckets) + [f"{line.total:.2f}"])
+        grand = [a + b for a, b in zip(grand, list(line.buckets) + [line.total])]
+
+    rows.append(["Grand Total"] + _aging_values(grand[:-1]) + [f"{grand[-1]:.2f}"])
+    return ReportTable(
+        "owner_aging", "Receivables Aging by Shop Owner", _aging_subtitles(as_of),
+        ["Owner Name"] + AGING_LABELS + ["Total"], rows,
+        widths=[60] + [30] * len(AGING_LABELS) + [35],
+        aligns=["L"] + ["R"] * (len(AGING_LABELS) + 1), orientation="L", font=NOTO_FONT,
+    )
+
+
+def build_tenant_aging(session: Session, as_of=None):
+    """Aging of open dues per tenant and bill item as of a date (default today)."""
+    as_of = _as_date(as_of) or datetime.now().date()
+    AgingController.refresh()
+    return tenant_aging_table(AgingController.summary(session, as_of, BY_TENANT), as_of)
+
+
+def build_owner_aging(session: Session, as_of=None):
+    """Aging of open dues per shop owner as of a date (default today)."""
+    as_of = _as_date(as_of) or datetime.now().date()
+    AgingController.refresh()
+    return owner_aging_table(AgingController.summary(session, as_of, BY_OWNER), as_of)
@@ -0,0 +1,38 @@
+import re
+from collections import namedtuple
+
+# A finished report: what the window shows and what the writers put in a file.
+#   name        registry key, also the start of the file name
+#   subtitles   lines printed under the title (report date, tenant, period)
+#   rows        lists of display strings; an all-blank row is a separator the
+#               window shows and the files leave out. For exports too large
+#               to hold in memory, a function returning a fresh row iterator
+#               (each writer calls it once)
+#   widths      PDF column widths in mm, spread over the page when None
+#   aligns      FPDF alignment per column ("L", "C", "R"), centred when None
+#   orientation "P" or "L"
+#   font        path of a TTF for text core fonts can't print (Bengali names)
+ReportTable = namedtuple(
+    "ReportTable",
+    "name title subtitles headers rows widths aligns orientation font",
+    defaults=(None, None, "P", None),
+)
+
+
+def is_blank(row):
+    return not row or all(value in ("", None) for value in row)
+
+
+def iter_rows(table):
+    return table.rows() if callable(table.rows) else iter(table.rows)
+
+
+def data_rows(table):
+    """The table's rows without the separator rows, one at a time."""
+    return (row for row in iter_rows(table) if not is_blank(row))
+
+
+def file_stem(name, params=None):
+    """File name for a report run, e.g. tenant_ledger_12_2025-01-01_2025-01-31."""
+    parts = [name] + [str(value) for value in (params or {}).values() if value not in (None, "")]
+    return re.sub(r"[^\w.-]+", "_", "_".join(parts))
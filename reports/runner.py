@@ -0,0 +1,111 @@
+import os
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from reports import builders
+from reports.report_table import file_stem
+from reports.writers import WRITERS, write_report
+from utils.database import Session, get_engine
+
+# builder(session, **params); params lists the names the builder accepts,
+# required lists the ones without a default.
+ReportSpec = namedtuple("ReportSpec", "builder params required description")
+
+REPORTS = {
+    "trial_balance": ReportSpec(
+        builders.build_trial_balance, ("date",), (),
+        "Trial balance as of date, current balances without one"),
+    "ledger_balance": ReportSpec(
+        builders.build_ledger_balance, ("head_id", "from_date", "to_date"), ("head_id", "from_date", "to_date"),
+        "Journal lines of one head of account for a period"),
+    "journal": ReportSpec(
+        builders.build_journal, ("from_date", "to_date"), ("from_date", "to_date"),
+        "Every journal line for a period, streamed"),
+    "tenant_ledger": ReportSpec(
+        builders.build_tenant_ledger, ("tenant_id", "from_date", "to_date"), ("tenant_id", "from_date", "to_date"),
+        "Transaction history of one tenant for a period"),
+    "owner_due": ReportSpec(
+        builders.build_owner_due, ("months", "end"), (),
+        "Dues per shop and bill item for the last months"),
+    "renter_due": ReportSpec(
+        builders.build_renter_due, ("months", "end"), (),
+        "House rent dues per owner and shop for the last months"),
+    "tenant_aging": ReportSpec(
+        builders.build_tenant_aging, ("as_of",), (),
+        "Open dues per tenant and item in 30/60/90/120 day buckets"),
+    "owner_aging": ReportSpec(
+        builders.build_owner_aging, ("as_of",), (),
+        "Open dues per shop owner in 30/60/90/120 day buckets"),
+}
+
+# One report run: name, params dict, formats, output directory
+ReportJob = namedtuple("ReportJob", "name params formats out_dir", defaults=({}, ("pdf",), "."))
+# paths written, or the error message when the run failed
+ReportResult = namedtuple("ReportResult", "job paths error")
+
+
+def report_params(name, params=None):
+    """The report's own parameters out of params, in the order REPORTS lists them."""
+    params = params or {}
+    return {key: params[key] for key in REPORTS[name].params if key in params}
+
+
+def build_report(name, params=None):
+    """Run a registered report's queries and return its ReportTable."""
+    spec = REPORTS[name]
+    params = report_params(name, params)
+    missing = [key for key in spec.required if params.get(key) in (None, "")]
+    if missing:
+        raise ValueError(f"{name} needs {', '.join(missing)}")
+    session = Session()
+    try:
+        return spec.builder(session, **params)
+    finally:
+        Session.remove()
+
+
+def run_job(job):
+    """Build one report and write it in every requested format."""
+    try:
+        unknown = [fmt for fmt in job.formats if fmt not in WRITERS]
+        if unknown:
+            raise ValueError(f"Unknown format {', '.join(unknown)}")
+        table = build_report(job.name, job.params)
+        os.makedirs(job.out_dir, exist_ok=True)
+        stem = file_stem(job.name, report_params(job.name, job.params))
+        paths = [write_report(table, os.path.join(job.out_dir, f"{stem}.{fmt}"), fmt) for fmt in job.formats]
+        return ReportResult(job, paths, None)
+    except Exception as e:
+        traceback.print_exc()
+        return ReportResult(job, [], str(e))
+
+
+def _init_worker():
+    # A forked worker inherits the parent's pooled connections; let the
+    # parent keep them and open new ones here.
+    get_engine().dispose(close=False)
+
+
+def run_jobs(jobs, workers=None):
+    """
+    Run report jobs, several at once in a process pool when workers > 1.
+
+    Each worker has its own engine, so the reports' queries and the PDF and
+    Excel rendering run in parallel instead of queueing behind the GIL.
+    Results come back in the order the jobs were given.
+    """
+    jobs = list(jobs)
+    if not workers or workers <= 1 or len(jobs) <= 1:
+        return [run_job(job) for job in jobs]
+
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_worker) as pool:
+        futures = {pool.submit(run_job, job): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. killed), not the report
+                results[index] = ReportResult(jobs[index], [], str(e))
+    return results
@@ -0,0 +1,175 @@
+import csv
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+from reports.report_table import data_rows
+
+# fpdf and openpyxl are imported by the writer that needs them, so a CSV run
+# (or a window that never exports) does not load either.
+
+
+def write_pdf(table, path):
+    from fpdf import FPDF
+
+    pdf = FPDF(orientation=table.orientation)
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    if table.font:
+        pdf.add_font("Noto", "", table.font, uni=True)
+        family, bold = "Noto", ""
+    else:
+        family, bold = "Arial", "B"
+
+    widths = table.widths
+    if not widths:
+        usable = pdf.w - pdf.l_margin - pdf.r_margin
+        widths = [usable / len(table.headers)] * len(table.headers)
+    aligns = table.aligns or ["C"] * len(table.headers)
+
+    pdf.set_font(family, bold, 16)
+    pdf.cell(0, 10, table.title, 0, 1, 'C')
+    pdf.set_font(family, "", 10)
+    for line in table.subtitles:
+        pdf.cell(0, 8, line, 0, 1, 'C')
+    pdf.ln(5)
+
+    pdf.set_fill_color(220, 220, 220)
+    pdf.set_font(family, bold, 10)
+    for width, header in zip(widths, table.headers):
+        pdf.cell(width, 10, str(header), 1, 0, 'C', fill=True)
+    pdf.ln()
+
+    pdf.set_font(family, "", 9)
+    for row in data_rows(table):
+        for width, align, value in zip(widths, aligns, row):
+            pdf.cell(width, 8, str(value), 1, 0, align)
+        pdf.ln()
+
+    pdf.output(path)
+    return path
+
+
+def _cell_width(value):
+    return len(str(value)) if value is not None else 0
+
+
+def _widen(widths, row):
+    """Running maximum of each column's value length."""
+    for index, value in enumerate(row):
+        if index < len(widths):
+            widths[index] = max(widths[index], _cell_width(value))
+        else:
+            widths.append(_cell_width(value))
+
+
+def _spool_rows(rows, widths):
+    """
+    Copy rows to a temporary file, widening widths to each column's longest value.
+
+    A write-only sheet needs its column widths before the first row, so a
+    streamed report is read once to measure it and replayed from the spool.
+    """
+    spool = tempfile.TemporaryFile()
+    for row in rows:
+        _widen(widths, row)
+        pickle.dump(list(row), spool, pickle.HIGHEST_PROTOCOL)
+    spool.seek(0)
+    return spool
+
+
+def _replay(spool):
+    while True:
+        try:
+            yield pickle.load(spool)
+        except EOFError:
+            return
+
+
+def write_xlsx(table, path):
+    """
+    Write table with a write-only workbook, so rows go straight to the file
+    instead of being held as cell objects.
+
+    Column widths are a running maximum taken while the rows pass through,
+    not a second walk over every cell of the sheet.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font
+    from openpyxl.utils import get_column_letter
+
+    widths = [_cell_width(header) for header in table.headers]
+    if isinstance(table.rows, list):
+        # Already in memory (a window's export): measure, then write the same list
+        rows = list(data_rows(table))
+        for row in rows:
+            _widen(widths, row)
+        spool = None
+    else:
+        spool = _spool_rows(data_rows(table), widths)
+        rows = _replay(spool)
+
+    try:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(table.title[:31])
+        for index, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(index)].width = width + 2
+
+        header_font = Font(bold=True)
+        header_alignment = Alignment(horizontal="center")
+        header_cells = []
+        for header in table.headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = header_font
+            cell.alignment = header_alignment
+            header_cells.append(cell)
+        ws.append(header_cells)
+
+        for row in rows:
+            ws.append(row)
+        wb.save(path)
+    finally:
+        if spool is not None:
+            spool.close()
+    return path
+
+
+def write_csv(table, path):
+    # utf-8-sig so Excel opens Bengali names correctly
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(table.headers)
+        writer.writerows(data_rows(table))
+    return path
+
+
+WRITERS = {
+    "pdf": write_pdf,
+    "xlsx": write_xlsx,
+    "csv": write_csv,
+}
+
+
+def write_report(table, path, fmt=None):
+    """Write table to path in fmt, taken from the path's extension when not given."""
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown report format: {fmt}")
+    return WRITERS[fmt](table, path)
+
+
+def downloads_path(filename):
+    """Where the windows save their exports."""
+    return os.path.join(os.path.expanduser("~"), "Downloads", filename)
+
+
+def open_file(path):
+    """Open a written report with the system viewer."""
+    if os.name == "nt":
+        os.startfile(path)
+    elif sys.platform == "darwin":
+        subprocess.run(["open", path])
+    else:
+        subprocess.run(["xdg-open", path])
@@ -0,0 +1,61 @@
+import os
+import sys
+import argparse
+import traceback
+from datetime import datetime
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from controllers.bill_run_controller import BillRunController, load_readings
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d") if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the monthly bills for every active shop allocation.")
+    parser.add_argument("--year", type=int, required=True, help="Bill year")
+    parser.add_argument("--month", type=int, required=True, choices=range(1, 13), help="Bill month (1-12)")
+    parser.add_argument("--bill-date", help="Bill date (YYYY-MM-DD). Defaults to today.")
+    parser.add_argument("--last-pay-date", help="Last pay date (YYYY-MM-DD).")
+    parser.add_argument("--readings", help="CSV of closing meter units (shop_id or shop_no, elect/gas/wasa_closing_unit).")
+    parser.add_argument("--commit", action="store_true", help="Write the bills. Without it the run is a dry-run preview.")
+    parser.add_argument("--chunk-size", type=int, default=BillRunController.CHUNK_SIZE, help="Shops written per transaction.")
+    args = parser.parse_args()
+
+    try:
+        readings = load_readings(args.readings) if args.readings else None
+        result = BillRunController.run(
+            args.year, args.month,
+            bill_date=parse_date(args.bill_date) or datetime.now(),
+            last_pay_date=parse_date(args.last_pay_date),
+            readings=readings,
+            dry_run=not args.commit,
+            chunk_size=args.chunk_size,
+        )
+    except Exception as e:
+        print(f"Error running bills: {e}")
+        traceback.print_exc()
+        sys.exit(2)
+
+    for bill in result.bills:
+        notes = list(bill.warnings)
+        if bill.demand_charge:
+            notes.append(f"demand charge {bill.demand_charge:.2f} not billed")
+        print(f"{bill.shop_label}: {bill.total:.2f}" + (f"  ({'; '.join(notes)})" if notes else ""))
+    for shop_id, shop_label, message in result.errors:
+        print(f"ERROR {shop_label}: {message}")
+
+    mode = "Dry run" if result.dry_run else "Bill run"
+    print(f"{mode} {args.month}/{args.year}: {len(result.bills)} bills, total {result.total_amount:.2f} "
+          f"(demand charges {result.total_demand_charge:.2f} not billed), "
+          f"{result.written} written, {len(result.errors)} errors, tariff version {result.tariff_version}.")
+    if result.errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
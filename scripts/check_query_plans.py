@@ -0,0 +1,177 @@
+import os
+import sys
+import traceback
+from datetime import date
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+# Exit codes: a hot query full scans, a query could not be explained, or the
+# check could not start (import or connection failure)
+EXIT_FULL_SCAN = 1
+EXIT_EXPLAIN_FAILED = 2
+EXIT_SETUP_FAILED = 3
+
+try:
+    # Register every model before utils.database pulls in models.base
+    import models
+    from sqlalchemy.ext.compiler import compiles
+    from sqlalchemy.orm import Query
+    from sqlalchemy.sql.expression import ClauseElement, Executable
+    from controllers.accounting_controller import AccountingController
+    from controllers.billing_fact_controller import BillingFactController
+    from controllers.due_report_controller import DueReportController
+    from controllers.ledger_snapshot_controller import LedgerSnapshotController
+    from models.bill_info import BillInfo
+    from models.bill_particular import BillParticular
+    from models.bill_particular_draft import BillParticularDraft
+    from models.billing_fact import BillingFact
+    from reports.builders import tenant_ledger_statement
+    from utils.database import get_engine, session_factory
+    from utils.pivot_report import month_window
+except ImportError as e:
+    print(f"Error importing the query builders: {e}")
+    traceback.print_exc()
+    sys.exit(EXIT_SETUP_FAILED)
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN of a statement, with the statement's own bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = "EXPLAIN QUERY PLAN" if compiler.dialect.name == "sqlite" else "EXPLAIN"
+    return f"{prefix} {compiler.process(element.statement, **kw)}"
+
+
+SAMPLE_FROM = date(2025, 1, 1)
+SAMPLE_TO = date(2025, 1, 31)
+SAMPLE_PERIODS = month_window(6, SAMPLE_TO)
+
+# Hot queries as the controllers and report builders build them, with sample
+# parameters. Each entry: (name, session -> statement or Query, tables that
+# must not be full scanned)
+HOT_QUERIES = [
+    (
+        "AccountingController.get_ledger_balance journal",
+        lambda session: AccountingController.ledger_journal_statement(6, SAMPLE_FROM, SAMPLE_TO),
+        ("account_journal",),
+    ),
+    (
+        "AccountingController.get_ledger_balance opening",
+        lambda session: AccountingController.ledger_opening_statement(6, SAMPLE_FROM),
+        ("ledger_history",),
+    ),
+    (
+        "AccountingController.get_trial_balance by date",
+        lambda session: LedgerSnapshotController.balances_statement(SAMPLE_TO),
+        ("ledger_history",),
+    ),
+    (
+        "AccountingController.get_head_balance",
+        lambda session: AccountingController.head_balance_query(session, 6),
+        ("ledger_current",),
+    ),
+    (
+        "TenantLedgerView.search_ledger",
+        lambda session: tenant_ledger_statement(1, SAMPLE_FROM, SAMPLE_TO),
+        ("teanant_trans_history",),
+    ),
+    (
+        "BillParticular.get_bill_particular_by_bill_id",
+        lambda session: BillParticular.bill_particular_query(session, 1),
+        ("bill_particular",),
+    ),
+    (
+        "BillParticularDraft.get_bill_particular_draft_by_shop_id",
+        lambda session: BillParticularDraft.draft_query(session, 1, 1, 2025),
+        ("bill_particular_draft",),
+    ),
+    (
+        "BillingFactController.fact_rows by shop and period",
+        lambda session: BillingFactController.fact_query(
+            session, BillInfo.bill_year == 2025, BillInfo.bill_month == 1, BillInfo.shop_id.in_([1])
+        ),
+        ("bill_info", "bill_particular"),
+    ),
+    (
+        "DueReportController.due_rows",
+        lambda session: DueReportController.due_rows_query(session, SAMPLE_PERIODS, BillingFact.due > 0),
+        ("billing_fact",),
+    ),
+    (
+        "BillingFactController.refresh_periods",
+        lambda session: BillingFactController.period_facts(session, 2025, 1, [1]),
+        ("billing_fact",),
+    ),
+]
+
+
+def full_scans(conn, statement, tables):
+    """Return the hot tables the plan reads with a full table scan."""
+    if isinstance(statement, Query):
+        statement = statement.statement
+    scanned = []
+    if conn.dialect.name == "sqlite":
+        for row in conn.execute(Explain(statement)).mappings():
+            detail = row["detail"]
+            for table in tables:
+                if detail.startswith(f"SCAN {table}") and "INDEX" not in detail:
+                    scanned.append(table)
+    else:
+        for row in conn.execute(Explain(statement)).mappings():
+            if row.get("table") in tables and row.get("type") == "ALL":
+                scanned.append(row["table"])
+    return scanned
+
+
+def check_query_plans(conn):
+    """Explain every hot query; returns (names that full scan, names that could not be explained)."""
+    failures, errors = [], []
+    session = session_factory(bind=conn)
+    try:
+        for name, build, tables in HOT_QUERIES:
+            try:
+                scanned = full_scans(conn, build(session), tables)
+            except Exception as e:
+                print(f"{name}: could not explain: {str(e).splitlines()[0]}")
+                errors.append(name)
+                continue
+            status = "FULL SCAN on " + ", ".join(scanned) if scanned else "ok"
+            print(f"{name}: {status}")
+            if scanned:
+                failures.append(name)
+    finally:
+        session.close()
+    return failures, errors
+
+
+def main():
+    try:
+        conn = get_engine().connect()
+    except Exception as e:
+        print(f"Error connecting to the database: {e}")
+        traceback.print_exc()
+        sys.exit(EXIT_SETUP_FAILED)
+    try:
+        failures, errors = check_query_plans(conn)
+    finally:
+        conn.close()
+    if failures:
+        print(f"{len(failures)} hot queries fall back to a full table scan.")
+        sys.exit(EXIT_FULL_SCAN)
+    if errors:
+        print(f"{len(errors)} hot queries could not be explained on {conn.dialect.name}.")
+        sys.exit(EXIT_EXPLAIN_FAILED)
+    print("All hot queries use an index.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import sys
+import argparse
+import traceback
+from datetime import datetime
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+# Register every model before utils.database pulls in models.base
+import models
+from utils.session_scope import session_scope
+from controllers.ledger_snapshot_controller import LedgerSnapshotController
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write end-of-day ledger_history closing rows.")
+    parser.add_argument("--date", help="Close up to this date (YYYY-MM-DD). Defaults to today.")
+    parser.add_argument("--backfill-from", help="Rebuild closing rows from this date (YYYY-MM-DD) out of account_journal.")
+    parser.add_argument("--full", action="store_true", help="Rebuild every closing row from the whole journal.")
+    args = parser.parse_args()
+
+    try:
+        ledger_date = parse_date(args.date)
+        with session_scope() as session:
+            if args.full or args.backfill_from:
+                written = LedgerSnapshotController.backfill(session, parse_date(args.backfill_from), ledger_date)
+            else:
+                written = LedgerSnapshotController.close_day(session, ledger_date)
+        print(f"Ledger snapshot written: {written} closing rows.")
+    except Exception as e:
+        print(f"Error closing day: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
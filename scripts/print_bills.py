@@ -0,0 +1,60 @@
+import argparse
+import os
+import sys
+import traceback
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+# Register every model before the bills are queried
+import models
+from utils.database import Session
+from reports.bill_pdf import load_month, render_bills
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a month's bills as PDFs, one file per shop or one combined file.")
+    parser.add_argument("--year", type=int, required=True, help="Bill year")
+    parser.add_argument("--month", type=int, required=True, choices=range(1, 13), help="Bill month (1-12)")
+    parser.add_argument("--out", default="bills", help="Output directory.")
+    parser.add_argument("--combined", action="store_true", help="Write every bill into one PDF, a page each.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes rendering separate files.")
+    args = parser.parse_args()
+
+    # Output paths are relative to where the script was started; everything
+    # else (the font and its fpdf metric cache, database.ini) to the project
+    args.out = os.path.abspath(args.out)
+    os.chdir(project_root)
+
+    session = Session()
+    try:
+        bills = load_month(session, args.year, args.month)
+    except Exception as e:
+        print(f"Error loading bills: {e}")
+        traceback.print_exc()
+        sys.exit(2)
+    finally:
+        session.close()
+
+    if not bills:
+        print(f"No bills for {args.month}/{args.year}.")
+        return
+
+    combined_name = f"bills_{args.year}-{args.month:02d}.pdf" if args.combined else None
+    try:
+        paths, errors = render_bills(bills, args.out, combined_name=combined_name, workers=args.workers)
+    except Exception as e:
+        print(f"Error rendering bills: {e}")
+        traceback.print_exc()
+        sys.exit(2)
+
+    for error in errors:
+        print(f"ERROR {error}")
+    print(f"{len(bills)} bills for {args.month}/{args.year} written to {len(paths)} files in {args.out}.")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
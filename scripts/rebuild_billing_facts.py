@@ -0,0 +1,35 @@
+import os
+import sys
+import argparse
+import traceback
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+# Register every model before the bills are queried
+import models
+from utils.session_scope import session_scope
+from controllers.billing_fact_controller import BillingFactController
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild billing_fact from bill_info and bill_particular.")
+    parser.add_argument("--year", type=int, help="Only rebuild this bill year.")
+    parser.add_argument("--month", type=int, choices=range(1, 13), help="Only rebuild this bill month (with --year).")
+    args = parser.parse_args()
+    if args.month and not args.year:
+        parser.error("--month needs --year")
+
+    try:
+        with session_scope() as session:
+            written = BillingFactController.rebuild(session, args.year, args.month)
+        print(f"Billing facts rebuilt: {written} rows.")
+    except Exception as e:
+        print(f"Error rebuilding billing facts: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import sys
+import traceback
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+# Register every model before the reports query them
+import models
+from reports.runner import REPORTS, ReportJob, run_jobs
+from reports.writers import WRITERS
+
+
+def parse_params(pairs):
+    params = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise ValueError(f"--param takes key=value, got {pair}")
+        params[key.strip()] = value.strip()
+    return params
+
+
+def load_jobs(path, formats, out_dir):
+    """
+    Jobs from a JSON list such as
+    [{"report": "owner_due", "params": {"months": 6}, "formats": ["pdf", "xlsx"]}, ...]
+    """
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    return [
+        ReportJob(
+            entry["report"],
+            entry.get("params", {}),
+            tuple(entry.get("formats", formats)),
+            entry.get("out_dir", out_dir),
+        )
+        for entry in entries
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Produce reports without the GUI, e.g. the month-end due reports and ledgers from a scheduled task."
+    )
+    parser.add_argument("reports", nargs="*", help="Report names, see --list.")
+    parser.add_argument("--param", action="append", metavar="KEY=VALUE",
+                        help="Report parameter, repeatable (date, from_date, to_date, head_id, tenant_id, months, end).")
+    parser.add_argument("--format", nargs="+", default=["pdf"], choices=sorted(WRITERS), help="Output formats.")
+    parser.add_argument("--out", default="reports_out", help="Output directory.")
+    parser.add_argument("--jobs", help="JSON file listing report runs, run after the named reports.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Reports run at once.")
+    parser.add_argument("--list", action="store_true", help="List the reports and their parameters.")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, spec in REPORTS.items():
+            params = ", ".join(f"{p}*" if p in spec.required else p for p in spec.params)
+            print(f"{name:<16} {spec.description} ({params})")
+        return
+
+    try:
+        unknown = [name for name in args.reports if name not in REPORTS]
+        if unknown:
+            parser.error(f"unknown report {', '.join(unknown)}; see --list")
+        params = parse_params(args.param)
+        jobs = [ReportJob(name, params, tuple(args.format), args.out) for name in args.reports]
+        if args.jobs:
+            jobs.extend(load_jobs(args.jobs, args.format, args.out))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error reading report jobs: {e}")
+        sys.exit(2)
+    if not jobs:
+        parser.error("name at least one report or give --jobs")
+
+    # Output paths are relative to where the script was started; everything
+    # else (fonts and their fpdf metric caches, database.ini) to the project
+    jobs = [job._replace(out_dir=os.path.abspath(job.out_dir)) for job in jobs]
+    os.chdir(project_root)
+
+    try:
+        results = run_jobs(jobs, args.workers)
+    except Exception as e:
+        print(f"Error running reports: {e}")
+        traceback.print_exc()
+        sys.exit(2)
+
+    failed = 0
+    for result in results:
+        if result.error:
+            failed += 1
+            print(f"ERROR {result.job.name}: {result.error}")
+        else:
+            for path in result.paths:
+                print(f"{result.job.name}: {path}")
+    print(f"{len(results) - failed} of {len(results)} reports written.")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+import time
+import traceback
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from utils.view_registry import VIEWS, import_report, timed_import
+
+# Imported by main.py before the login screen is shown.
+STARTUP_MODULES = ("ttkbootstrap", "sqlalchemy", "models", "views.login_view", "views.dashboard_view")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import the startup modules and every registered view in a fresh process and report what each one costs."
+    )
+    parser.add_argument("--top", type=int, default=0, help="Only show the N slowest modules.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        for module in STARTUP_MODULES:
+            timed_import(module)
+        startup = time.perf_counter() - started
+        for key in VIEWS:
+            timed_import(VIEWS[key].module)
+    except Exception as e:
+        print(f"Error importing views: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+    total = time.perf_counter() - started
+
+    # Each module is charged only for what was not already imported before it.
+    rows = import_report()
+    if args.top:
+        rows = rows[:args.top]
+    print(f"{'Module':<55} {'ms':>8}  Pulled in")
+    for module, seconds, pulled_in in rows:
+        marker = "*" if module in STARTUP_MODULES else " "
+        print(f"{marker}{module:<54} {seconds * 1000:8.1f}  {', '.join(pulled_in)}")
+    print(f"\nBefore login (*): {startup * 1000:.1f} ms   All views: {total * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import io
+from collections import OrderedDict
+from PIL import Image, ImageTk
+
+# Decoded thumbnails kept for the whole process; a few pages of the user list fit.
+AVATAR_CACHE_SIZE = 512
+
+# (user_id, avatar_hash) -> PhotoImage, least recently used first. Tk thread only.
+_photos = OrderedDict()
+
+
+def get_avatar_photo(user_id, avatar_hash, thumb_bytes):
+    """
+    PhotoImage for a user's stored thumbnail, decoded once per content hash.
+
+    A changed avatar has a new hash, so it never hits the old entry.
+    """
+    if not avatar_hash:
+        return None
+    key = (user_id, avatar_hash)
+    photo = _photos.get(key)
+    if photo is not None:
+        _photos.move_to_end(key)
+        return photo
+    if not thumb_bytes:
+        return None
+    try:
+        photo = ImageTk.PhotoImage(Image.open(io.BytesIO(thumb_bytes)))
+    except Exception as e:
+        print(f"Error decoding avatar thumbnail for user {user_id}: {str(e)}")
+        return None
+    _photos[key] = photo
+    while len(_photos) > AVATAR_CACHE_SIZE:
+        _photos.popitem(last=False)
+    return photo
+
+
+def invalidate_avatar(user_id):
+    """Drop every cached thumbnail of one user."""
+    for key in [key for key in _photos if key[0] == user_id]:
+        del _photos[key]
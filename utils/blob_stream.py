@@ -0,0 +1,39 @@
+from sqlalchemy import func, select
+
+# Bytes read per round trip when streaming a BLOB column.
+BLOB_CHUNK_SIZE = 256 * 1024
+
+
+def _primary_key(column):
+    """The id column of the mapped class a BLOB attribute (e.g. User.avatar) belongs to."""
+    return column.class_.id
+
+
+def blob_length(session, column, row_id):
+    """Size in bytes of one BLOB value, None when the row has none; the value itself is not read."""
+    return session.execute(
+        select(func.length(column)).where(_primary_key(column) == row_id)
+    ).scalar()
+
+
+def iter_blob(session, column, row_id, chunk_size=BLOB_CHUNK_SIZE):
+    """
+    Yield one BLOB value in chunk_size pieces.
+
+    Each piece is a SUBSTRING of the column (1-based, works on MySQL and
+    SQLite), so a large scan is never held in one result row.
+    """
+    length = blob_length(session, column, row_id)
+    if not length:
+        return
+    primary_key = _primary_key(column)
+    for start in range(1, length + 1, chunk_size):
+        yield session.execute(
+            select(func.substr(column, start, chunk_size)).where(primary_key == row_id)
+        ).scalar()
+
+
+def read_blob(session, column, row_id):
+    """The whole BLOB value for one row (None when empty), read through iter_blob."""
+    chunks = list(iter_blob(session, column, row_id))
+    return b"".join(bytes(chunk) for chunk in chunks) if chunks else None
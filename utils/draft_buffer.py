@@ -0,0 +1,209 @@
+import itertools
+import traceback
+from sqlalchemy import update
+from models.bill_particular_draft import BillParticularDraft
+from utils.database import get_engine, session_factory
+
+DRAFT_FIELDS = ("head_id", "bill_particular", "bill_qty", "bill_unit", "bill_rate", "sub_amount", "vat", "demand_charge")
+FLUSH_DELAY_MS = 800
+
+_keys = itertools.count(1)
+
+
+def _as_float(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class DraftBuffer:
+    """
+    In-memory bill particular drafts for one shop and bill period.
+
+    The form edits rows here; totals are computed locally and changes are
+    written back in one transaction, either after FLUSH_DELAY_MS of no edits
+    or when flush() is called (e.g. before the bill is generated).
+
+    A flush can fire from after() while a form handler is waiting on a
+    Messagebox, so it opens a session of its own rather than the scoped
+    Session() that handler is still using.
+    """
+
+    def __init__(self, widget, shop_id, bill_month, bill_year, delay_ms=FLUSH_DELAY_MS):
+        self.widget = widget
+        self.shop_id = shop_id
+        self.bill_month = bill_month
+        self.bill_year = bill_year
+        self.delay_ms = delay_ms
+        # key -> row dict; key is stable for the life of the buffer, id is the database id once saved
+        self.rows = {}
+        self._dirty = set()
+        self._deleted_ids = set()
+        self._clear_period = False
+        self._after_id = None
+
+    def matches(self, shop_id, bill_month, bill_year):
+        return (self.shop_id, self.bill_month, self.bill_year) == (shop_id, bill_month, bill_year)
+
+    def load(self, session=None):
+        """Read the saved drafts for the period once."""
+        own_session = session is None
+        session = session or session_factory(bind=get_engine())
+        try:
+            drafts = BillParticularDraft.get_bill_particular_draft_by_shop_id(
+                self.shop_id, self.bill_month, self.bill_year, session
+            )
+            self.rows = {}
+            for draft in drafts:
+                row = {field: getattr(draft, field) for field in DRAFT_FIELDS}
+                row["id"] = draft.id
+                row["key"] = next(_keys)
+                self.rows[row["key"]] = row
+            self._dirty.clear()
+            self._deleted_ids.clear()
+            self._clear_period = False
+        finally:
+            if own_session:
+                session.close()
+        return self
+
+    def replace_all(self, rows):
+        """Drop every draft of the period and start over with rows (list of field dicts)."""
+        self.rows = {}
+        self._dirty.clear()
+        self._deleted_ids.clear()
+        self._clear_period = True
+        for fields in rows:
+            self.add(schedule=False, **fields)
+        self.schedule_flush()
+
+    def add(self, schedule=True, **fields):
+        key = next(_keys)
+        row = {field: fields.get(field) for field in DRAFT_FIELDS}
+        row["id"] = None
+        row["key"] = key
+        self._apply(row, fields)
+        self.rows[key] = row
+        self._dirty.add(key)
+        if schedule:
+            self.schedule_flush()
+        return key
+
+    def update(self, key, **fields):
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        self._apply(row, fields)
+        self._dirty.add(key)
+        self.schedule_flush()
+        return row
+
+    def delete(self, key):
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        self._dirty.discard(key)
+        if row["id"] is not None:
+            self._deleted_ids.add(row["id"])
+        self.schedule_flush()
+
+    @staticmethod
+    def _apply(row, fields):
+        for field in DRAFT_FIELDS:
+            if field in fields:
+                row[field] = fields[field]
+        # Amount follows qty x rate unless the caller set it explicitly.
+        if "sub_amount" not in fields and ("bill_qty" in fields or "bill_rate" in fields):
+            row["sub_amount"] = _as_float(row["bill_qty"]) * _as_float(row["bill_rate"])
+
+    def total(self):
+        return sum(_as_float(row["sub_amount"]) for row in self.rows.values())
+
+    def ordered_rows(self):
+        return sorted(self.rows.values(), key=lambda row: row["key"])
+
+    @property
+    def pending(self):
+        return bool(self._dirty or self._deleted_ids or self._clear_period)
+
+    def schedule_flush(self):
+        """Restart the debounce timer."""
+        self.cancel_scheduled()
+        try:
+            self._after_id = self.widget.after(self.delay_ms, self._flush_later)
+        except Exception:
+            self._after_id = None
+
+    def cancel_scheduled(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _flush_later(self):
+        self._after_id = None
+        try:
+            self.flush()
+        except Exception as e:
+            # Rows stay dirty and go out with the next flush.
+            print(f"Error saving bill particular drafts: {str(e)}")
+
+    def flush(self):
+        """
+        Write pending changes in one transaction: period clear, deletes, one
+        executemany UPDATE for edited rows and the inserts for new rows.
+        """
+        self.cancel_scheduled()
+        if not self.pending:
+            return 0
+
+        session = session_factory(bind=get_engine())
+        try:
+            if self._clear_period:
+                session.query(BillParticularDraft).filter_by(
+                    shop_id=self.shop_id, bill_month=self.bill_month, bill_year=self.bill_year
+                ).delete(synchronize_session=False)
+            if self._deleted_ids:
+                session.query(BillParticularDraft).filter(
+                    BillParticularDraft.id.in_(list(self._deleted_ids))
+                ).delete(synchronize_session=False)
+
+            dirty_rows = [self.rows[key] for key in self._dirty if key in self.rows]
+            updates = [
+                {"id": row["id"], **{field: row[field] for field in DRAFT_FIELDS}}
+                for row in dirty_rows if row["id"] is not None
+            ]
+            if updates:
+                session.execute(update(BillParticularDraft), updates)
+
+            new_rows = [row for row in dirty_rows if row["id"] is None]
+            new_drafts = [
+                BillParticularDraft(
+                    shop_id=self.shop_id,
+                    bill_month=self.bill_month,
+                    bill_year=self.bill_year,
+                    **{field: row[field] for field in DRAFT_FIELDS}
+                )
+                for row in new_rows
+            ]
+            session.add_all(new_drafts)
+            session.flush()
+            new_ids = [draft.id for draft in new_drafts]
+            session.commit()
+
+            for row, draft_id in zip(new_rows, new_ids):
+                row["id"] = draft_id
+            written = len(dirty_rows) + len(self._deleted_ids)
+            self._dirty.clear()
+            self._deleted_ids.clear()
+            self._clear_period = False
+            return written
+        except Exception:
+            session.rollback()
+            traceback.print_exc()
+            raise
+        finally:
+            session.close()
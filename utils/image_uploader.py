@@ -1,9 +1,12 @@
 import base64
+import hashlib
 import os
 from PIL import Image
 import io
 import sys
 MAX_FILE_SIZE_MB = 2
+# Avatar thumbnail shown in the user list, stored next to the avatar at upload time.
+AVATAR_THUMB_SIZE = (32, 32)
 
 
 def compress_image(image_path, max_size_kb=300, quality=50):
@@ -26,6 +29,24 @@ def compress_image(image_path, max_size_kb=300, quality=50):
         return None
 
 
+def make_thumbnail(image_bytes, size=AVATAR_THUMB_SIZE):
+    """PNG thumbnail of an image, centred on a transparent size x size canvas."""
+    image = Image.open(io.BytesIO(image_bytes))
+    image.thumbnail(size, Image.LANCZOS)
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    canvas = Image.new("RGBA", size, (255, 255, 255, 0))
+    canvas.paste(image, ((size[0] - image.width) // 2, (size[1] - image.height) // 2))
+    output_io = io.BytesIO()
+    canvas.save(output_io, format="PNG", optimize=True)
+    return output_io.getvalue()
+
+
+def content_hash(data):
+    """Short hash identifying image content, used as a cache key."""
+    return hashlib.sha1(data).hexdigest()[:12]
+
+
 def file_to_base64(file_path, is_image=True):
     try:
         if is_image:
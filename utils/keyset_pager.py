@@ -0,0 +1,238 @@
+import threading
+import time
+import ttkbootstrap as ttk
+from sqlalchemy import and_, or_
+from utils.query_executor import run_in_background
+
+# Seconds a row count stays valid for one filter set.
+COUNT_TTL = 30
+
+# (cache name, filters) -> (count, expires at)
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+def cached_count(cache_key, query, ttl=COUNT_TTL):
+    """query.count() for cache_key, reused for ttl seconds."""
+    now = time.monotonic()
+    with _count_lock:
+        cached = _count_cache.get(cache_key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+    count = query.order_by(None).count()
+    with _count_lock:
+        _count_cache[cache_key] = (count, now + ttl)
+    return count
+
+
+def invalidate_counts(name=None):
+    """Forget cached counts for one cache name (the first item of the key), or all of them."""
+    with _count_lock:
+        if name is None:
+            _count_cache.clear()
+            return
+        for key in [key for key in _count_cache if key[0] == name]:
+            del _count_cache[key]
+
+
+class KeysetPager:
+    """
+    Seek pagination over (date, id), newest first.
+
+    A page is found from the (date, id) of the row next to it instead of an
+    OFFSET, so every page costs the same with an index on (date, id). Rows
+    with no date sort after the dated ones, as MySQL and SQLite order
+    NULLs in a descending sort.
+    """
+
+    def __init__(self, date_column, id_column, page_size):
+        self.date_column = date_column
+        self.id_column = id_column
+        self.page_size = page_size
+
+    def key(self, row):
+        return getattr(row, self.date_column.key), getattr(row, self.id_column.key)
+
+    def after(self, cursor):
+        """Rows shown after cursor (older)."""
+        date, row_id = cursor
+        if date is None:
+            return and_(self.date_column.is_(None), self.id_column < row_id)
+        return or_(
+            self.date_column < date,
+            and_(self.date_column == date, self.id_column < row_id),
+            self.date_column.is_(None),
+        )
+
+    def before(self, cursor):
+        """Rows shown before cursor (newer)."""
+        date, row_id = cursor
+        if date is None:
+            return or_(self.date_column.isnot(None), self.id_column > row_id)
+        return or_(self.date_column > date, and_(self.date_column == date, self.id_column > row_id))
+
+    def seek(self, query, cursor=None, backward=False, limit=None):
+        """
+        One page in display order.
+
+        Forward reads the page after cursor (the first page without one).
+        Backward reads the page before cursor (the last page without one).
+        """
+        limit = limit or self.page_size
+        if backward:
+            if cursor is not None:
+                query = query.filter(self.before(cursor))
+            rows = query.order_by(self.date_column.asc(), self.id_column.asc()).limit(limit).all()
+            return list(reversed(rows))
+        if cursor is not None:
+            query = query.filter(self.after(cursor))
+        return query.order_by(self.date_column.desc(), self.id_column.desc()).limit(limit).all()
+
+
+class KeysetListView(ttk.Frame):
+    """
+    Base for paged list screens: First/Previous/Next/Last over a KeysetPager.
+
+    Subclasses set date_column, id_column and count_name, create self.tree,
+    self.page_label and the first/prev/next/last buttons, and implement:
+
+    filter_values()              read the filter widgets (Tk thread), hashable
+    build_query(session, values) filtered base query (worker thread)
+    row_values(row)              (values, tags) for one entity (worker thread)
+
+    After a page is shown the next one is read in the background, so Next
+    usually fills the tree without waiting for the database.
+    """
+
+    date_column = None
+    id_column = None
+    count_name = None
+    page_size = 10
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.current_page = 1
+        self.total_records = 0
+        self.pager = KeysetPager(self.date_column, self.id_column, self.page_size)
+        self.on_load_error = None
+        self._filters = None
+        self._first_key = None
+        self._last_key = None
+        self._generation = 0
+        self._prefetched = None
+
+    @property
+    def total_pages(self):
+        return max(1, (self.total_records + self.page_size - 1) // self.page_size)
+
+    def reload(self):
+        """Read the filters again and show the first page."""
+        self._filters = self.filter_values()
+        self._prefetched = None
+        self.current_page = 0
+        self.change_page(1)
+
+    def invalidate_count(self):
+        invalidate_counts(self.count_name)
+        self._prefetched = None
+
+    def change_page(self, page):
+        if page == self.current_page:
+            return
+        if self._filters is None:
+            self._filters = self.filter_values()
+        if page == 1:
+            cursor, backward, limit = None, False, None
+        elif page == self.current_page + 1:
+            cursor, backward, limit = self._last_key, False, None
+            if self._prefetched is not None and self._prefetched[0] == (self._generation, cursor):
+                rows = self._prefetched[1]
+                self._prefetched = None
+                self._generation += 1
+                self._show_page(self._generation, page, (self.total_records, rows))
+                return
+        elif page == self.current_page - 1:
+            cursor, backward, limit = self._first_key, True, None
+        else:
+            # Last page: seek from the far end, sized so page numbers line up.
+            page = self.total_pages
+            cursor, backward = None, True
+            limit = self.total_records - (page - 1) * self.page_size or self.page_size
+
+        self._generation += 1
+        generation = self._generation
+        filters = self._filters
+        cache_key = (self.count_name, filters)
+
+        def fetch_page(session):
+            query = self.build_query(session, filters)
+            total = cached_count(cache_key, query)
+            rows = self.pager.seek(query, cursor, backward=backward, limit=limit)
+            return total, [self._page_row(row) for row in rows]
+
+        run_in_background(
+            self,
+            fetch_page,
+            lambda result: self._show_page(generation, page, result),
+            self._load_failed
+        )
+
+    def _page_row(self, row):
+        values, tags = self.row_values(row)
+        return self.pager.key(row), values, tags
+
+    def _show_page(self, generation, page, result):
+        if generation != self._generation:
+            return
+        total, rows = result
+        self.total_records = total
+        self.current_page = page
+        self._first_key = rows[0][0] if rows else None
+        self._last_key = rows[-1][0] if rows else None
+
+        self.tree.delete(*self.tree.get_children())
+        for key, values, tags in rows:
+            self.tree.insert("", "end", values=values, tags=tags)
+        self.update_pagination_controls(self.total_pages)
+
+        if rows and page < self.total_pages:
+            self._prefetch(generation, self._last_key)
+
+    def _prefetch(self, generation, cursor):
+        filters = self._filters
+
+        def fetch_next(session):
+            query = self.build_query(session, filters)
+            return [self._page_row(row) for row in self.pager.seek(query, cursor)]
+
+        def keep(rows):
+            if generation == self._generation:
+                self._prefetched = ((generation, cursor), rows)
+
+        run_in_background(self, fetch_next, keep)
+
+    def _load_failed(self, error):
+        if self.on_load_error:
+            self.on_load_error(error)
+
+    def update_pagination_controls(self, total_pages):
+        """Update pagination buttons and label"""
+        self.page_label.config(text=f"Page {self.current_page} of {total_pages}")
+        self.first_btn.config(state="normal" if self.current_page > 1 else "disabled")
+        self.prev_btn.config(state="normal" if self.current_page > 1 else "disabled")
+        self.next_btn.config(state="normal" if self.current_page < total_pages else "disabled")
+        self.last_btn.config(state="normal" if self.current_page < total_pages else "disabled")
+
+    def prev_page(self):
+        """Go to previous page"""
+        if self.current_page > 1:
+            self.change_page(self.current_page - 1)
+
+    def next_page(self):
+        """Go to next page"""
+        if self.current_page < self.total_pages:
+            self.change_page(self.current_page + 1)
+
+    def last_page(self):
+        """Go to last page"""
+        self.change_page(self.total_pages)
@@ -0,0 +1,215 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+
+# Versioned schema changes for databases created before the matching model change.
+# create_all() only creates missing tables, so anything added to an existing
+# table (indexes, column type fixes) has to go through here.
+
+metadata = MetaData()
+
+schema_version = Table(
+    "schema_version", metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=True),
+    Column("applied_at", DateTime, nullable=True),
+)
+
+# (table, index name, columns) for the hot filter columns
+HOT_INDEXES = [
+    ("account_journal", "ix_account_journal_head_date", ("head_id", "trans_date")),
+    ("teanant_trans_history", "ix_teanant_trans_history_tenant_date", ("teanant_id", "trans_dt")),
+    ("bill_info", "ix_bill_info_shop_period", ("shop_id", "bill_year", "bill_month")),
+    ("bill_particular", "ix_bill_particular_bill_type", ("bill_id", "bill_type")),
+    ("bill_particular_draft", "ix_bill_particular_draft_shop_period", ("shop_id", "bill_month", "bill_year")),
+    ("ledger_history", "ix_ledger_history_head_date", ("head_id", "ledger_date")),
+    ("ledger_current", "ix_ledger_current_head", ("head_id",)),
+]
+
+
+def create_missing_indexes(conn, indexes):
+    """Create each (table, name, columns) index unless the table is missing or already has it."""
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    for table, name, columns in indexes:
+        if table not in tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        if name in existing:
+            continue
+        conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+        print(f"Created index {name} on {table}.")
+
+
+def add_missing_columns(conn, table, columns):
+    """Add each (column, DDL type) to table unless the table is missing or already has it."""
+    inspector = inspect(conn)
+    if table not in inspector.get_table_names():
+        return
+    existing = {column["name"] for column in inspector.get_columns(table)}
+    for name, ddl in columns:
+        if name in existing:
+            continue
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+        print(f"Added column {table}.{name}.")
+
+
+def _add_hot_indexes(conn):
+    create_missing_indexes(conn, HOT_INDEXES)
+
+
+def _integer_ledger_head_ids(conn):
+    # SQLite compares by affinity, only MySQL needs the column rewritten.
+    if conn.dialect.name != "mysql":
+        return
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    for table in ("ledger_current", "ledger_history"):
+        if table not in tables:
+            continue
+        head_column = next((c for c in inspector.get_columns(table) if c["name"] == "head_id"), None)
+        if head_column is None or "INT" in str(head_column["type"]).upper():
+            continue
+        conn.execute(text(f"ALTER TABLE {table} MODIFY head_id INT NULL"))
+        print(f"Changed {table}.head_id to INT.")
+
+
+def _bill_tariff_version(conn):
+    add_missing_columns(conn, "bill_info", [("tariff_version", "VARCHAR(16) NULL")])
+
+
+def _bill_period_index(conn):
+    create_missing_indexes(conn, [("bill_info", "ix_bill_info_period", ("bill_year", "bill_month"))])
+
+
+def _list_seek_indexes(conn):
+    create_missing_indexes(conn, [
+        ("product_purchase", "ix_product_purchase_date_id", ("purchase_date", "id")),
+        ("demand_product", "ix_demand_product_date_id", ("demand_date", "id")),
+    ])
+
+
+def _user_avatar_thumbnails(conn):
+    add_missing_columns(conn, "users", [("avatar_thumb", "BLOB NULL"), ("avatar_hash", "VARCHAR(12) NULL")])
+    if "users" not in inspect(conn).get_table_names():
+        return
+    from utils.image_uploader import content_hash, make_thumbnail
+    user_ids = conn.execute(text(
+        "SELECT id FROM users WHERE avatar IS NOT NULL AND avatar_hash IS NULL"
+    )).scalars().all()
+    for user_id in user_ids:
+        avatar = conn.execute(text("SELECT avatar FROM users WHERE id = :id"), {"id": user_id}).scalar()
+        try:
+            thumb = make_thumbnail(avatar)
+        except Exception as e:
+            print(f"Skipped avatar thumbnail for user {user_id}: {e}")
+            thumb = None
+        conn.execute(
+            text("UPDATE users SET avatar_thumb = :thumb, avatar_hash = :hash WHERE id = :id"),
+            {"thumb": thumb, "hash": content_hash(avatar), "id": user_id}
+        )
+    if user_ids:
+        print(f"Made avatar thumbnails for {len(user_ids)} users.")
+
+
+def _stock_ledger(conn):
+    add_missing_columns(conn, "product_issue", [("demand_id", "INTEGER NULL"), ("shop_id", "INTEGER NULL")])
+    tables = set(inspect(conn).get_table_names())
+    if not {"stock_movement", "stock_balance", "stock_snapshot", "product_purchase", "purchase_details"} <= tables:
+        return
+    # Approved purchases are the receipts recorded so far
+    moved = conn.execute(text("""
+        INSERT INTO stock_movement (product_id, movement_date, qty, source_type, source_id, created_at)
+        SELECT purchase_details.product_id,
+               COALESCE(product_purchase.purchase_date, product_purchase.created_at, CURRENT_TIMESTAMP),
+               SUM(purchase_details.quantity), 'purchase', product_purchase.id, CURRENT_TIMESTAMP
+        FROM purchase_details
+        INNER JOIN product_purchase ON product_purchase.id = purchase_details.purchase_id
+        WHERE product_purchase.status = 1 AND purchase_details.product_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM stock_movement
+                          WHERE stock_movement.source_type = 'purchase'
+                            AND stock_movement.source_id = product_purchase.id)
+        GROUP BY purchase_details.product_id, product_purchase.id,
+                 COALESCE(product_purchase.purchase_date, product_purchase.created_at, CURRENT_TIMESTAMP)
+        HAVING SUM(purchase_details.quantity) <> 0
+    """)).rowcount
+    conn.execute(text("DELETE FROM stock_balance"))
+    conn.execute(text("""
+        INSERT INTO stock_balance (product_id, qty, updated_at)
+        SELECT product_id, SUM(qty), CURRENT_TIMESTAMP FROM stock_movement GROUP BY product_id
+    """))
+    conn.execute(text("DELETE FROM stock_snapshot"))
+    if moved:
+        print(f"Recorded {moved} stock movements from approved purchases.")
+
+
+
+def _billing_fact(conn):
+    if not {"billing_fact", "bill_info", "bill_particular"} <= set(inspect(conn).get_table_names()):
+        return
+    from controllers.billing_fact_controller import BillingFactController
+    from utils.database import session_factory
+    # The session joins the migration's transaction; the commit is run_migrations'
+    session = session_factory(bind=conn)
+    try:
+        written = BillingFactController.rebuild(session)
+        session.flush()
+    finally:
+        session.close()
+    if written:
+        print(f"Backfilled {written} billing fact rows.")
+
+
+def _ledger_history_watermark(conn):
+    # NULL on the existing rows, so the next close replays the journal once and stamps them
+    add_missing_columns(conn, "ledger_history", [("journal_id", "INTEGER NULL")])
+
+
+
+def _billing_fact_particular(conn):
+    # bill_particular joins the primary key, which ALTER TABLE can't change everywhere,
+    # so the table is recreated and backfilled again
+    if "billing_fact" not in inspect(conn).get_table_names():
+        return
+    from models.billing_fact import BillingFact
+    BillingFact.__table__.drop(conn)
+    BillingFact.__table__.create(conn)
+    _billing_fact(conn)
+
+
+# (version, description, upgrade function). Append only, never renumber.
+MIGRATIONS = [
+    (1, "Composite indexes on accounting and billing hot filter columns", _add_hot_indexes),
+    (2, "Integer head_id on ledger_current and ledger_history", _integer_ledger_head_ids),
+    (3, "bill_info.tariff_version", _bill_tariff_version),
+    (4, "Period index on bill_info for the due reports", _bill_period_index),
+    (5, "(date, id) indexes for the purchase and demand list pages", _list_seek_indexes),
+    (6, "users.avatar_thumb and avatar_hash", _user_avatar_thumbnails),
+    (7, "Stock movements and balances from approved purchases", _stock_ledger),
+    (8, "billing_fact backfilled from bills", _billing_fact),
+    (9, "ledger_history.journal_id watermark", _ledger_history_watermark),
+    (10, "billing_fact.bill_particular for particulars without a head", _billing_fact_particular),
+]
+
+
+def get_schema_version(engine):
+    metadata.create_all(engine, tables=[schema_version])
+    with engine.connect() as conn:
+        versions = conn.execute(select(schema_version.c.version)).scalars().all()
+    return max(versions) if versions else 0
+
+
+def run_migrations(engine):
+    """Apply every migration newer than the recorded schema version, one transaction each."""
+    current = get_schema_version(engine)
+    applied = 0
+    for version, description, upgrade in MIGRATIONS:
+        if version <= current:
+            continue
+        with engine.begin() as conn:
+            upgrade(conn)
+            conn.execute(schema_version.insert().values(
+                version=version, description=description, applied_at=datetime.now()
+            ))
+        print(f"Applied migration {version}: {description}")
+        applied += 1
+    return applied
@@ -0,0 +1,105 @@
+import calendar
+from array import array
+from datetime import date
+
+# Months shown by the due reports unless the view asks for another window.
+DEFAULT_REPORT_MONTHS = 6
+
+
+def month_window(months=DEFAULT_REPORT_MONTHS, end=None):
+    """The last `months` (year, month) periods up to and including end (default today), oldest first."""
+    end = end or date.today()
+    index = end.year * 12 + end.month - 1
+    periods = []
+    for i in range(index - months + 1, index + 1):
+        year, month = divmod(i, 12)
+        periods.append((year, month + 1))
+    return periods
+
+
+def month_label(year, month):
+    """MMM-YY column label, e.g. Jan-25."""
+    return f"{calendar.month_abbr[month]}-{str(year)[2:]}"
+
+
+def period_filter(year_column, month_column, periods):
+    """
+    Sargable conditions selecting the periods window on (year, month) columns.
+
+    The year range can use an index on (year, month); the month check is
+    evaluated on the index entries it returns.
+    """
+    (first_year, first_month), (last_year, last_month) = periods[0], periods[-1]
+    return (
+        year_column.between(first_year, last_year),
+        (year_column * 100 + month_column).between(first_year * 100 + first_month, last_year * 100 + last_month),
+    )
+
+
+class PivotTable:
+    """
+    Row keys x month periods of float amounts, stored column-major.
+
+    Each period is one array('d') indexed by row position, so adding a row
+    appends a zero to every column and a cell is columns[period][row].
+    """
+
+    def __init__(self, periods):
+        self.periods = list(periods)
+        self.labels = [month_label(year, month) for year, month in self.periods]
+        self.row_keys = []
+        self.columns = [array("d") for _ in self.periods]
+        self._period_index = {period: i for i, period in enumerate(self.periods)}
+        self._row_index = {}
+
+    def __contains__(self, row_key):
+        return row_key in self._row_index
+
+    def __len__(self):
+        return len(self.row_keys)
+
+    def ensure_row(self, row_key):
+        index = self._row_index.get(row_key)
+        if index is None:
+            index = len(self.row_keys)
+            self._row_index[row_key] = index
+            self.row_keys.append(row_key)
+            for column in self.columns:
+                column.append(0.0)
+        return index
+
+    def add(self, row_key, year, month, amount):
+        """Add amount to the cell; periods outside the window are ignored."""
+        period = self._period_index.get((int(year), int(month)))
+        if period is None:
+            return
+        row = self.ensure_row(row_key)
+        self.columns[period][row] += float(amount or 0)
+
+    def row(self, row_key):
+        index = self._row_index.get(row_key)
+        if index is None:
+            return [0.0] * len(self.periods)
+        return [column[index] for column in self.columns]
+
+    def row_total(self, row_key):
+        return sum(self.row(row_key))
+
+    def column_totals(self, row_keys=None):
+        if row_keys is None:
+            return [sum(column) for column in self.columns]
+        indexes = [self._row_index[key] for key in row_keys if key in self._row_index]
+        return [sum(column[i] for i in indexes) for column in self.columns]
+
+    @classmethod
+    def from_rows(cls, periods, rows, row_key=lambda row: row[0]):
+        """
+        Build from grouped query rows ending in (..., year, month, amount).
+
+        row_key picks the pivot row from each result row, default its first value.
+        """
+        table = cls(periods)
+        for row in rows:
+            year, month, amount = row[-3], row[-2], row[-1]
+            table.add(row_key(row), year, month, amount)
+        return table
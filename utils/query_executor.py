@@ -0,0 +1,155 @@
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from utils.database import Session
+from utils.sql_profiler import profile_action, profiler
+
+POLL_INTERVAL_MS = 50
+
+
+class QueryTask:
+    """Handle for one background query; cancel() drops its result."""
+
+    def __init__(self, widget, query_fn, on_success, on_error, owner):
+        self.widget = widget
+        self.query_fn = query_fn
+        self.on_success = on_success
+        self.on_error = on_error
+        self.owner = owner
+        self.action = None
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+def find_owner_window(widget):
+    """Walk up to the InternalWindow (anything with track_task) hosting the widget."""
+    while widget is not None:
+        if hasattr(widget, "track_task"):
+            return widget
+        widget = getattr(widget, "master", None)
+    return None
+
+
+class QueryExecutor:
+    """
+    Runs database work on a small thread pool and hands results back to Tk.
+
+    Worker threads never touch widgets: finished tasks are queued and the
+    main loop drains the queue through widget.after, then calls the task's
+    callback there.
+    """
+
+    def __init__(self, max_workers=4):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        self.results = queue.Queue()
+        self._outstanding = 0
+        self._poll_widget = None
+        self._lock = threading.Lock()
+
+    def submit(self, widget, query_fn, on_success, on_error=None):
+        """
+        Run query_fn(session) off the UI thread.
+
+        on_success(result) / on_error(exception) are called on the Tk thread,
+        unless the task was cancelled or the widget is gone by then.
+        """
+        owner = find_owner_window(widget)
+        task = QueryTask(widget, query_fn, on_success, on_error, owner)
+        if profiler.enabled:
+            # Worker threads don't inherit the caller's context, so carry the tag over.
+            task.action = profiler.current_action() or self._action_name(widget, query_fn)
+        if owner is not None:
+            owner.track_task(task)
+        with self._lock:
+            self._outstanding += 1
+            start_polling = self._poll_widget is None
+            if start_polling:
+                # Poll from the toplevel so closing one view doesn't stop delivery for the others.
+                self._poll_widget = widget.winfo_toplevel()
+        task.future = self.pool.submit(self._run, task)
+        if start_polling:
+            self._poll_widget.after(POLL_INTERVAL_MS, self._drain)
+        return task
+
+    def _run(self, task):
+        if task.cancelled:
+            self.results.put((task, None, None))
+            return
+        session = Session()
+        try:
+            if task.action:
+                with profile_action(task.action):
+                    result = task.query_fn(session)
+            else:
+                result = task.query_fn(session)
+            self.results.put((task, result, None))
+        except Exception as e:
+            traceback.print_exc()
+            self.results.put((task, None, e))
+        finally:
+            session.close()
+            Session.remove()
+
+    def _drain(self):
+        while True:
+            try:
+                task, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._outstanding -= 1
+            self._deliver(task, result, error)
+
+        with self._lock:
+            poll_widget = self._poll_widget
+            if self._outstanding <= 0 or not self._widget_alive(poll_widget):
+                self._poll_widget = None
+                return
+        poll_widget.after(POLL_INTERVAL_MS, self._drain)
+
+    def _deliver(self, task, result, error):
+        if task.owner is not None:
+            task.owner.untrack_task(task)
+        if task.cancelled or not self._widget_alive(task.widget):
+            return
+        try:
+            if error is not None:
+                if task.on_error:
+                    task.on_error(error)
+            else:
+                task.on_success(result)
+        except Exception:
+            traceback.print_exc()
+
+    @staticmethod
+    def _action_name(widget, query_fn):
+        fn = getattr(query_fn, "func", query_fn)
+        return getattr(fn, "__qualname__", None) or f"{type(widget).__name__}.query"
+
+    @staticmethod
+    def _widget_alive(widget):
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = QueryExecutor()
+    return _executor
+
+
+def run_in_background(widget, query_fn, on_success, on_error=None):
+    """Shortcut for get_executor().submit(...) used by the views."""
+    return get_executor().submit(widget, query_fn, on_success, on_error)
@@ -0,0 +1,141 @@
+import threading
+from collections import namedtuple
+from utils.database import get_engine, session_factory
+from models.BankAccount import BankAccount
+from models.acc_head_of_accounts import AccHeadOfAccounts
+from models.product import Product
+from models.shop_profile import ShopProfile
+from models.shop_renter_profile import ShopRenterProfile
+from models.unit import Unit
+
+# Lookup lists the forms fill their comboboxes from. They are read once after
+# login and kept for the whole process; a view that creates, edits or deletes
+# one of these records calls refresh() with the kinds it touched.
+#
+# A snapshot is a tuple of named tuples, so a form can hold on to it while
+# another thread swaps in a newer one.
+
+SHOPS = "shops"
+TENANTS = "tenants"
+BANKS = "banks"
+HEADS = "heads"
+PRODUCTS = "products"
+UNITS = "units"
+
+ShopRef = namedtuple("ShopRef", "id shop_name shop_no floor_no active_status")
+TenantRef = namedtuple("TenantRef", "id renter_name phone")
+BankRef = namedtuple("BankRef", "id bank_name")
+HeadRef = namedtuple("HeadRef", "id head_name")
+ProductRef = namedtuple("ProductRef", "id name")
+UnitRef = namedtuple("UnitRef", "id unit_name")
+
+
+def _load_shops(session):
+    rows = session.query(
+        ShopProfile.id, ShopProfile.shop_name, ShopProfile.shop_no,
+        ShopProfile.floor_no, ShopProfile.active_status
+    ).order_by(ShopProfile.id).all()
+    return tuple(ShopRef(*row) for row in rows)
+
+
+def _load_tenants(session):
+    rows = session.query(ShopRenterProfile.id, ShopRenterProfile.renter_name, ShopRenterProfile.phone)\
+        .order_by(ShopRenterProfile.id).all()
+    return tuple(TenantRef(*row) for row in rows)
+
+
+def _load_banks(session):
+    rows = session.query(BankAccount.id, BankAccount.bank_name)\
+        .filter(BankAccount.status == 1).order_by(BankAccount.id).all()
+    return tuple(BankRef(*row) for row in rows)
+
+
+def _load_heads(session):
+    rows = session.query(AccHeadOfAccounts.id, AccHeadOfAccounts.head_name)\
+        .filter(AccHeadOfAccounts.isActive == 1).order_by(AccHeadOfAccounts.id).all()
+    return tuple(HeadRef(*row) for row in rows)
+
+
+def _load_products(session):
+    rows = session.query(Product.id, Product.name).order_by(Product.id).all()
+    return tuple(ProductRef(*row) for row in rows)
+
+
+def _load_units(session):
+    rows = session.query(Unit.id, Unit.unit_name).filter(Unit.status == 1).order_by(Unit.id).all()
+    return tuple(UnitRef(*row) for row in rows)
+
+
+_LOADERS = {
+    SHOPS: _load_shops,
+    TENANTS: _load_tenants,
+    BANKS: _load_banks,
+    HEADS: _load_heads,
+    PRODUCTS: _load_products,
+    UNITS: _load_units,
+}
+
+# kind -> snapshot tuple
+_snapshots = {}
+_lock = threading.Lock()
+
+
+def refresh(*kinds):
+    """Read the given kinds (all of them when none are given) again from the database."""
+    kinds = kinds or tuple(_LOADERS)
+    # Own session rather than the thread's scoped one, so a refresh after a
+    # form's commit never closes the session that form is still using.
+    session = session_factory(bind=get_engine())
+    try:
+        loaded = {kind: _LOADERS[kind](session) for kind in kinds}
+    finally:
+        session.close()
+    with _lock:
+        _snapshots.update(loaded)
+
+
+def load_reference_data():
+    """Fill every snapshot; called once after login."""
+    refresh()
+
+
+def clear():
+    """Forget every snapshot, e.g. on logout; the next read loads them again."""
+    with _lock:
+        _snapshots.clear()
+
+
+def get(kind):
+    """Current snapshot of one kind, loaded on first use."""
+    with _lock:
+        snapshot = _snapshots.get(kind)
+    if snapshot is None:
+        refresh(kind)
+        with _lock:
+            snapshot = _snapshots[kind]
+    return snapshot
+
+
+def shops(active_only=False):
+    rows = get(SHOPS)
+    return tuple(shop for shop in rows if shop.active_status == 1) if active_only else rows
+
+
+def tenants():
+    return get(TENANTS)
+
+
+def banks():
+    return get(BANKS)
+
+
+def heads():
+    return get(HEADS)
+
+
+def products():
+    return get(PRODUCTS)
+
+
+def units():
+    return get(UNITS)
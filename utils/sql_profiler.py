@@ -0,0 +1,200 @@
+import os
+import atexit
+import re
+import threading
+import time
+import functools
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import event
+
+# Opt-in SQL profiling. When `profile = true` in database.ini (or GCM_DB_PROFILE=1)
+# the engine gets cursor listeners that count and time every statement against the
+# action that issued it (a window being opened, a report search, a controller call).
+# Identical statement shapes repeated inside one action run are reported as N+1 suspects.
+
+UNTAGGED = "(untagged)"
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+DEFAULT_LOG_PATH = os.path.join("logs", "sql_profile.log")
+
+_NUMBER = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST = re.compile(r"\(\s*(\?|%\(\w+\)s|:\w+)(\s*,\s*(\?|%\(\w+\)s|:\w+))*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_statement(statement):
+    """Reduce a statement to its shape: literals and IN lists collapsed, whitespace squeezed."""
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _SPACES.sub(" ", shape).strip()
+
+
+class ActionRun:
+    """Statements issued by one execution of an action."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.shapes = {}
+
+
+class ActionStats:
+    """Totals for one action across every run."""
+
+    def __init__(self, name):
+        self.name = name
+        self.runs = 0
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.max_sql_ms = 0.0
+        self.wall_ms = 0.0
+        self.max_queries = 0
+        # shape -> largest repeat count seen in one run
+        self.suspects = {}
+
+
+class SqlProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.threshold = DEFAULT_N_PLUS_ONE_THRESHOLD
+        self.log_path = DEFAULT_LOG_PATH
+        self.stats = {}
+        self._engines = set()
+        self._current = contextvars.ContextVar("sql_profiler_run", default=None)
+        self._lock = threading.Lock()
+
+    def install(self, engine, threshold=None, log_path=None):
+        """Attach the cursor listeners to an engine and start recording."""
+        if threshold is not None:
+            self.threshold = int(threshold)
+        if log_path:
+            self.log_path = log_path
+        if not self.enabled:
+            # Write whatever was collected when the app exits.
+            atexit.register(self.dump)
+        self.enabled = True
+        if id(engine) in self._engines:
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        self._engines.add(id(engine))
+
+    def current_action(self):
+        run = self._current.get()
+        return run.name if run else None
+
+    @contextmanager
+    def action(self, name):
+        """Tag every statement issued inside the block with `name`."""
+        if not self.enabled:
+            yield
+            return
+        run = ActionRun(name)
+        token = self._current.set(run)
+        try:
+            yield
+        finally:
+            self._current.reset(token)
+            self._finish(run)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_profiler_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("sql_profiler_start")
+        if not starts:
+            return
+        elapsed = (time.perf_counter() - starts.pop()) * 1000
+        run = self._current.get()
+        if run is None:
+            self._record_untagged(elapsed)
+            return
+        run.queries += 1
+        run.sql_ms += elapsed
+        shape = normalize_statement(statement)
+        run.shapes[shape] = run.shapes.get(shape, 0) + 1
+
+    def _finish(self, run):
+        wall_ms = (time.perf_counter() - run.started) * 1000
+        with self._lock:
+            stats = self.stats.setdefault(run.name, ActionStats(run.name))
+            stats.runs += 1
+            stats.queries += run.queries
+            stats.sql_ms += run.sql_ms
+            stats.max_sql_ms = max(stats.max_sql_ms, run.sql_ms)
+            stats.wall_ms += wall_ms
+            stats.max_queries = max(stats.max_queries, run.queries)
+            for shape, count in run.shapes.items():
+                if count >= self.threshold and count > stats.suspects.get(shape, 0):
+                    stats.suspects[shape] = count
+
+    def _record_untagged(self, elapsed):
+        """Count a query outside any action as a run of its own, so the averages hold."""
+        with self._lock:
+            stats = self.stats.setdefault(UNTAGGED, ActionStats(UNTAGGED))
+            stats.runs += 1
+            stats.queries += 1
+            stats.sql_ms += elapsed
+            stats.max_sql_ms = max(stats.max_sql_ms, elapsed)
+            stats.wall_ms += elapsed
+            stats.max_queries = 1
+
+    def snapshot(self):
+        """Per-action stats sorted by total SQL time, safe to read from the UI."""
+        with self._lock:
+            return sorted(self.stats.values(), key=lambda s: s.sql_ms, reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def summary(self):
+        lines = [f"SQL profile {datetime.now():%Y-%m-%d %H:%M:%S} (N+1 threshold {self.threshold})"]
+        for stats in self.snapshot():
+            runs = stats.runs or 1
+            lines.append(
+                f"{stats.name}: runs={stats.runs} queries={stats.queries} "
+                f"avg_queries={stats.queries / runs:.1f} max_queries={stats.max_queries} "
+                f"sql_ms={stats.sql_ms:.1f} max_run_sql_ms={stats.max_sql_ms:.1f} wall_ms={stats.wall_ms:.1f}"
+            )
+            for shape, count in sorted(stats.suspects.items(), key=lambda item: item[1], reverse=True):
+                lines.append(f"    N+1 suspect x{count}: {shape[:200]}")
+        return "\n".join(lines)
+
+    def dump(self, path=None):
+        """Append the summary to the profile log and return the path written."""
+        path = path or self.log_path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as log:
+            log.write(self.summary() + "\n\n")
+        return path
+
+
+profiler = SqlProfiler()
+
+
+def profile_action(name):
+    """Context manager shortcut for profiler.action(name)."""
+    return profiler.action(name)
+
+
+def profiled(name=None):
+    """Decorator tagging a view/controller method as a profiled action."""
+    def decorator(fn):
+        action_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return fn(*args, **kwargs)
+            with profiler.action(action_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,136 @@
+import importlib
+import sys
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+# Views opened from the dashboard, keyed by UrlSubMenu.command_name in the
+# form MenuController gives it (lower case, spaces as underscores). A view
+# module is only imported when its window is first opened, so the login
+# screen does not wait for openpyxl, fpdf, reportlab and PIL.
+#
+# This module must stay free of project and GUI imports: main.spec reads
+# view_modules() to tell PyInstaller about the lazily imported modules.
+
+# keep_alive: closing the window only hides it, for views that are slow to
+# build or hold a report the user comes back to.
+ViewEntry = namedtuple("ViewEntry", "title module class_name keep_alive", defaults=(False,))
+
+VIEWS = {
+    # Users
+    "create_user": ViewEntry("Create User", "views.users.create_user_view", "CreateUserView"),
+    "list_users": ViewEntry("User List", "views.users.list_user_view", "ListUserView"),
+    "create_role": ViewEntry("New Role Form", "views.users.create_role_view", "CreateRoleView"),
+    "role_list": ViewEntry("Role List", "views.users.list_role_view", "ListRoleView"),
+    "user_role_permission": ViewEntry("Set User Role Permission", "views.role_permission.set_role_permission", "SetRolePermissionView"),
+    "user_role_permission_details": ViewEntry("User Role Permission Details", "views.role_permission.role_permission_list", "RolePermissionDetails"),
+    # Shops
+    "create_shop": ViewEntry("Create Shop", "views.shops.create_shop_view", "CreateShopView"),
+    "list_shops": ViewEntry("Shop List", "views.shops.list_shop_view", "ListShopView"),
+    "create_shop_owner": ViewEntry("Create Shop Owner", "views.shopOwner.create_shop_owner_view", "CreateShopOwnerView"),
+    "list_shop_owners": ViewEntry("Shop Owner List", "views.shopOwner.lisr_shop_owner_view", "ListShopOwnerView"),
+    "create_shop_renter": ViewEntry("Create Shop Renter", "views.shopRenters.create_renter_view", "CreateShopRenterView"),
+    "list_shop_renters": ViewEntry("Shop Renter List", "views.shopRenters.list_renter_view", "ShopRenterListView"),
+    "create_shop_allocation": ViewEntry("Create Shop Allocation", "views.shopAllocation.create_shop_allocation_view", "CreateShopAllocationView"),
+    "list_shop_allocations": ViewEntry("Shop Allocation List", "views.shopAllocation.list_shop_allocation_view", "ListShopAllocationView"),
+    # Accounts
+    "create_bank_account": ViewEntry("New Bank Account Form", "views.bankAccount.create_bank_account_view", "CreateBankAccountView"),
+    "list_bank_accounts": ViewEntry("Bank Account List", "views.bankAccount.list_bank_account_view", "ListBankAccountView"),
+    "create_journal_voucher": ViewEntry("Create Journal Voucher", "views.journalVoucher.create_journal_voucher", "CreateJournalVoucherView"),
+    "list_journal_vouchers": ViewEntry("List Journal Vouchers", "views.journalVoucher.list_journal_voucher_view", "ListJournalVoucherView"),
+    # Bills and utility settings
+    "create_utilities": ViewEntry("Create Utility Setting", "views.utilities.create_utilities", "CreateUtilitySettingView"),
+    "list_utilities": ViewEntry("Utilities List", "views.utilities.list_utilities_view", "ListUtilitiesView"),
+    "create_particular": ViewEntry("Create Particular", "views.billInfo.create_particular", "CreateParticularView"),
+    "list_particular": ViewEntry("List Particular", "views.billInfo.particular_list", "ParticularListView"),
+    "create_bill_info": ViewEntry("Create Bill Info", "views.billInfo.create_bill", "CreateBillInfoView"),
+    "list_bill_info": ViewEntry("List Bill Info", "views.billInfo.bill_info_list", "BillInfoListView"),
+    "bill_collection": ViewEntry("Bill Collection", "views.billCollection.create_bill_collection", "CreateBillCollectionView"),
+    "bill_collection_list": ViewEntry("Bill Collection List", "views.billCollection.bill_collection_list", "CollectionListView"),
+    "bill_run": ViewEntry("Monthly Bill Run", "views.billInfo.bill_run", "BillRunView"),
+    # Inventory
+    "product_category": ViewEntry("Product Category", "views.category.create_category", "CreateCategoryView"),
+    "product_category_list": ViewEntry("Product Category List", "views.category.category_list", "CategoryListView"),
+    "create_product": ViewEntry("Product List", "views.product.create_product", "CreateProductView"),
+    "product_details_list": ViewEntry("Product List", "views.product.product_list", "ProductListView"),
+    "demand_product": ViewEntry("Demand Product", "views.demand.demand_create", "DemandCreateView"),
+    "demand_product_list": ViewEntry("Demand Product List", "views.demand.demand_list", "DemandListView"),
+    "create_unit": ViewEntry("Create Unit", "views.unit.create_unit", "CreateUnitView"),
+    "unit_list": ViewEntry("Unit List", "views.unit.unit_list", "UnitListView"),
+    "product_purchase": ViewEntry("Purchase View", "views.purchase.purchase", "Purchase"),
+    "product_purchase_list": ViewEntry("Purchase List", "views.purchase.purchase_list", "PurchaseListView"),
+    # Reports
+    "trial_balance": ViewEntry("Trial Balance", "views.accounting.trial_balance", "TrialBalanceView", keep_alive=True),
+    "ledger_balance": ViewEntry("Ledger Balance", "views.accounting.ledger_balance", "LedgerBalanceView", keep_alive=True),
+    "balance_sheet": ViewEntry("Balance Sheet", "views.accounting.balance_sheet", "BalanceSheetView", keep_alive=True),
+    "profit_loss": ViewEntry("Profit Loss", "views.accounting.profit_loss", "ProfitLossView", keep_alive=True),
+    "shop_owner_due_report": ViewEntry("Shop Owner Due Report", "views.accounting.shop_owner_due_report", "ShopOwnerDueReportView", keep_alive=True),
+    "shop_renter_due_report": ViewEntry("Shop Renter Due Report", "views.accounting.shop_renter_due_report", "ShopRenterDueReportView", keep_alive=True),
+    "tenant_ledger": ViewEntry("Tenant Ledger", "views.accounting.tenant_ledger", "TenantLedgerView", keep_alive=True),
+    "stock_report": ViewEntry("Stock Report", "views.stock.stock_report", "StockReportView", keep_alive=True),
+    # Diagnostics
+    "sql_profile": ViewEntry("SQL Profile", "views.diagnostics.sql_profile_view", "SqlProfileView"),
+}
+
+# Imported in the background after login, most used first.
+PREWARM_VIEWS = (
+    "bill_collection",
+    "create_bill_info",
+    "list_bill_info",
+    "tenant_ledger",
+    "list_shops",
+)
+
+# module -> (seconds, top-level packages the import pulled in)
+import_times = {}
+_import_lock = threading.Lock()
+
+
+def view_modules():
+    """Every lazily imported view module, for PyInstaller hiddenimports."""
+    return sorted({entry.module for entry in VIEWS.values()})
+
+
+def timed_import(module_name):
+    """Import a module and record what it cost, the first time only."""
+    with _import_lock:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+        before = {name.partition(".")[0] for name in sys.modules}
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        elapsed = time.perf_counter() - started
+        new = {name.partition(".")[0] for name in sys.modules} - before - {module_name.partition(".")[0]}
+        pulled_in = sorted(name for name in new if not name.startswith("_"))
+        import_times[module_name] = (elapsed, pulled_in)
+        return module
+
+
+def load_view(key):
+    """View class registered under key, importing its module on first use."""
+    entry = VIEWS[key]
+    return getattr(timed_import(entry.module), entry.class_name)
+
+
+def prewarm(keys=PREWARM_VIEWS):
+    """Import the given views' modules on a daemon thread."""
+    def run():
+        for key in keys:
+            try:
+                load_view(key)
+            except Exception as e:
+                print(f"Error pre-warming view {key}: {e}")
+                traceback.print_exc()
+
+    thread = threading.Thread(target=run, name="view-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def import_report():
+    """(module, seconds, pulled in packages) of every import so far, slowest first."""
+    with _import_lock:
+        rows = [(module, seconds, pulled_in) for module, (seconds, pulled_in) in import_times.items()]
+    return sorted(rows, key=lambda row: row[1], reverse=True)
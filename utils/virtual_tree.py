@@ -0,0 +1,264 @@
+import tkinter as tk
+import ttkbootstrap as ttk
+from sqlalchemy import String, cast
+from utils.query_executor import run_in_background
+
+PAGE_SIZE = 100
+# Pages kept in the tree at once; scrolling past them drops the far end.
+MAX_PAGES = 3
+# Fetch the next/previous page once the view is this close to an edge.
+EDGE_FRACTION = 0.1
+FILTER_DELAY_MS = 400
+
+
+class VirtualTreeview(ttk.Treeview):
+    """
+    Treeview that pages rows in from a query as the user scrolls.
+
+    query_fn(session) returns the base Query. Sorting (heading clicks) and
+    the column filter are applied in SQL, and pages are read with
+    LIMIT/OFFSET on a worker thread. Only MAX_PAGES pages are inserted in
+    the tree at a time.
+
+    row_values(row) turns one result row into the values tuple, and
+    row_tags(row) into its tags. Both run on the worker thread, so they may
+    use anything the query loaded but must not touch widgets. row_image(row)
+    also runs there and returns plain data that image_loader(data) turns
+    into the row's image on the Tk thread.
+    """
+
+    def __init__(self, parent, query_fn, row_values, row_tags=None, sort_columns=None,
+                 filter_columns=None, order_by=(), page_size=PAGE_SIZE, max_pages=MAX_PAGES,
+                 row_image=None, image_loader=None, **kwargs):
+        yscrollcommand = kwargs.pop("yscrollcommand", None)
+        super().__init__(parent, **kwargs)
+        self.query_fn = query_fn
+        self.row_values = row_values
+        self.row_tags = row_tags
+        self.row_image = row_image
+        self.image_loader = image_loader
+        # heading -> column expression
+        self.sort_columns = sort_columns or {}
+        self.filter_columns = filter_columns or {}
+        # Tie-breaker so LIMIT/OFFSET pages are stable, usually the primary key.
+        self.order_by = tuple(order_by)
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+        self.sort_column = None
+        self.sort_descending = False
+        self.filter_column = None
+        self.filter_text = ""
+
+        self.total = 0
+        self.status_var = tk.StringVar(value="")
+        self.on_error = None
+        # [(page number, [iid, ...]), ...] in display order
+        self._pages = []
+        self._generation = 0
+        self._loading = False
+        self._headings = {}
+        # iid -> image shown in the row, kept alive while the row is
+        self._images = {}
+        self._yscrollcommand = yscrollcommand
+        super().configure(yscrollcommand=self._on_yscroll)
+
+    def configure(self, cnf=None, **kwargs):
+        # Keep our scroll hook in front of the scrollbar the view attaches.
+        if isinstance(cnf, dict) and "yscrollcommand" in cnf:
+            cnf = dict(cnf)
+            self._yscrollcommand = cnf.pop("yscrollcommand")
+        if "yscrollcommand" in kwargs:
+            self._yscrollcommand = kwargs.pop("yscrollcommand")
+        if cnf is None and not kwargs:
+            return super().configure()
+        return super().configure(cnf, **kwargs)
+
+    config = configure
+
+    # Loading
+
+    def reload(self):
+        """Drop every row and load the first page and the row count again."""
+        self._bind_headings()
+        self._generation += 1
+        self._pages = []
+        self._loading = False
+        self._images.clear()
+        self.delete(*self.get_children())
+        self._fetch(0, at_end=True, with_count=True)
+
+    def set_sort(self, column):
+        """Sort by column; clicking the same column again flips the direction."""
+        if column not in self.sort_columns:
+            return
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column, self.sort_descending = column, False
+        self.reload()
+
+    def set_filter(self, column, text):
+        text = (text or "").strip()
+        if (column, text) == (self.filter_column, self.filter_text):
+            return
+        self.filter_column, self.filter_text = column, text
+        self.reload()
+
+    def build_query(self, session):
+        query = self.query_fn(session)
+        if self.filter_text and self.filter_column in self.filter_columns:
+            expression = self.filter_columns[self.filter_column]
+            query = query.filter(cast(expression, String).ilike(f"%{self.filter_text}%"))
+        order = []
+        if self.sort_column in self.sort_columns:
+            expression = self.sort_columns[self.sort_column]
+            order.append(expression.desc() if self.sort_descending else expression.asc())
+        order.extend(self.order_by)
+        if order:
+            query = query.order_by(*order)
+        return query
+
+    def _fetch(self, page, at_end, with_count=False):
+        if self._loading:
+            return
+        self._loading = True
+        generation = self._generation
+        offset = page * self.page_size
+        limit = self.page_size
+
+        def fetch_page(session):
+            query = self.build_query(session)
+            total = query.order_by(None).count() if with_count else None
+            rows = [self._render(row) for row in query.offset(offset).limit(limit).all()]
+            return total, rows
+
+        run_in_background(
+            self,
+            fetch_page,
+            lambda result: self._insert_page(generation, page, at_end, result),
+            lambda error: self._fetch_failed(generation, error)
+        )
+
+    def _render(self, row):
+        tags = tuple(self.row_tags(row)) if self.row_tags else ()
+        image = self.row_image(row) if self.row_image else None
+        return tuple(self.row_values(row)), tags, image
+
+    def _insert_row(self, index, values, tags, image_data):
+        image = self.image_loader(image_data) if self.image_loader and image_data is not None else None
+        if image is None:
+            return self.insert("", index, values=values, tags=tags)
+        iid = self.insert("", index, values=values, tags=tags, image=image)
+        self._images[iid] = image
+        return iid
+
+    def _fetch_failed(self, generation, error):
+        if generation == self._generation:
+            self._loading = False
+        if self.on_error:
+            self.on_error(error)
+
+    def _insert_page(self, generation, page, at_end, result):
+        if generation != self._generation:
+            return
+        self._loading = False
+        total, rows = result
+        if total is not None:
+            self.total = total
+
+        anchor = self._top_item()
+        if at_end:
+            iids = [self._insert_row("end", *row) for row in rows]
+            self._pages.append((page, iids))
+        else:
+            iids = [self._insert_row(index, *row) for index, row in enumerate(rows)]
+            self._pages.insert(0, (page, iids))
+
+        if len(self._pages) > self.max_pages:
+            dropped_page, dropped = self._pages.pop(0) if at_end else self._pages.pop()
+            self.delete(*dropped)
+            for iid in dropped:
+                self._images.pop(iid, None)
+        if anchor is not None and self.exists(anchor):
+            self._scroll_to(anchor)
+        self._update_status()
+
+    # Scrolling
+
+    def _on_yscroll(self, first, last):
+        if self._yscrollcommand:
+            self._yscrollcommand(first, last)
+        if self._loading or not self._pages:
+            return
+        first, last = float(first), float(last)
+        if last >= 1 - EDGE_FRACTION and self._has_next():
+            self._fetch(self._pages[-1][0] + 1, at_end=True)
+        elif first <= EDGE_FRACTION and self._pages[0][0] > 0:
+            self._fetch(self._pages[0][0] - 1, at_end=False)
+
+    def _has_next(self):
+        return (self._pages[-1][0] + 1) * self.page_size < self.total
+
+    def _top_item(self):
+        children = self.get_children()
+        if not children:
+            return None
+        index = int(float(self.yview()[0]) * len(children))
+        return children[min(index, len(children) - 1)]
+
+    def _scroll_to(self, iid):
+        children = len(self.get_children())
+        if children:
+            self.yview_moveto(self.index(iid) / children)
+
+    def _update_status(self):
+        if not self._pages or not self.total:
+            self.status_var.set("No rows" if not self.total else "")
+            return
+        first = self._pages[0][0] * self.page_size + 1
+        last = first + len(self.get_children()) - 1
+        self.status_var.set(f"Rows {first}–{last} of {self.total}")
+
+    # Headings
+
+    def _bind_headings(self):
+        for column in self.sort_columns:
+            if column not in self._headings:
+                self._headings[column] = self.heading(column, "text") or column
+            text = self._headings[column]
+            if column == self.sort_column:
+                text = f"{text} {'▼' if self.sort_descending else '▲'}"
+            self.heading(column, text=text, command=lambda c=column: self.set_sort(c))
+
+
+class FilterBar(ttk.Frame):
+    """Column picker and search entry that filters a VirtualTreeview as the user types."""
+
+    def __init__(self, parent, tree, delay_ms=FILTER_DELAY_MS):
+        super().__init__(parent)
+        self.tree = tree
+        self.delay_ms = delay_ms
+        self._after_id = None
+
+        columns = list(tree.filter_columns)
+        ttk.Label(self, text="Filter:").pack(side="left", padx=(5, 2))
+        self.column_combobox = ttk.Combobox(self, values=columns, state="readonly", width=14)
+        self.column_combobox.pack(side="left", padx=2)
+        if columns:
+            self.column_combobox.set(columns[0])
+        self.text_var = tk.StringVar()
+        ttk.Entry(self, textvariable=self.text_var, width=24).pack(side="left", padx=2)
+        ttk.Label(self, textvariable=tree.status_var, bootstyle="secondary").pack(side="right", padx=5)
+
+        self.text_var.trace_add("write", lambda *args: self.schedule())
+        self.column_combobox.bind("<<ComboboxSelected>>", lambda event: self.schedule())
+
+    def schedule(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+        self._after_id = self.after(self.delay_ms, self.apply)
+
+    def apply(self):
+        self._after_id = None
+        self.tree.set_filter(self.column_combobox.get(), self.text_var.get())
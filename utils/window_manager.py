@@ -1,5 +1,6 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
+from utils.sql_profiler import profile_action
 
 
 class InternalWindow(ttk.Frame):
@@ -14,10 +15,15 @@ class InternalWindow(ttk.Frame):
         "Help": "❓"
     }
 
-    def __init__(self, parent, title, window_manager):
+    def __init__(self, parent, title, window_manager, key=None, keep_alive=False):
         super().__init__(parent)
         self.parent = parent
         self.window_manager = window_manager
+        # Singleton key in the manager, and whether closing only hides the window
+        self.key = key
+        self.keep_alive = keep_alive
+        self.hidden = False
+        self._geometry = None
         
         # Configure styles
         style = ttk.Style()
@@ -53,6 +59,15 @@ class InternalWindow(ttk.Frame):
             width=3
         )
         self.close_button.pack(side="right")
+
+        # Busy indicator, shown while background queries for this window run
+        self._tasks = set()
+        self.busy_bar = ttk.Progressbar(
+            self.title_bar,
+            mode="indeterminate",
+            length=80,
+            bootstyle="info-striped"
+        )
         
         # Content frame with white background and border
         self.content = ttk.Frame(self.main_frame, style="Content.TFrame", padding=2)
@@ -68,16 +83,13 @@ class InternalWindow(ttk.Frame):
         self.title_label.bind("<Button-1>", self._on_drag_start)
         self.title_label.bind("<B1-Motion>", self._on_drag_motion)
         self.title_label.bind("<ButtonRelease-1>", self._on_drag_stop)
-        
-        # Bind click events for focus
-        self.bind_all("<Button-1>", self._check_focus, True)
     
     def _on_drag_start(self, event):
         """Start dragging the window."""
         self._drag_data["x"] = event.x
         self._drag_data["y"] = event.y
         self._drag_data["dragging"] = True
-        self.lift()
+        self.window_manager.raise_window(self)
     
     def _on_drag_motion(self, event):
         """Handle window dragging."""
@@ -107,31 +119,32 @@ class InternalWindow(ttk.Frame):
         """Stop dragging the window."""
         self._drag_data["dragging"] = False
     
-    def _check_focus(self, event):
-        """Check if window should be brought to front."""
-        try:
-            if isinstance(event.widget, (ttk.Button, ttk.Entry)):
-                return
-                
-            # Check if window still exists and is properly initialized
-            if not self.winfo_exists():
-                return
-                
-            # Check if click is within this window
-            x = self.winfo_rootx()
-            y = self.winfo_rooty()
-            w = self.winfo_width()
-            h = self.winfo_height()
-            
-            if (x <= event.x_root <= x + w and 
-                y <= event.y_root <= y + h):
-                self.lift()
-        except Exception as e:
-            # Silently handle any window-related errors
-            pass
-    
+    def track_task(self, task):
+        """Register a background query so it is cancelled with the window."""
+        if not self._tasks:
+            self.busy_bar.pack(side="right", padx=10)
+            self.busy_bar.start(15)
+        self._tasks.add(task)
+
+    def untrack_task(self, task):
+        """Forget a finished background query and hide the indicator when idle."""
+        self._tasks.discard(task)
+        if not self._tasks:
+            try:
+                self.busy_bar.stop()
+                self.busy_bar.pack_forget()
+            except Exception:
+                pass
+
     def _on_close(self):
         """Handle window close."""
+        if self.keep_alive:
+            # Queries still running finish into the hidden view
+            self.window_manager.hide_window(self)
+            return
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
         self.window_manager.remove_window(self)
         self.destroy()
 
@@ -139,7 +152,14 @@ class InternalWindow(ttk.Frame):
 class WindowManager:
     def __init__(self, parent):
         self.parent = parent
+        # Shown windows, bottom to top
         self.windows = []
+        # key -> window, for views opened once and raised (or re-shown) afterwards
+        self.keyed_windows = {}
+
+        # One click handler for every window: it finds the window the clicked
+        # widget lives in and raises it, without hit-testing each window.
+        self._click_binding = parent.bind_all("<Button-1>", self._on_click, add="+")
         
         # Configure global styles
         style = ttk.Style()
@@ -171,13 +191,25 @@ class WindowManager:
             foreground=[("selected", "white")]
         )
     
-    def create_window(self, title, view_class, **kwargs):
-        """Creates a new internal window."""
+    def create_window(self, title, view_class, key=None, keep_alive=False, **kwargs):
+        """
+        Creates a new internal window.
+
+        With a key, a window already open under that key is raised (or shown
+        again if it was hidden) instead of building a second view. keep_alive
+        makes the close button hide the window so it reopens instantly.
+        """
+        existing = self.keyed_windows.get(key) if key is not None else None
+        if existing is not None and existing.winfo_exists():
+            self.show_window(existing)
+            return existing
+
         # Create window container
-        window = InternalWindow(self.parent, title, self)
+        window = InternalWindow(self.parent, title, self, key=key, keep_alive=keep_alive)
         
         # Create view inside window
-        view = view_class(window.content, **kwargs)
+        with profile_action(f"open {view_class.__name__}"):
+            view = view_class(window.content, **kwargs)
         view.pack(fill="both", expand=True)
         
         # Position window with cascade offset
@@ -186,17 +218,79 @@ class WindowManager:
         
         # Add to windows list and bring to front
         self.windows.append(window)
+        if key is not None:
+            self.keyed_windows[key] = window
         window.lift()
         
         return window
-    
+
+    def raise_window(self, window):
+        """Move a window to the top of the stack."""
+        if self.windows and self.windows[-1] is window:
+            return
+        if window in self.windows:
+            self.windows.remove(window)
+        self.windows.append(window)
+        window.lift()
+
+    def hide_window(self, window):
+        """Take a keep_alive window off screen without destroying its view."""
+        window.hidden = True
+        window._geometry = {key: window.place_info().get(key) for key in ("x", "y", "width", "height")}
+        window.place_forget()
+        if window in self.windows:
+            self.windows.remove(window)
+
+    def show_window(self, window):
+        """Raise a window, putting it back where it was if it was hidden."""
+        if window.hidden:
+            window.hidden = False
+            window.place(**window._geometry)
+        self.raise_window(window)
+
+    def window_for(self, widget):
+        """The InternalWindow a widget is inside of, if any."""
+        while widget is not None and not isinstance(widget, str):
+            if isinstance(widget, InternalWindow):
+                return widget if widget.window_manager is self else None
+            widget = getattr(widget, "master", None)
+        return None
+
+    def _on_click(self, event):
+        try:
+            window = self.window_for(event.widget)
+            if window is not None and not window.hidden:
+                self.raise_window(window)
+        except Exception:
+            # Clicks on widgets being destroyed
+            pass
+
     def remove_window(self, window):
         """Remove window from manager."""
         if window in self.windows:
             self.windows.remove(window)
+        if window.key is not None and self.keyed_windows.get(window.key) is window:
+            del self.keyed_windows[window.key]
     
     def close_all(self):
-        """Close all windows."""
-        for window in self.windows[:]:
+        """Close all windows, hidden ones included."""
+        for window in set(self.windows) | set(self.keyed_windows.values()):
             window.destroy()
         self.windows.clear()
+        self.keyed_windows.clear()
+
+    def destroy(self):
+        """Close every window and drop the global click handler."""
+        self.close_all()
+        if self._click_binding is None:
+            return
+        binding, self._click_binding = self._click_binding, None
+        try:
+            # unbind_all would drop every <Button-1> binding, so remove only ours
+            script = self.parent.tk.call("bind", "all", "<Button-1>")
+            kept = [line for line in str(script).split("\n") if binding not in line]
+            self.parent.tk.call("bind", "all", "<Button-1>", "\n".join(kept))
+            self.parent.deletecommand(binding)
+        except Exception:
+            # The application is shutting down
+            pass
@@ -1,10 +1,12 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from utils.database import Session
+from utils.query_executor import run_in_background
 from ttkbootstrap.dialogs import Messagebox
 from models.acc_head_of_accounts import AccHeadOfAccounts
 from datetime import datetime
 from controllers.accounting_controller import AccountingController
+from reports.builders import ledger_balance_table
 from tkinter import StringVar
 class LedgerBalanceView(ttk.Frame):
     def __init__(self, parent):
@@ -135,43 +137,35 @@ class LedgerBalanceView(ttk.Frame):
             Messagebox.show_error(message="All fields are required!", title="Validation Error", parent=self)
             return
 
-        try:
-            # Get ledger balance using the head ID
-            session = Session()
-            ledger_balance, prev_amount, prev_drcr_type = AccountingController.get_ledger_balance(session, head_id=selected_head_id, frm_dt=from_date, to_dt=to_date)
-            session.close()
-            # Clear previous table
-            for widget in self.table_frame.winfo_children():
-                widget.destroy()
-
-            # Set up Treeview
-            columns = ("Date", "Particulars", "Reference", "Debit", "Credit", "Balance")
-            tree = ttk.Treeview(
-                self.table_frame, columns=columns, show="headings", height=10, bootstyle="primary"
-            )
-            tree.pack(fill="both", expand=True, padx=10, pady=10)
-
-            for col in columns:
-                tree.heading(col, text=col.capitalize())
-                tree.column(col, anchor="center")
-
-            # Populate rows
-            for row in ledger_balance:
-                balance = 0
-                date = row[0]
-                particulars = row[1]
-                reference = row[2]
-                amount = float(row[3])
-                drcr_type = row[4]
-
-                # need to show prevous amount and crdr type
-                if prev_drcr_type == 'dr':
-                    balance =  float(prev_amount) + amount
-                else:
-                    balance =  float(prev_amount) - amount
-
-                # need to show prevous amount and crdr type
-                tree.insert("", "end", values=(date, particulars, reference, amount, drcr_type, balance))
-                
-        except Exception as e:
-            Messagebox.show_error(message=f"Error searching ledger: {str(e)}", title="Error", parent=self)
+        run_in_background(
+            self,
+            lambda session: AccountingController.get_ledger_balance(session, head_id=selected_head_id, frm_dt=from_date, to_dt=to_date),
+            self.render_ledger,
+            lambda e: Messagebox.show_error(message=f"Error searching ledger: {str(e)}", title="Error", parent=self)
+        )
+
+    def render_ledger(self, result):
+        """Rebuild the ledger table from (rows, opening amount, opening side)."""
+        if not result:
+            # get_ledger_balance returns 0 when its queries fail
+            Messagebox.show_error(message="Error searching ledger: the ledger could not be loaded.", title="Error", parent=self)
+            return
+
+        # Clear previous table
+        for widget in self.table_frame.winfo_children():
+            widget.destroy()
+
+        # Set up Treeview
+        columns = ("Date", "Particulars", "Reference", "Debit", "Credit", "Balance")
+        tree = ttk.Treeview(
+            self.table_frame, columns=columns, show="headings", height=10, bootstyle="primary"
+        )
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        for col in columns:
+            tree.heading(col, text=col.capitalize())
+            tree.column(col, anchor="center")
+
+        # Populate rows
+        for values in ledger_balance_table(result).rows:
+            tree.insert("", "end", values=values)
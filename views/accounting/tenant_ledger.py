@@ -1,19 +1,13 @@
-from pydoc import text
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from utils.database import Session
+from utils.query_executor import run_in_background
+from functools import partial
 from ttkbootstrap.dialogs import Messagebox
-from models.acc_head_of_accounts import AccHeadOfAccounts
-from datetime import datetime
-from controllers.accounting_controller import AccountingController
 from tkinter import StringVar
 from models.shop_renter_profile import ShopRenterProfile
-from sqlalchemy import text as sql_text
-from tkinter import Toplevel, Text
-import os
-import subprocess
-from fpdf import FPDF
-from openpyxl import Workbook
+from reports.builders import tenant_ledger_rows, tenant_ledger_table
+from reports.writers import downloads_path, open_file, write_pdf, write_xlsx
 from tkinter.filedialog import asksaveasfilename
 from tkinter.messagebox import showinfo, showerror
 
@@ -141,121 +135,85 @@ class TenantLedgerView(ttk.Frame):
             Messagebox.show_error(message="All fields are required!", title="Validation Error", parent=self)
             return
 
-        try:
-            session = Session()
-            tenant_ledger_balance = session.execute(sql_text("""
-                SELECT 
-                    acc_head_of_accounts.head_name,
-                    acc_head_of_accounts.id AS head_id,
-                    teanant_trans_history.*,
-                    shop_renter_profile.renter_name
-                FROM teanant_trans_history
-                INNER JOIN shop_renter_profile ON shop_renter_profile.id = teanant_trans_history.teanant_id
-                INNER JOIN acc_head_of_accounts ON acc_head_of_accounts.id = teanant_trans_history.head_id
-                WHERE shop_renter_profile.id = :tenant_id
-                AND teanant_trans_history.trans_dt BETWEEN :from_date AND :to_date
-                ORDER BY acc_head_of_accounts.id ASC
-            """), {"tenant_id": selected_tenant_id, "from_date": from_date, "to_date": to_date}).fetchall()
-            session.close()
-
-            for widget in self.table_frame.winfo_children():
-                widget.destroy()
-
-            # Add border frame
-            border_frame = ttk.Frame(self.table_frame, bootstyle="secondary", borderwidth=1, relief="solid")
-            border_frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-            columns = ("Date", "Head Name", "Reference", "Debit", "Credit")
-            tree = ttk.Treeview(
-                border_frame, columns=columns, show="headings", height=12, bootstyle="primary"
-            )
-            tree.pack(fill="both", expand=True)
-
-            tree.heading("Date", text="Date")
-            tree.column("Date", anchor="center", width=100)
-
-            tree.heading("Head Name", text="Head Name")
-            tree.column("Head Name", anchor="w", width=150)
-
-            tree.heading("Reference", text="Reference")
-            tree.column("Reference", anchor="center", width=100)
+        run_in_background(
+            self,
+            partial(self.fetch_ledger, tenant_id=selected_tenant_id, from_date=from_date, to_date=to_date),
+            self.render_ledger,
+            lambda e: Messagebox.show_error(message=f"Error searching ledger: {str(e)}", title="Error", parent=self)
+        )
 
-            tree.heading("Debit", text="Debit")
-            tree.column("Debit", anchor="e", width=80)
+    def fetch_ledger(self, session, tenant_id, from_date, to_date):
+        """Tenant transaction history for the period (runs on a worker thread)."""
+        return tenant_ledger_rows(session, tenant_id, from_date, to_date)
 
-            tree.heading("Credit", text="Credit")
-            tree.column("Credit", anchor="e", width=80)
+    def render_ledger(self, tenant_ledger_balance):
+        """Build the ledger table and action buttons from the fetched rows."""
+        for widget in self.table_frame.winfo_children():
+            widget.destroy()
 
-            total_debit_balance = 0
-            total_credit_balance = 0
+        # Add border frame
+        border_frame = ttk.Frame(self.table_frame, bootstyle="secondary", borderwidth=1, relief="solid")
+        border_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-            # Save data for print/export
-            self.last_table_data = []
-            for row in tenant_ledger_balance:
-                date = row.trans_dt.strftime("%Y-%m-%d")
-                head_name = row.head_name
-                reference = row.id
-                closing_balance = row.closing_amt
-                amount = float(row.trans_amount)
-                drcr_type = row.crdr_type
+        columns = ("Date", "Head Name", "Reference", "Debit", "Credit")
+        tree = ttk.Treeview(
+            border_frame, columns=columns, show="headings", height=12, bootstyle="primary"
+        )
+        tree.pack(fill="both", expand=True)
 
-                debit_balance = float(closing_balance) + amount if drcr_type == 'dr' else 0
-                credit_balance = float(closing_balance) - amount if drcr_type == 'cr' else 0
+        tree.heading("Date", text="Date")
+        tree.column("Date", anchor="center", width=100)
 
-                self.last_table_data.append([
-                    date, head_name, reference,
-                    f"{debit_balance:,.2f}" if debit_balance else "0",
-                    f"{credit_balance:,.2f}" if credit_balance else "0"
-                ])
+        tree.heading("Head Name", text="Head Name")
+        tree.column("Head Name", anchor="w", width=150)
 
-                tree.insert("", "end", values=(
-                    date, head_name, reference,
-                    f"{debit_balance:,.2f}" if debit_balance else "0",
-                    f"{credit_balance:,.2f}" if credit_balance else "0"
-                ))
+        tree.heading("Reference", text="Reference")
+        tree.column("Reference", anchor="center", width=100)
 
-                total_debit_balance += debit_balance
-                total_credit_balance += credit_balance
+        tree.heading("Debit", text="Debit")
+        tree.column("Debit", anchor="e", width=80)
 
-            # Insert total row
-            tree.insert("", "end", values=(
-                "Total", "", "", 
-                f"{total_debit_balance:,.2f}",
-                f"{total_credit_balance:,.2f}"
-            ))
+        tree.heading("Credit", text="Credit")
+        tree.column("Credit", anchor="e", width=80)
 
+        # Save the report for print/export
+        self.report = tenant_ledger_table(
+            tenant_ledger_balance,
+            self.tenant_combobox.get(),
+            self.from_date_picker.entry.get(),
+            self.to_date_picker.entry.get(),
+        )
+        self.last_table_data = self.report.rows
+        for values in self.report.rows:
+            tree.insert("", "end", values=values)
 
-            # Action Buttons Frame
-            action_btn_frame = ttk.Frame(self.table_frame)
-            action_btn_frame.pack(pady=5)
+        # Action Buttons Frame
+        action_btn_frame = ttk.Frame(self.table_frame)
+        action_btn_frame.pack(pady=5)
 
-            ttk.Button(
-                action_btn_frame,
-                text="Print Preview",
-                bootstyle="info-outline",
-                command=lambda: self.print_preview(self.last_table_data, columns)
-            ).pack(side="left", padx=10)
+        ttk.Button(
+            action_btn_frame,
+            text="Print Preview",
+            bootstyle="info-outline",
+            command=lambda: self.print_preview(self.last_table_data, columns)
+        ).pack(side="left", padx=10)
 
 
-            ttk.Button(
-                action_btn_frame,
-                text="Export to Excel",
-                bootstyle="success-outline",
-                command=lambda: self.export_to_excel(self.last_table_data, columns)
-            ).pack(side="left", padx=10)
+        ttk.Button(
+            action_btn_frame,
+            text="Export to Excel",
+            bootstyle="success-outline",
+            command=lambda: self.export_to_excel(self.last_table_data, columns)
+        ).pack(side="left", padx=10)
 
-            ttk.Button(
-                action_btn_frame,
-                text="Print PDF",
-                bootstyle="danger-outline",
-                command=self.print_ledger_pdf
-            ).pack(side="left", padx=10)
+        ttk.Button(
+            action_btn_frame,
+            text="Print PDF",
+            bootstyle="danger-outline",
+            command=self.print_ledger_pdf
+        ).pack(side="left", padx=10)
 
 
-        except Exception as e:
-            Messagebox.show_error(message=f"Error searching ledger: {str(e)}", title="Error", parent=self)
-    
-
     def export_to_excel(self, table_data, columns):
         try:
             # Ask user where to save
@@ -268,30 +226,7 @@ class TenantLedgerView(ttk.Frame):
             if not file_path:
                 return  # User cancelled
 
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Tenant Ledger"
-
-            # Write headers
-            ws.append(columns)
-
-            # Write data rows
-            for row in table_data:
-                ws.append(row)
-
-            # Auto-size columns
-            for col in ws.columns:
-                max_length = 0
-                col_letter = col[0].column_letter
-                for cell in col:
-                    try:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                    except:
-                        pass
-                ws.column_dimensions[col_letter].width = max_length + 2
-
-            wb.save(file_path)
+            write_xlsx(self.report, file_path)
             showinfo("Export Successful", f"Excel file saved to:\n{file_path}")
         except Exception as e:
             showerror("Export Failed", f"Error: {str(e)}")
@@ -338,52 +273,12 @@ class TenantLedgerView(ttk.Frame):
             return
 
         tenant_display = self.tenant_combobox.get().replace("/", "_").replace(" ", "_")
-        filename = os.path.join(os.path.expanduser("~"), "Downloads", f"tenant_ledger_{tenant_display}.pdf")
+        filename = downloads_path(f"tenant_ledger_{tenant_display}.pdf")
 
         try:
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_auto_page_break(auto=True, margin=15)
-            font_path = os.path.join("fonts", "NotoSansBengali-Regular.ttf")
-            pdf.add_font("Noto", "", font_path, uni=True)
-            pdf.set_font("Noto", "", 12)
-
-            # Header
-            pdf.cell(0, 10, "Tenant Ledger", ln=True, align="C")
-            pdf.set_font("Noto", "", 10)
-            pdf.cell(0, 10, f"Tenant: {self.tenant_combobox.get()}", ln=True)
-            pdf.cell(0, 10, f"Period: {self.from_date_picker.entry.get()} to {self.to_date_picker.entry.get()}", ln=True)
-            pdf.ln(5)
-
-            # Table headers
-            pdf.set_fill_color(220, 220, 220)
-            pdf.set_font("Noto", "", 10)
-            col_widths = [30, 50, 30, 30, 30]
-            headers = ["Date", "Head", "Reference", "Debit", "Credit"]
-            for i, h in enumerate(headers):
-                pdf.cell(col_widths[i], 8, h, border=1, align="C", fill=True)
-            pdf.ln()
-
-            # Table rows
-            for row in self.last_table_data:
-                for i, cell in enumerate(row):
-                    pdf.cell(col_widths[i], 8, str(cell), border=1, align="C")
-                pdf.ln()
-
-            # Save
-            pdf.output(filename)
-
-            # Open the PDF
-            if os.name == 'posix':
-                subprocess.run(['open', filename])
-            elif os.name == 'nt':
-                os.startfile(filename)
-            else:
-                subprocess.run(['xdg-open', filename])
-
+            write_pdf(self.report, filename)
+            open_file(filename)
             Messagebox.show_info(title="Print Success", message=f"PDF saved to Downloads:\n{filename}", parent=self)
 
         except Exception as e:
             Messagebox.show_error(title="Print Failed", message=str(e), parent=self)
-
-
@@ -1,10 +1,12 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from utils.database import Session
+from utils.query_executor import run_in_background
 from ttkbootstrap.dialogs import Messagebox
 from models.acc_head_of_accounts import AccHeadOfAccounts
 from datetime import datetime
 from controllers.accounting_controller import AccountingController
+from reports.builders import trial_balance_table
 
 class TrialBalanceView(ttk.Frame):
     def __init__(self, parent):
@@ -91,78 +93,33 @@ class TrialBalanceView(ttk.Frame):
         # selected_head = self.head_of_account_combobox.get()
         from_date = self.from_date_picker.entry.get()
         # to_date = self.to_date_picker.entry.get()
-        total_debit = 0
-        total_credit = 0
-
-        if not all([from_date]):
-            session = Session()
-            result_rows = AccountingController.get_trial_balance(session)
-            print("result_rows",result_rows)
-            session.close()
-
-             # Set up Treeview
-            columns = ("sl", "particular","Ref. No", "debit", "credit")
-            tree = ttk.Treeview(
-                self.table_frame, columns=columns, show="headings", height=10, bootstyle="primary"
-            )
-            tree.pack(fill="both", expand=True, padx=10, pady=10)
-
-            for col in columns:
-                tree.heading(col, text=col.capitalize())
-                tree.column(col, anchor="center")
-
-            # print("result_rows",result_rows)
-            # Populate rows
-            for i, row in enumerate(result_rows, start=1):
-                head_name = row[0]
-                ref_id = row[1]
-                amount = float(row[2])
-                drcr_type = row[3]
-                debit = amount if drcr_type == 'dr' else "0.00"
-                credit = amount if drcr_type == 'cr' else "0.00"
-                total_debit += float(debit)
-                total_credit += float(credit)
-
-                tree.insert("", "end", values=(i, head_name, ref_id, debit, credit))
-
-        try:
-            # Clear previous table
-            for widget in self.table_frame.winfo_children():
-                widget.destroy()
-
-            # Format date
-            tb_date = from_date
-
-            session = Session()
-            result_rows = AccountingController.get_trial_balance(session, tb_date=tb_date)
-            # print("result_rows",result_rows)
-            session.close()
-
-            # Set up Treeview
-            columns = ("sl", "particular", "Ref. No", "debit", "credit")
-            tree = ttk.Treeview(
-                self.table_frame, columns=columns, show="headings", height=10, bootstyle="primary"
-            )
-            tree.pack(fill="both", expand=True, padx=10, pady=10)
-
-            for col in columns:
-                tree.heading(col, text=col.capitalize())
-                tree.column(col, anchor="center")
-
-            # Populate rows
-            for i, row in enumerate(result_rows, start=1):
-                head_name = row[0]
-                ref_id = row[1]
-                drcr_type = row[3]
-                amount = float(row[2])
-                debit = amount if drcr_type == 'dr' else "0.00"
-                credit = amount if drcr_type == 'cr' else "0.00"
-                total_debit += float(debit)
-                total_credit += float(credit)
-
-                tree.insert("", "end", values=(i, head_name, ref_id, debit, credit))
-        
-            tree.insert("", "end", values=("", "", "Total", total_debit, total_credit))
-        except Exception as e:
-            Messagebox.show_error(message=f"Error searching ledger: {str(e)}", title="Error", parent=self)
 
+        # Without a date the trial balance comes from ledger_current
+        tb_date = from_date or None
+        run_in_background(
+            self,
+            lambda session: AccountingController.get_trial_balance(session, tb_date=tb_date),
+            self.render_trial_balance,
+            lambda e: Messagebox.show_error(message=f"Error searching ledger: {str(e)}", title="Error", parent=self)
+        )
+
+    def render_trial_balance(self, result_rows):
+        """Rebuild the trial balance table from the fetched rows."""
+        # Clear previous table
+        for widget in self.table_frame.winfo_children():
+            widget.destroy()
+
+        # Set up Treeview
+        columns = ("sl", "particular", "Ref. No", "debit", "credit")
+        tree = ttk.Treeview(
+            self.table_frame, columns=columns, show="headings", height=10, bootstyle="primary"
+        )
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        for col in columns:
+            tree.heading(col, text=col.capitalize())
+            tree.column(col, anchor="center")
+
+        # Populate rows
+        for values in trial_balance_table(result_rows).rows:
+            tree.insert("", "end", values=values)
@@ -6,6 +6,7 @@ from models.BankAccount import BankAccount
 from utils.database import Session
 from datetime import datetime
 from models.acc_head_of_accounts import AccHeadOfAccounts
+from utils import reference_data
 
 class CreateBankAccountView(ttk.Frame):
     def __init__(self, parent, existing_bank_account=None):
@@ -134,6 +135,7 @@ class CreateBankAccountView(ttk.Frame):
             
             # Commit all changes
             session.commit()
+            reference_data.refresh(reference_data.BANKS, reference_data.HEADS)
             session.close()
 
             ttk.dialogs.Messagebox.show_info(message=message, title="Success", parent=self)
@@ -4,6 +4,7 @@ from tkinter import messagebox
 from sqlalchemy.orm import sessionmaker
 from models.BankAccount import BankAccount
 from utils.database import Session
+from utils import reference_data
 from views.bankAccount.create_bank_account_view import CreateBankAccountView
 
 class ListBankAccountView(ttk.Frame):
@@ -150,6 +151,7 @@ class ListBankAccountView(ttk.Frame):
             if bank_account:
                 session.delete(bank_account)
                 session.commit()
+                reference_data.refresh(reference_data.BANKS)
                 
                 # Refresh the list
                 self.load_bank_accounts()
@@ -3,6 +3,7 @@ from ttkbootstrap.constants import *
 from ttkbootstrap.dialogs import Messagebox
 from models.BankAccount import BankAccount
 from utils.database import Session
+from utils import reference_data
 
 
 class ListOfBankAccountView(ttk.Frame):
@@ -163,6 +164,7 @@ class ListOfBankAccountView(ttk.Frame):
                 if result == "Yes":
                     session.delete(account_to_delete)
                     session.commit()
+                    reference_data.refresh(reference_data.BANKS)
 
                     # Refresh bank account list
                     self.load_bank_accounts()
@@ -11,10 +11,12 @@ from models.bill_info import BillInfo
 from models.bill_due import BillDue
 from models.bill_particular import BillParticular
 import traceback
+from utils import reference_data
 from models.bill_collection import BillCollection
 from models.shop_allocation import ShopAllocation
 from ttkbootstrap.dialogs import Messagebox
 from controllers.accounting_controller import AccountingController
+from controllers.billing_fact_controller import BillingFactController
 from decimal import Decimal
 
 
@@ -137,21 +139,14 @@ class CreateBillCollectionView(Frame):
 
     def load_shops(self):
         try:
-            session = Session()
-            shops = session.query(ShopProfile).all()
-            print(f"Shops: {shops}")
-            self.shops_dict = {shop.shop_name: shop.id for shop in shops}
-            session.close()
+            self.shops_dict = {shop.shop_name: shop.id for shop in reference_data.shops()}
         except Exception as e:
             print(f"Error loading shops: {str(e)}")
             self.shops_dict = {}
 
     def load_banks(self):
         try:
-            session = Session()
-            banks = BankAccount.get_banks()
-            self.bank_dict = {bank.bank_name: bank.id for bank in banks}
-            session.close()
+            self.bank_dict = {bank.bank_name: bank.id for bank in reference_data.banks()}
         except Exception as e:
             print(f"Error loading banks: {str(e)}")
             self.bank_dict = {}
@@ -654,6 +649,7 @@ class CreateBillCollectionView(Frame):
             #     renter_profile_id = None
 
             teant_amount = 0
+            journal_lines = []
             
             # ? UPDATE BILL PARTICULARS AND CREATE COLLECTION PARTICULARS
             for idx, particular in enumerate(bill_particulars):
@@ -695,7 +691,7 @@ class CreateBillCollectionView(Frame):
                             drHeadId = head.id if head else 1 
 
                         if particular.bill_particular == "House Rent":
-                            self.insert_house_rent_to_accounting(session, collection, pay_now, data)
+                            self.insert_house_rent_to_accounting(session, collection, pay_now, data, journal_lines)
                             continue
                         elif particular.bill_particular == "Common Area Maintenance":
                             crHeadId = 28
@@ -709,7 +705,7 @@ class CreateBillCollectionView(Frame):
                             crHeadId = 10
 
                         # Collection Debit Entry
-                        AccountingController.manage_transaction(session, [
+                        journal_lines.append([
                             "+", "insert", drHeadId, collection.id,
                             collection.trans_date, pay_now, 
                             bank_id, '1', None,
@@ -733,7 +729,7 @@ class CreateBillCollectionView(Frame):
                         )
 
                         # Rent Income Credit Entry
-                        AccountingController.manage_transaction(session, [
+                        journal_lines.append([
                             "-", "insert", crHeadId, collection.id,
                             collection.trans_date, pay_now, 
                             None, '1', None,
@@ -745,6 +741,9 @@ class CreateBillCollectionView(Frame):
                     print(f"Error processing row {idx}: {str(e)}")
                     continue
 
+            # ? POST THE WHOLE COLLECTION VOUCHER AT ONCE
+            AccountingController.post_batch(session, journal_lines)
+
             # ? UPDATE BILL COLLECTION WITH ACTUAL PAID AMOUNT
             collection.pay_amount = total_paid
             collection.due_amount = Decimal(data['trans_amount']) - total_paid
@@ -760,6 +759,8 @@ class CreateBillCollectionView(Frame):
             # Create accounting entries
             # self.create_accounting_entries(session, collection, total_paid, data)
 
+            BillingFactController.refresh_bills(session, [collection.bill_id])
+
             session.commit()
             Messagebox.show_info("Collection saved successfully!", "Success")
             self.collection_form.destroy()
@@ -781,7 +782,7 @@ class CreateBillCollectionView(Frame):
     # insert to accounting table
 
     # House Rent
-    def insert_house_rent_to_accounting(self, session, collection, amount, data):
+    def insert_house_rent_to_accounting(self, session, collection, amount, data, journal_lines):
 
         # ? INSERT TO ACCOUNTING TABLE
         drHeadId, crHeadId, tdsDrHeadId, drRentPrvHeadId = 7, 6, 35, 21  
@@ -803,7 +804,7 @@ class CreateBillCollectionView(Frame):
 
         # Collection Debit Entry
         # ? INSERT TO THE BANK HEAD OR CASH HEAD @DEBIT
-        AccountingController.manage_transaction(session, [
+        journal_lines.append([
             "+", "insert", drHeadId, collection.id,
             collection.trans_date, cashOrBankAmount, 
             bank_id, '1', None,
@@ -812,7 +813,7 @@ class CreateBillCollectionView(Frame):
         ])
 
         # ? INSERT TO THE TDS HEAD @DEBIT
-        AccountingController.manage_transaction(session, [
+        journal_lines.append([
             "+", "insert", tdsDrHeadId, collection.id,
             collection.trans_date, tdsOfficeRentAmount, 
             bank_id, '1', None,
@@ -821,7 +822,7 @@ class CreateBillCollectionView(Frame):
         ])
 
         # ? INSERT TO RECEIVABLE HEAD FOR RENT @CREDIT
-        AccountingController.manage_transaction(session, [
+        journal_lines.append([
             "+", "insert", crHeadId, collection.id,
             collection.trans_date, receivableHeadForRent, 
             drHeadId, '1', None,
@@ -838,7 +839,7 @@ class CreateBillCollectionView(Frame):
         payableToOwner = amount * 0.90 # 90%
 
         # ? Provisional for rent @DEBIT
-        AccountingController.manage_transaction(session, [
+        journal_lines.append([
             "+", "insert", drRentPrvHeadId, collection.id,
             collection.trans_date, provisionalOfficeRentAmount, 
             bank_id, '1', None,
@@ -847,7 +848,7 @@ class CreateBillCollectionView(Frame):
         ])
 
         # ? TDS FOR RENT @CREDIT
-        AccountingController.manage_transaction(session, [
+        journal_lines.append([
             "+", "insert", tdsCrHeadId, collection.id,
             collection.trans_date, prvTDSOfficeRentAmount, 
             None, '1', None,
@@ -856,7 +857,7 @@ class CreateBillCollectionView(Frame):
         ])
 
         # ? REVENUE FOR RENT COMMISSION @CREDIT
-        AccountingController.manage_transaction(session, [
+        journal_lines.append([
             "+", "insert", crRentRevenueHeadId, collection.id,
             collection.trans_date, revenueRentCommission, 
             None, '1', None,
@@ -865,7 +866,7 @@ class CreateBillCollectionView(Frame):
         ])
 
         # ? PAYABLE TO OWNER @CREDIT
-        AccountingController.manage_transaction(session, [
+        journal_lines.append([
             "+", "insert", crPaybleOwnerHeadId, collection.id,
             collection.trans_date, payableToOwner, 
             None, '1', None,
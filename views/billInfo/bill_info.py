@@ -11,11 +11,11 @@ from tkinter.messagebox import showinfo, showerror
 
 # PDF GENERATION
 import os
-import subprocess
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 
-from fpdf import FPDF
+from reports.bill_pdf import bill_filename, load_bill, render_combined
+from reports.writers import downloads_path, open_file
 
 class BillDetailView(ttk.Frame):
     def __init__(self, parent, bill_id):
@@ -172,155 +172,12 @@ class BillDetailView(ttk.Frame):
     def print_bill(self):
         session = Session()
         try:
-            self.bill_data = session.query(BillInfo).filter_by(id=self.bill_id).first()
-            if not self.bill_data:
+            bill = load_bill(session, self.bill_id)
+            if not bill:
                 raise ValueError(f"Bill with ID {self.bill_id} not found")
 
-            shop = session.query(ShopProfile).filter_by(id=self.bill_data.shop_id).first()
-            downloads_path = os.path.join(os.path.expanduser("~"), "Downloads")
-            filename = os.path.join(downloads_path, f"bill_{shop.shop_no}.pdf")
-
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_auto_page_break(auto=True, margin=15)
-            font_path = os.path.join("fonts", "NotoSansBengali-Regular.ttf")
-            pdf.add_font("Noto", "", font_path, uni=True)
-
-            # Header
-            pdf.set_font("Noto", "", 16)
-            pdf.cell(0, 10, "GLOBAL CITY MANAGEMENT", ln=True, align="C")
-            pdf.set_font("Noto", "", 8)
-            pdf.cell(0, 5, "Bali Arcade, 227, Nawab Serajuddawla Road, Chwakbazar, Chattogram", ln=True, align="C")
-
-            # Setup font
-            pdf.set_font("Courier", "", 10)
-
-            # Setup data
-            left_column = [
-                f"{shop.shop_name}" if shop else "Shop Info: N/A",
-                f"Floor {shop.floor_no}, Shop {shop.shop_no}" if shop else ""
-            ]
-
-            right_column = [
-                ("Bill Date:", self.bill_data.bill_date.strftime("%Y-%m-%d") if self.bill_data.bill_date else "N/A"),
-                ("Billing Period:", f"{self.bill_data.bill_month}/{self.bill_data.bill_year}"),
-                ("Status:", "Paid" if self.bill_data.status == 2 else "Pending")
-            ]
-
-            # Ensure the columns have the same number of lines
-            max_lines = max(len(left_column), len(right_column))
-            while len(left_column) < max_lines:
-                left_column.append("")
-            while len(right_column) < max_lines:
-                right_column.append(("", ""))
-
-            # Column widths
-            left_col_width = 90
-            right_label_width = 30
-            right_value_width = 70
-
-            # Draw rows
-            for i in range(max_lines):
-                # Bold only for first line (shop name)
-                if i == 0:
-                    pdf.set_font("Courier", "B", 10)
-                else:
-                    pdf.set_font("Courier", "", 10)
-
-                pdf.cell(left_col_width, 8, left_column[i], border=0)
-
-                # Right side (always regular)
-                label, value = right_column[i]
-                pdf.set_font("Courier", "", 10)
-                pdf.cell(right_label_width, 8, label, border=0)
-                pdf.cell(right_value_width, 8, value, border=0, ln=True)
-
-
-
-            # Summary Table (4-column format)
-            pdf.ln(5)
-            pdf.set_font("Noto", "", 12)
-            pdf.cell(0, 10, "Bill Summary", ln=True, align="C")
-            pdf.set_font("Noto", "", 10)
-
-            def add_summary_row(label1, value1, label2, value2):
-                val1 = str(value1 if value1 is not None else "N/A")
-                val2 = str(value2 if value2 is not None else "N/A")
-                pdf.cell(50, 8, label1, border=0)
-                pdf.cell(45, 8, val1, border=0)
-                pdf.cell(50, 8, label2, border=0)
-                pdf.cell(45, 8, val2, border=0)
-                pdf.ln()
-
-            add_summary_row("Bill Date:", self.bill_data.bill_date.strftime("%Y-%m-%d") if self.bill_data.bill_date else "N/A",
-                            "Billing Period:", f"{self.bill_data.bill_month}/{self.bill_data.bill_year}")
-            add_summary_row("Status:", "Paid" if self.bill_data.status == 2 else "Pending",
-                            "Electricity Op:", self.bill_data.elect_op_unit)
-            add_summary_row("Electricity Cl:", self.bill_data.elect_closing_unit,
-                            "Demand Charge:", shop.elect_demand_chrge if shop else "N/A")
-            add_summary_row("Gas Opening:", self.bill_data.gas_op_unit,
-                            "Gas Closing:", self.bill_data.gas_closing_unit)
-            add_summary_row("Rent Amount:", f"{shop.rent_amount:.2f} BDT" if shop and shop.rent_amount else "N/A",
-                            "Previous Due:", f"{self.bill_data.prev_due:.2f} BDT" if self.bill_data.prev_due else "N/A")
-            add_summary_row("Current Charges:", f"{self.bill_data.bill_amount:.2f} BDT" if self.bill_data.bill_amount else "N/A",
-                            "Total Payable:", f"{self.bill_data.cur_due:.2f} BDT" if self.bill_data.cur_due else "N/A")
-            add_summary_row("Last Pay Date:", self.bill_data.last_pay_date.strftime("%Y-%m-%d") if self.bill_data.last_pay_date else "N/A",
-                            "Last Pay Amount:", f"{self.bill_data.pay_amount:.2f} BDT" if self.bill_data.pay_amount else "N/A")
-
-            # Billing Description Table
-            # pdf.set_font("Noto", "", 12)
-            # pdf.cell(0, 10, "Billing Description", ln=True)
-            # pdf.set_font("Noto", "", 10)
-
-            pdf.set_font("Noto", "", 10)
-            pdf.set_fill_color(200, 200, 200)
-            pdf.cell(10, 8, "No", border=1, align="C", fill=True)
-            pdf.cell(70, 8, "Particular", border=1, align="L", fill=True)
-            pdf.cell(20, 8, "Qty", border=1, align="C", fill=True)
-            pdf.cell(30, 8, "Rate (৳)", border=1, align="R", fill=True)
-            pdf.cell(30, 8, "Subtotal (৳)", border=1, align="R", fill=True)
-            pdf.ln()
-
-            particulars = session.query(BillParticular).filter_by(bill_id=self.bill_id).all()
-            grand_total = 0.0
-
-            if particulars:
-                for i, p in enumerate(particulars, start=1):
-                    pdf.cell(10, 8, str(i), border=1, align="C")
-                    pdf.cell(70, 8, p.bill_particular, border=1)
-                    qty_unit = f"{p.bill_qty} {p.bill_unit}"
-                    pdf.cell(20, 8, qty_unit, border=1, align="C")
-                    pdf.cell(30, 8, f"{p.bill_rate:.2f}", border=1, align="R")
-                    pdf.cell(30, 8, f"{ float(p.bill_qty) * float(p.bill_rate):.2f}", border=1, align="R")
-                    pdf.ln()
-                    grand_total += float(p.bill_qty) * float(p.bill_rate)
-
-                # Grand Total row
-                pdf.set_font("Noto", "", 10)
-                pdf.set_fill_color(230, 230, 230)
-                pdf.cell(130, 8, "Grand Total", border=1, align="R", fill=True)
-                pdf.cell(30, 8, f"{grand_total:.2f}", border=1, align="R", fill=True)
-                pdf.ln()
-
-            else:
-                pdf.cell(0, 8, "No particulars found", ln=True)
-
-                
-            # Footer
-            pdf.set_font("Noto", "", 8)
-            pdf.ln(10)
-            pdf.cell(0, 8, f"Generated by {self.bill_data.bill_gen_by} on {self.bill_data.bill_gen_at.strftime('%Y-%m-%d %H:%M') if self.bill_data.bill_gen_at else 'N/A'}", ln=True)
-
-            # Save PDF
-            pdf.output(filename)
-
-            # Open the PDF (platform-specific)
-            if os.name == 'posix':
-                subprocess.run(['open', filename])  # macOS
-            elif os.name == 'nt':
-                os.startfile(filename)  # Windows
-            else:
-                subprocess.run(['xdg-open', filename])  # Linux
+            filename = render_combined([bill], downloads_path(bill_filename(bill)))
+            open_file(filename)
 
             showinfo("Print Success", f"PDF saved to Downloads:\n{filename}")
 
@@ -5,10 +5,12 @@ from models.bill_info import BillInfo
 from models.shop_profile import ShopProfile
 from models.bill_particular import BillParticular
 from utils.database import Session
+from utils.virtual_tree import VirtualTreeview, FilterBar
 import tkinter as tk
 from views.billInfo.create_bill import CreateBillInfoView
 from views.billInfo.bill_info import BillDetailView
 from sqlalchemy.orm import joinedload
+from controllers.billing_fact_controller import BillingFactController
 
 class BillInfoListView(ttk.Frame):
     def __init__(self, parent):
@@ -34,14 +36,35 @@ class BillInfoListView(ttk.Frame):
             "Total Amount", "Previous Due", "Status", "View", "Edit", "Delete"
         )
         
-        self.tree = ttk.Treeview(
+        self.tree = VirtualTreeview(
             self,
+            query_fn=self.fetch_bill_infos,
+            row_values=self.bill_info_values,
+            row_tags=lambda row: ("clickable",),
+            sort_columns={
+                "ID": BillInfo.id,
+                "Shop": ShopProfile.shop_name,
+                "Year": BillInfo.bill_year,
+                "Month": BillInfo.bill_month,
+                "Total Amount": BillInfo.bill_amount,
+                "Previous Due": BillInfo.prev_due,
+                "Status": BillInfo.status,
+            },
+            filter_columns={
+                "Shop": ShopProfile.shop_name,
+                "Shop No": ShopProfile.shop_no,
+                "Year": BillInfo.bill_year,
+                "Month": BillInfo.bill_month,
+                "ID": BillInfo.id,
+            },
+            order_by=(BillInfo.id.desc(),),
             bootstyle="primary",
             columns=columns,
             show="headings",
             height=15,
             style="ActionTree.Treeview"
         )
+        self.tree.on_error = lambda e: Messagebox.show_error(f"Error loading bills: {str(e)}", "Database Error")
 
         # Configure columns
         col_widths = [50, 150, 60, 60, 100, 100, 80, 60, 60, 60]
@@ -56,12 +79,13 @@ class BillInfoListView(ttk.Frame):
         self.tree.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
 
         # Grid layout (keep this for proper scrolling)
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        yscroll.grid(row=0, column=1, sticky="ns")
-        xscroll.grid(row=1, column=0, sticky="ew")
+        FilterBar(self, self.tree).grid(row=0, column=0, columnspan=2, pady=(0, 5), sticky="ew")
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        yscroll.grid(row=1, column=1, sticky="ns")
+        xscroll.grid(row=2, column=0, sticky="ew")
 
         # Configure grid weights
-        self.grid_rowconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
         # Configure style for action columns
@@ -79,7 +103,7 @@ class BillInfoListView(ttk.Frame):
 
         # Add buttons frame below the treeview
         button_frame = ttk.Frame(self)
-        button_frame.grid(row=2, column=0, columnspan=2, pady=10, sticky="ew")
+        button_frame.grid(row=3, column=0, columnspan=2, pady=10, sticky="ew")
 
         # Buttons remain the same
         ttk.Button(
@@ -104,38 +128,32 @@ class BillInfoListView(ttk.Frame):
         ).pack(side="left", padx=5)
 
     def load_bill_infos(self):
-        """Load bills from database"""
-        # Clear existing data
-        self.tree.delete(*self.tree.get_children())
-        
-        try:
-            session = Session()
-            bills = session.query(BillInfo).all()
-            
-            for bill in bills:
-                shop = session.query(ShopProfile).filter_by(id=bill.shop_id).first()
-                shop_name = f"{shop.shop_name} ({shop.shop_no})" if shop else "N/A"
-                
-                self.tree.insert("", "end", values=(
-                    bill.id,
-                    shop_name,
-                    bill.bill_year,
-                    bill.bill_month,
-                    f"৳{bill.bill_amount:.2f}" if bill.bill_amount is not None else "N/A",
-                    f"৳{bill.prev_due:.2f}" if bill.prev_due is not None else "N/A",
-                    "Paid" if bill.status == 1 else "Pending",
-                    "👁 View",
-                    "✎ Edit", 
-                    "🗑 Delete"
-                ), tags=("clickable",))
+        """Reload bills a page at a time from the database"""
+        # Configure clickable style
+        self.tree.tag_configure("clickable", foreground="#007bff")
+        self.tree.reload()
 
+    def fetch_bill_infos(self, session):
+        """Bills with their shop in one query, paged by the tree (runs on a worker thread)."""
+        return session.query(BillInfo, ShopProfile.shop_name, ShopProfile.shop_no) \
+            .outerjoin(ShopProfile, ShopProfile.id == BillInfo.shop_id)
 
-            # Configure clickable style
-            self.tree.tag_configure("clickable", foreground="#007bff")
-            
-            session.close()
-        except Exception as e:
-            Messagebox.show_error(f"Error loading bills: {str(e)}", "Database Error")
+    @staticmethod
+    def bill_info_values(row):
+        bill, shop_name, shop_no = row
+        shop_name = f"{shop_name} ({shop_no})" if shop_name is not None else "N/A"
+        return (
+            bill.id,
+            shop_name,
+            bill.bill_year,
+            bill.bill_month,
+            f"৳{bill.bill_amount:.2f}" if bill.bill_amount is not None else "N/A",
+            f"৳{bill.prev_due:.2f}" if bill.prev_due is not None else "N/A",
+            "Paid" if bill.status == 1 else "Pending",
+            "👁 View",
+            "✎ Edit",
+            "🗑 Delete"
+        )
 
     # Add these new methods to your class
     def on_tree_hover(self, event):
@@ -190,6 +208,7 @@ class BillInfoListView(ttk.Frame):
                 bill = session.query(BillInfo).filter_by(id=bill_id).first()
                 if bill:
                     session.delete(bill)
+                    BillingFactController.refresh_periods(session, [(bill.shop_id, bill.bill_year, bill.bill_month)])
                     session.commit()
                     self.load_bill_infos()
                 session.close()
@@ -287,6 +306,7 @@ class BillInfoListView(ttk.Frame):
             bill = session.query(BillInfo).filter_by(id=bill_id).first()
             if bill:
                 session.delete(bill)
+                BillingFactController.refresh_periods(session, [(bill.shop_id, bill.bill_year, bill.bill_month)])
                 session.commit()
                 self.load_bill_infos()
             session.close()
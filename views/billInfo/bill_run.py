@@ -0,0 +1,192 @@
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from ttkbootstrap.dialogs import Messagebox
+from tkinter import filedialog
+from datetime import datetime
+from controllers.bill_run_controller import BillRunController, load_readings
+from utils.query_executor import run_in_background
+from reports.bill_pdf import load_month, render_combined
+from reports.writers import downloads_path, open_file
+
+
+class BillRunView(ttk.Frame):
+    """Preview and generate the month's bills for every active shop allocation."""
+
+    def __init__(self, parent):
+        super().__init__(parent, padding=10)
+        self.parent = parent
+        self.readings = None
+        self.preview = None
+
+        self.month_names = [
+            "January", "February", "March", "April", "May", "June",
+            "July", "August", "September", "October", "November", "December"
+        ]
+
+        style = ttk.Style()
+        style.configure("TFrame", background="white")
+        style.configure("TLabel", background="white")
+
+        ttk.Label(self, text="Monthly Bill Run", font=("Helvetica", 16, "bold"), bootstyle="primary").pack(pady=(0, 10))
+
+        form = ttk.Frame(self)
+        form.pack(fill="x")
+        label_style = {"bootstyle": "primary", "font": ("Helvetica", 10)}
+
+        ttk.Label(form, text="Bill Year:", **label_style).grid(row=0, column=0, sticky="w", padx=5)
+        self.bill_year_entry = ttk.Entry(form, width=8)
+        self.bill_year_entry.grid(row=1, column=0, sticky="ew", padx=5)
+        self.bill_year_entry.insert(0, datetime.now().year)
+
+        ttk.Label(form, text="Bill Month:", **label_style).grid(row=0, column=1, sticky="w", padx=5)
+        self.bill_month_combobox = ttk.Combobox(form, values=self.month_names, state="readonly", width=12)
+        self.bill_month_combobox.grid(row=1, column=1, sticky="ew", padx=5)
+        self.bill_month_combobox.set(self.month_names[datetime.now().month - 1])
+
+        ttk.Label(form, text="Bill Date:", **label_style).grid(row=0, column=2, sticky="w", padx=5)
+        self.bill_date_entry = ttk.DateEntry(form, dateformat="%Y-%m-%d", width=12)
+        self.bill_date_entry.grid(row=1, column=2, sticky="ew", padx=5)
+
+        ttk.Label(form, text="Last Pay Date:", **label_style).grid(row=0, column=3, sticky="w", padx=5)
+        self.last_pay_date_entry = ttk.DateEntry(form, dateformat="%Y-%m-%d", width=12)
+        self.last_pay_date_entry.grid(row=1, column=3, sticky="ew", padx=5)
+
+        readings_frame = ttk.Frame(self)
+        readings_frame.pack(fill="x", pady=10)
+        ttk.Button(readings_frame, text="Load Meter Readings (CSV)", command=self.choose_readings,
+                   bootstyle="secondary-outline").pack(side="left", padx=5)
+        self.readings_label = ttk.Label(readings_frame, text="No readings loaded, utilities bill at 0 units")
+        self.readings_label.pack(side="left", padx=5)
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill="x")
+        ttk.Button(button_frame, text="Preview", command=self.preview_run, bootstyle="info").pack(side="left", padx=5)
+        self.generate_button = ttk.Button(button_frame, text="Generate Bills", command=self.generate_bills,
+                                          bootstyle="warning", state="disabled")
+        self.generate_button.pack(side="left", padx=5)
+        self.print_button = ttk.Button(button_frame, text="Print Month's Bills", command=self.print_bills,
+                                       bootstyle="secondary")
+        self.print_button.pack(side="left", padx=5)
+        self.summary_label = ttk.Label(button_frame, text="", font=("Helvetica", 10, "bold"))
+        self.summary_label.pack(side="right", padx=5)
+
+        # Demand: the shop's demand charge, shown in the bill form's total but not billed
+        columns = ("Shop", "Electricity", "WASA", "Gas", "Internet", "House Rent", "Total", "Demand", "Note")
+        self.bill_tree = ttk.Treeview(self, columns=columns, show="headings", height=10, bootstyle="primary")
+        for column in columns:
+            self.bill_tree.heading(column, text=column)
+            self.bill_tree.column(column, width=160 if column in ("Shop", "Note") else 80,
+                                  anchor="w" if column in ("Shop", "Note") else "e")
+        self.bill_tree.pack(fill="both", expand=True, pady=(10, 5))
+
+        ttk.Label(self, text="Errors", font=("Helvetica", 10, "bold"), bootstyle="danger").pack(anchor="w")
+        self.error_tree = ttk.Treeview(self, columns=("Shop", "Error"), show="headings", height=5, bootstyle="danger")
+        self.error_tree.heading("Shop", text="Shop")
+        self.error_tree.heading("Error", text="Error")
+        self.error_tree.column("Shop", width=160, anchor="w")
+        self.error_tree.column("Error", width=420, anchor="w")
+        self.error_tree.pack(fill="both", expand=True)
+
+    def get_period(self):
+        bill_year = int(self.bill_year_entry.get())
+        bill_month = self.month_names.index(self.bill_month_combobox.get()) + 1
+        return bill_year, bill_month
+
+    def choose_readings(self):
+        path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")], parent=self)
+        if not path:
+            return
+        try:
+            self.readings = load_readings(path)
+            self.readings_label.config(text=f"{len(self.readings)} meter readings loaded")
+            self.generate_button.config(state="disabled")
+        except Exception as e:
+            Messagebox.show_error(f"Error reading meter readings: {str(e)}", "Error", parent=self)
+
+    def start_run(self, dry_run):
+        try:
+            bill_year, bill_month = self.get_period()
+            bill_date = datetime.strptime(self.bill_date_entry.entry.get(), "%Y-%m-%d")
+            last_pay_date = datetime.strptime(self.last_pay_date_entry.entry.get(), "%Y-%m-%d")
+        except ValueError:
+            Messagebox.show_error("Invalid year or date", "Validation Error", parent=self)
+            return
+
+        run_in_background(
+            self,
+            lambda session: BillRunController.run(
+                bill_year, bill_month, bill_date, last_pay_date, self.readings, dry_run=dry_run
+            ),
+            self.render_result,
+            lambda e: Messagebox.show_error(f"Error running bills: {str(e)}", "Error", parent=self)
+        )
+
+    def preview_run(self):
+        self.start_run(dry_run=True)
+
+    def generate_bills(self):
+        if self.preview is None or self.preview.errors and Messagebox.yesno(
+            f"{len(self.preview.errors)} shops have errors and will be skipped. Continue?", "Bill Run", parent=self
+        ) != "Yes":
+            return
+        self.generate_button.config(state="disabled")
+        self.start_run(dry_run=False)
+
+    def render_result(self, result):
+        self.bill_tree.delete(*self.bill_tree.get_children())
+        self.error_tree.delete(*self.error_tree.get_children())
+
+        for bill in result.bills:
+            amounts = {p["bill_particular"]: p["sub_amount"] for p in bill.particulars}
+            note = "; ".join(bill.warnings)
+            if not result.dry_run:
+                note = f"Bill #{bill.bill_id}" if bill.bill_id else "Not written"
+            self.bill_tree.insert("", "end", values=(
+                bill.shop_label,
+                *(f"{amounts.get(name, 0):.2f}" for name in ("Electricity", "WASA", "Gas", "Internet", "House Rent")),
+                f"{bill.total:.2f}",
+                f"{bill.demand_charge:.2f}",
+                note,
+            ))
+        for shop_id, shop_label, message in result.errors:
+            self.error_tree.insert("", "end", values=(shop_label, message))
+
+        self.summary_label.config(
+            text=f"{len(result.bills)} bills, total ৳{result.total_amount:.2f} "
+                 f"(demand charges ৳{result.total_demand_charge:.2f} not billed), {len(result.errors)} errors, "
+                 f"tariff {result.tariff_version}"
+        )
+        if result.dry_run:
+            self.preview = result
+            self.generate_button.config(state="normal" if result.bills else "disabled")
+        else:
+            self.preview = None
+            Messagebox.show_info(f"{result.written} bills generated.", "Bill Run", parent=self)
+
+    def print_bills(self):
+        """Every bill of the period as one PDF in Downloads, a page per shop."""
+        try:
+            bill_year, bill_month = self.get_period()
+        except ValueError:
+            Messagebox.show_error("Invalid year", "Validation Error", parent=self)
+            return
+
+        def render(session):
+            bills = load_month(session, bill_year, bill_month)
+            if not bills:
+                return None
+            return render_combined(bills, downloads_path(f"bills_{bill_year}-{bill_month:02d}.pdf"))
+
+        self.print_button.config(state="disabled")
+        run_in_background(self, render, self.on_bills_printed, self.on_print_failed)
+
+    def on_bills_printed(self, path):
+        self.print_button.config(state="normal")
+        if path is None:
+            Messagebox.show_info("No bills for this period.", "Print Bills", parent=self)
+            return
+        open_file(path)
+
+    def on_print_failed(self, error):
+        self.print_button.config(state="normal")
+        Messagebox.show_error(f"Error printing bills: {str(error)}", "Error", parent=self)
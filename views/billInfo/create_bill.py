@@ -13,7 +13,11 @@ from models.shop_allocation import ShopAllocation
 from functools import partial
 import traceback
 from controllers.accounting_controller import AccountingController
+from controllers.bill_run_controller import BILL_PARTICULAR_HEADS, bill_journal_lines
+from controllers.billing_fact_controller import BillingFactController
 from utils.session_scope import session_scope
+from utils.draft_buffer import DraftBuffer
+from utils import reference_data
 from decimal import Decimal
 
 class CreateBillInfoView(ttk.Frame):
@@ -22,6 +26,9 @@ class CreateBillInfoView(ttk.Frame):
         self.parent = parent
         self.existing_bill_info = existing_bill_info
         self.bill_particulars = []
+        # In-memory drafts of the selected shop/period, written back in batches
+        self.draft_buffer = None
+        self.bind("<Destroy>", self.on_destroy, add="+")
         
         # Month mapping
         self.month_names = [
@@ -86,12 +93,10 @@ class CreateBillInfoView(ttk.Frame):
 
     def load_shops(self):
         try:
-            session = Session()
-            shops = session.query(ShopProfile).filter_by(active_status=1).all()
+            shops = reference_data.shops(active_only=True)
             shop_items = [f"{shop.shop_name} - {shop.shop_no}" for shop in shops]
             self.shop_combobox['values'] = shop_items
             self.shops_dict = {f"{shop.shop_name} - {shop.shop_no}": shop.id for shop in shops}
-            session.close()
         except Exception as e:
             Messagebox.show_error(message=f"Error loading shops: {str(e)}", title="Error", parent=self)
 
@@ -217,8 +222,8 @@ class CreateBillInfoView(ttk.Frame):
                 index = 0
             # Directly use the already-loaded particulars
                 for particular in self.existing_bill_info.particulars:
+                    # Rows of a saved bill are not in the draft buffer yet; the first edit adds them
                     self.add_particular_row(
-                        draft_id=particular.id,
                         particular=particular.bill_particular,
                         qty=str(particular.bill_qty),
                         unit=particular.bill_unit,
@@ -430,32 +435,35 @@ class CreateBillInfoView(ttk.Frame):
         finally:
             session.close()
 
-    def handle_update_particular_draft_raw(self, draft_id="", particular="", qty="", unit="", rate="", subtotal="0.0"):
-        if hasattr(draft_id, 'id'):  # Fix if draft_id is a SQLAlchemy object
-            draft_id = draft_id.id
-
-        session = Session()
-        try:
-            particular_draft = session.query(BillParticularDraft).filter_by(id=draft_id).first()
-            if not particular_draft:
-                print(f"No draft found with ID: {draft_id}")
-                return
-
-            particular_draft.bill_particular = particular
-            particular_draft.bill_qty = qty
-            particular_draft.bill_unit = unit
-            particular_draft.bill_rate = rate
-            particular_draft.sub_amount = subtotal
-
-            session.commit()
-            print(f"Draft {draft_id} updated successfully.")
-        except Exception as err:
-            print(f"ERROR while updating draft {draft_id}: {err}")
-            session.rollback()
-        finally:
-            session.close()
+    def get_draft_buffer(self, shop_id):
+        """Drafts of the selected shop and period, loaded once and kept in memory."""
+        bill_month = self.get_month_number(self.bill_month_combobox.get())
+        bill_year = int(self.bill_year_entry.get())
+        if self.draft_buffer is None or not self.draft_buffer.matches(shop_id, bill_month, bill_year):
+            if self.draft_buffer is not None:
+                self.draft_buffer.flush()
+            self.draft_buffer = DraftBuffer(self, shop_id, bill_month, bill_year).load()
+        return self.draft_buffer
+
+    def on_destroy(self, event):
+        if event.widget is self and self.draft_buffer is not None:
+            try:
+                self.draft_buffer.flush()
+            except Exception as e:
+                print(f"Error saving bill particular drafts: {e}")
 
-    def add_particular_row(self, draft_id="", particular="", qty="", unit="", rate=""):
+    def handle_update_particular_draft_raw(self, draft_id="", particular="", qty="", unit="", rate="", subtotal="0.0"):
+        if self.draft_buffer is None or self.draft_buffer.update(
+            draft_id,
+            bill_particular=particular,
+            bill_qty=qty,
+            bill_unit=unit,
+            bill_rate=rate,
+            sub_amount=subtotal
+        ) is None:
+            print(f"No draft found with ID: {draft_id}")
+
+    def add_particular_row(self, draft_key=None, particular="", qty="", unit="", rate=""):
         # Preelauch
         # get shop id
         shop_selection = self.shop_combobox.get()
@@ -473,9 +481,6 @@ class CreateBillInfoView(ttk.Frame):
             Messagebox.show_error("Shop information not found", "Error", parent=self)
             return
         
-        # Get date info
-        bill_month = self.bill_month_combobox.get()
-        bill_year = int(self.bill_year_entry.get())
         row_frame = ttk.Frame(self.particulars_container)
         row_frame.pack(fill="x", pady=2, expand=True)
 
@@ -519,6 +524,10 @@ class CreateBillInfoView(ttk.Frame):
         )
         delete_btn.grid(row=0, column=5, padx=2)
 
+        drafts = self.get_draft_buffer(shop_id)
+        # A DraftBuffer key, never a database id: None until the row is in the buffer
+        row_key = [draft_key if draft_key in drafts.rows else None]
+
         def calculate_and_update_row(event=None):
             try:
                 q = float(qty_entry.get().strip() or 0)
@@ -528,62 +537,20 @@ class CreateBillInfoView(ttk.Frame):
                 amt = 0.0
 
             amount_var.set(f"{amt:.2f}")
-            self.update_total_amount()
 
-            if draft_id:
-                # Update existing
-                self.handle_update_particular_draft_raw(
-                    draft_id,
-                    particular_entry.get(),
-                    qty_entry.get(),
-                    unit_cb.get(),
-                    rate_entry.get(),
-                    amt
-                )
+            fields = {
+                "bill_particular": particular_entry.get(),
+                "bill_qty": qty_entry.get() or 0,
+                "bill_unit": unit_cb.get(),
+                "bill_rate": rate_entry.get() or 0,
+                "sub_amount": amt
+            }
+            if row_key[0] is None:
+                # First edit adds the row to the buffer, later ones update it
+                row_key[0] = drafts.add(**fields)
             else:
-                # Save new
-                new_id = BillParticularDraft.add_bill_particular_draft(
-                    shop_id=shop_id,
-                    head_id=None,
-                    bill_particular=particular_entry.get(),
-                    bill_qty=qty_entry.get(),
-                    bill_unit=unit_cb.get(),
-                    bill_rate=rate_entry.get(),
-                    sub_amount=amt,
-                    bill_month=bill_month,
-                    bill_year=bill_year
-                )
-
-
-
-                # Update delete button to work with new id
-                delete_btn.config(command=lambda rf=row_frame, did=new_id: self.delete_particular_row(rf, did))
-
-                # Attach update events like in display_draft_particulars
-                qty_entry.bind(
-                    '<FocusOut>',
-                    partial(
-                        self.handle_update_particular_draft_raw_event,
-                        new_id,
-                        particular_entry,
-                        qty_entry,
-                        unit_cb,
-                        rate_entry,
-                        amount_entry
-                    )
-                )
-                rate_entry.bind(
-                    '<FocusOut>',
-                    partial(
-                        self.handle_update_particular_draft_raw_event,
-                        new_id,
-                        particular_entry,
-                        qty_entry,
-                        unit_cb,
-                        rate_entry,
-                        amount_entry
-                    )
-                )
+                drafts.update(row_key[0], **fields)
+            self.update_total_amount()
 
         # Initial bindings for unsaved row
         qty_entry.bind('<FocusOut>', calculate_and_update_row)
@@ -591,34 +558,19 @@ class CreateBillInfoView(ttk.Frame):
         particular_entry.bind('<FocusOut>', calculate_and_update_row)
         unit_cb.bind("<<ComboboxSelected>>", calculate_and_update_row)
 
-        # Default delete behavior (no id yet)
-        delete_btn.config(command=lambda: row_frame.destroy())
+        delete_btn.config(command=lambda: self.delete_particular_row(row_frame, row_key[0]))
 
         # Initial calculation
         calculate_and_update_row()
     
     def delete_particular_row(self, row_frame, id):
-        if id:
-            # Only delete from DB if there's a valid ID
-            BillParticularDraft.delete_bill_particular_draft_by_id(id)
-            shop_selection = self.shop_combobox.get()
-            shop_id = self.shops_dict.get(shop_selection)
-            self.display_draft_particulars(shop_id)
-        else:
-            # Just remove the row from UI
-            row_frame.destroy()
-            self.update_total_amount()
+        if id and self.draft_buffer is not None:
+            self.draft_buffer.delete(id)
+        row_frame.destroy()
+        self.update_total_amount()
 
     def update_total_amount(self):
-        print("Updating total amount...")
-        total = 0.0
-        for child in self.particulars_container.winfo_children():
-            try:
-                amount_entry = child.winfo_children()[4]  # amount column
-                amt = float(amount_entry.get() or 0)
-                total += amt
-            except (ValueError, IndexError):
-                continue
+        total = self.draft_buffer.total() if self.draft_buffer is not None else 0.0
         self.total_amount_var.set(f"{total:.2f}")
 
     def show_shop_info(self):
@@ -670,6 +622,7 @@ class CreateBillInfoView(ttk.Frame):
                 return
 
             # Handle potential None values from database
+            self.tariff_version = UtilitySetting.get_tariff_version()
             utilities = {
                 'electricity': UtilitySetting.get_unit_price(7) or {'unit_price': 0.0, 'unit': 'UNIT'},
                 'wasa': UtilitySetting.get_unit_price(8) or {'unit_price': 0.0, 'unit': 'UNIT'},
@@ -701,9 +654,7 @@ class CreateBillInfoView(ttk.Frame):
             Messagebox.show_error(f"Error processing shop info: {str(e)}", "Error", parent=self)
 
     def save_draft_particulars(self, shop_id, calculations, utilities, total_amount, electricity_unit, gas_unit, wasa_unit):
-        bill_month = self.get_month_number(self.bill_month_combobox.get())
-        bill_year=int(self.bill_year_entry.get())
-        BillParticularDraft.clear_drafts(shop_id,bill_month,bill_year)
+        drafts = self.get_draft_buffer(shop_id)
         
         # print(f"bill month: {bill_month} Bill Year: {bill_year}")
         # print(f"utilities: {utilities}")
@@ -746,25 +697,22 @@ class CreateBillInfoView(ttk.Frame):
             )
         ]
         
+        rows = []
         for head_id, name, amount, unit, qty, vat, demand_charge in particulars:
             # Prevent division by zero
             rate = amount / qty if qty and qty != 0 else 0.0
-            BillParticularDraft.add_bill_particular_draft(
-                shop_id=shop_id,
-                head_id=head_id,
-                bill_particular=name,
-                bill_qty=qty,
-                bill_unit=unit,
-                bill_rate=rate,
-                sub_amount=amount,
-                bill_month=bill_month,
-                bill_year=bill_year,
-                vat=vat,
-                demand_charge=demand_charge
-                
-            )
-            
-            
+            rows.append({
+                "head_id": head_id,
+                "bill_particular": name,
+                "bill_qty": qty,
+                "bill_unit": unit,
+                "bill_rate": rate,
+                "sub_amount": amount,
+                "vat": vat,
+                "demand_charge": demand_charge
+            })
+        drafts.replace_all(rows)
+
     def handle_update_particular_draft_raw_event(self, draft_id, part_entry, qty_entry, unit_cb, rate_entry, amt_entry, event=None):
         try:
             self.handle_update_particular_draft_raw(
@@ -782,12 +730,10 @@ class CreateBillInfoView(ttk.Frame):
     def display_draft_particulars(self, shop_id):
         # print("Reapply")
         # Clear existing rows
-        session = Session()
         for child in self.particulars_container.winfo_children():
             child.destroy()
-        bill_month=self.get_month_number(self.bill_month_combobox.get())
-        bill_year=int(self.bill_year_entry.get())
-        drafts = BillParticularDraft.get_bill_particular_draft_by_shop_id(shop_id,bill_month,bill_year,session)
+        buffer = self.get_draft_buffer(shop_id)
+        drafts = buffer.ordered_rows()
         
         # change global total values to 0
         self.total_amount_var.set(f"{0.0:.2f}")
@@ -806,21 +752,21 @@ class CreateBillInfoView(ttk.Frame):
             row_frame.columnconfigure(5, weight=0)  # Action
             
             
-            setattr(self, f'particular_entry_{draft.id}', ttk.Entry(row_frame))
+            setattr(self, f'particular_entry_{draft["key"]}', ttk.Entry(row_frame))
 
-            particular_entry = getattr(self, f'particular_entry_{draft.id}')
+            particular_entry = getattr(self, f'particular_entry_{draft["key"]}')
             particular_entry.grid(row=0, column=0, sticky="ew", padx=2)
-            particular_entry.insert(0, draft.bill_particular)
+            particular_entry.insert(0, draft['bill_particular'])
 
             # Particular Entry
             # particular_entry = ttk.Entry(row_frame)
             # particular_entry.grid(row=0, column=0, sticky="ew", padx=2)
             # particular_entry.insert(0, draft.bill_particular)
             
-            setattr(self, f'qty_entry_{draft.id}', ttk.Entry(row_frame,width=8))
-            qty_entry = getattr(self, f'qty_entry_{draft.id}')
+            setattr(self, f'qty_entry_{draft["key"]}', ttk.Entry(row_frame,width=8))
+            qty_entry = getattr(self, f'qty_entry_{draft["key"]}')
             qty_entry.grid(row=0, column=1, sticky="ew", padx=2)
-            qty_entry.insert(0, draft.bill_qty)
+            qty_entry.insert(0, draft['bill_qty'])
 
             # Quantity Entry
             # qty_entry = ttk.Entry(row_frame, width=8)
@@ -835,12 +781,12 @@ class CreateBillInfoView(ttk.Frame):
                 state="readonly"
             )
             unit_cb.grid(row=0, column=2, sticky="ew", padx=2)
-            unit_cb.set(draft.bill_unit)
+            unit_cb.set(draft['bill_unit'])
 
             # Rate Entry
             rate_entry = ttk.Entry(row_frame, width=8)
             rate_entry.grid(row=0, column=3, sticky="ew", padx=2)
-            rate_entry.insert(0, f"{draft.bill_rate:.2f}")
+            rate_entry.insert(0, f"{draft['bill_rate']:.2f}")
             
             # Amount Label (right aligned)
             # amount_var = ttk.StringVar(value=f"{draft.sub_amount:.2f}")
@@ -848,43 +794,34 @@ class CreateBillInfoView(ttk.Frame):
             # amount_entry.grid(row=0, column=4, sticky="ew", padx=2)
             # amount_entry.insert(0, f"{draft.sub_amount:.2f}")
             
-            amount_var = ttk.StringVar(value=f"{draft.sub_amount:.2f}")
+            amount_var = ttk.StringVar(value=f"{draft['sub_amount']:.2f}")
             amount_entry = ttk.Entry(row_frame, width=8, textvariable=amount_var)
             amount_entry.grid(row=0, column=4, sticky="ew", padx=2)
             
             # amount_var = tk.StringVar(value=f"{draft.sub_amount:.2f}")
-            totalAmount += float(draft.sub_amount)
+            totalAmount += float(draft['sub_amount'] or 0)
 
             # Delete Button
             delete_btn = ttk.Button(
                 row_frame,
                 text="X",
-                command=lambda rf=row_frame, did=draft.id: self.delete_particular_row(rf, did),
+                command=lambda rf=row_frame, did=draft['key']: self.delete_particular_row(rf, did),
                 bootstyle="danger-outline",
                 width=3
             )
             delete_btn.grid(row=0, column=5, padx=2)
 
             # Calculation binding
-            def calculate_amount(event=None, qentry=qty_entry, rentry=rate_entry, avar=amount_var):
+            def calculate_amount(event=None, key=draft['key'], qentry=qty_entry, rentry=rate_entry, avar=amount_var):
                 try:
                     qty = float(qentry.get() or 0)
                     rate = float(rentry.get() or 0)
                     amount = qty * rate
                     avar.set(f"{amount:.2f}")
 
-                    # Update total by summing all amount fields
-                    total = 0.0
-                    for child in self.particulars_container.winfo_children():
-                        entries = child.winfo_children()
-                        if len(entries) >= 5:
-                            try:
-                                amt = float(entries[4].get())
-                                total += amt
-                            except ValueError:
-                                continue
-
-                    self.total_amount_var.set(f"{total:.2f}")
+                    # Buffer keeps the row and the total; the write is debounced
+                    buffer.update(key, bill_qty=qty, bill_rate=rate, sub_amount=amount)
+                    self.update_total_amount()
                 except ValueError:
                     avar.set("0.00")
 
@@ -897,7 +834,7 @@ class CreateBillInfoView(ttk.Frame):
                 '<FocusOut>',
                 partial(
                     self.handle_update_particular_draft_raw_event,
-                    draft.id,
+                    draft['key'],
                     particular_entry,
                     qty_entry,
                     unit_cb,
@@ -910,7 +847,7 @@ class CreateBillInfoView(ttk.Frame):
                 '<FocusOut>',
                 partial(
                     self.handle_update_particular_draft_raw_event,
-                    draft.id,
+                    draft['key'],
                     particular_entry,
                     qty_entry,
                     unit_cb,
@@ -959,10 +896,17 @@ class CreateBillInfoView(ttk.Frame):
             bill_month = self.get_month_number(self.bill_month_combobox.get())
             bill_year=int(self.bill_year_entry.get())
 
+            # Write pending edits first so the saved drafts match what is billed
+            draft_buffer = self.get_draft_buffer(shop_id)
+            draft_buffer.flush()
+            drafts = [dict(row) for row in draft_buffer.ordered_rows()]
+            if not drafts:
+                raise ValueError("No draft amount found for the selected shop/month/year.")
+            for draft in drafts:
+                draft['sub_amount'] = Decimal(str(draft['sub_amount'] or 0)).quantize(Decimal("0.01"))
+            total_amount = sum(draft['sub_amount'] for draft in drafts)
+
             with session_scope() as session:
-                total_amount = BillParticularDraft.get_total_draft_amount(shop_id, bill_month, bill_year)
-                if total_amount is None:
-                    raise ValueError("No draft amount found for the selected shop/month/year.")
                 
                 # tenant profile by shop_id
                 # tenant_profile = session.query(ShopProfile).filter_by(shop_id=data['shop_id']).first()
@@ -987,7 +931,8 @@ class CreateBillInfoView(ttk.Frame):
                     bill_gen_by="1",
                     bill_gen_at=datetime.now(),
                     prev_due=float(self.prev_bill_dues_entry.get() or 0),
-                    status=1
+                    status=1,
+                    tariff_version=getattr(self, "tariff_version", None) or UtilitySetting.get_tariff_version()
                 )
 
                 session.add(bill_info)
@@ -997,74 +942,45 @@ class CreateBillInfoView(ttk.Frame):
                     raise ValueError("BillInfo not flushed correctly.")
 
                 print('shop Id:',shop_id)
-                drafts = BillParticularDraft.get_bill_particular_draft_by_shop_id(shop_id, bill_month, bill_year,session=session)
                 # print("drafts:",drafts,bill_month, bill_year)
                 for draft in drafts:
                     # print("drafts:" , draft.bill_particular)
                     new_particular = BillParticular(
                         bill_id=bill_info.id,
-                        bill_particular=draft.bill_particular,
-                        bill_qty=draft.bill_qty,
-                        bill_unit=draft.bill_unit,
-                        bill_rate=draft.bill_rate,
-                        sub_amount=draft.sub_amount,
+                        bill_particular=draft['bill_particular'],
+                        bill_qty=draft['bill_qty'],
+                        bill_unit=draft['bill_unit'],
+                        bill_rate=draft['bill_rate'],
+                        sub_amount=draft['sub_amount'],
                         paid_amount=0,
-                        due_amount=draft.sub_amount,
-                        vat=draft.vat,
-                        demand_charge=draft.demand_charge,
+                        due_amount=draft['sub_amount'],
+                        vat=draft['vat'],
+                        demand_charge=draft['demand_charge'],
                         bill_type="Bill"
                     )
                     session.add(new_particular)
 
                 teant_amount = 0
                 for draft in drafts:
-                    drHeadId = crHeadId = crHeadId2 = 0
-                    if draft.bill_particular == "House Rent":
-                        drHeadId, crHeadId = 6, 21
-                    elif draft.bill_particular == "Common Areal Maintenance":
-                        drHeadId, crHeadId = 28, 29
-                    elif draft.bill_particular == "Electricity":
-                        drHeadId, crHeadId, crHeadId2 = 7, 23, 27
-                    elif draft.bill_particular == "Gas":
-                        drHeadId, crHeadId = 9, 25
-                    elif draft.bill_particular == "WASA":
-                        drHeadId, crHeadId = 8, 24
-                    elif draft.bill_particular == "Internet":
-                        drHeadId, crHeadId = 10, 26
-
-                    try:
-                        AccountingController.manage_transaction(session, [
-                            "+", "insert", drHeadId, bill_info.id, date.today(), draft.sub_amount,
-                            None, '1', None, "bill_info_id", bill_info.id, "cr", f"Bill Bill Generations for {draft.bill_particular}-cr"
-                        ])
-
-                        # ? INSERT TO TEANANT TRANS HISTORY
-                        teant_amount += draft.sub_amount
-                        AccountingController.insert_teanant_trans_history(session, drHeadId, shop_allocation.renter_profile_id, bill_info.id, None, date.today(), draft.sub_amount, "dr", teant_amount, "dr", f"Bill Generations for {draft.bill_particular}-dr", "1")
-
-                        AccountingController.manage_transaction(session, [
-                            "+", "insert", crHeadId, bill_info.id, date.today(), draft.sub_amount,
-                            None, '1', None, "bill_info_id", bill_info.id, "dr", f"Bill Generations for {draft.bill_particular}-dr"
-                        ])
-                        # Apply for electrict bill
-                        if draft.bill_particular == "Electricity":
-                            #  Provisionary for vat charge 15%
-                            vat_charge = draft.sub_amount * Decimal("0.15")
-                            # print(f"Electricity bill: {draft.vat} & {draft.demand_charge}")
-                            AccountingController.manage_transaction(session, [
-                                "-", "insert", crHeadId2, bill_info.id, date.today(), vat_charge,
-                                None, '1', None, "bill_info_id", bill_info.id, "cr", "Bill Generations Vat Charge"
-                            ])
-                            #  Provisionary for demand charge 40 BDT
-                            demand_charge = Decimal("40.00")
-                            AccountingController.manage_transaction(session, [
-                                "-", "insert", crHeadId2, bill_info.id, date.today(), demand_charge,
-                                None, '1', None, "bill_info_id", bill_info.id, "cr", "Bill Generations Demand Charge"
-                            ])
-                    except Exception as trans_error:
-                        print(f"Transaction failed: {trans_error}")
-                        raise trans_error
+                    drHeadId = BILL_PARTICULAR_HEADS.get(draft['bill_particular'], (0, 0, 0))[0]
+
+                    # ? INSERT TO TEANANT TRANS HISTORY
+                    teant_amount += draft['sub_amount']
+                    AccountingController.insert_teanant_trans_history(session, drHeadId, shop_allocation.renter_profile_id, bill_info.id, None, date.today(), draft['sub_amount'], "dr", teant_amount, "dr", f"Bill Generations for {draft['bill_particular']}-dr", "1")
+
+                journal_lines = bill_journal_lines(
+                    bill_info.id,
+                    [(draft['bill_particular'], draft['sub_amount']) for draft in drafts],
+                    date.today()
+                )
+
+                try:
+                    AccountingController.post_batch(session, journal_lines)
+                except Exception as trans_error:
+                    print(f"Transaction failed: {trans_error}")
+                    raise trans_error
 
+                BillingFactController.refresh_bills(session, [bill_info.id])
                 session.commit()
                 Messagebox.show_info("Bill created successfully!", "Success", parent=self)
                 self.clear_form()
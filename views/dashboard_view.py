@@ -2,35 +2,8 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import Menu
 from utils.window_manager import WindowManager
+from utils.view_registry import VIEWS, load_view, prewarm
 from views.login_view import LoginView
-from views.accounting.shop_renter_due_report import ShopRenterDueReportView
-from views.purchase.purchase import Purchase
-from views.purchase.purchase_list import PurchaseListView
-from views.unit.create_unit import CreateUnitView
-from views.unit.unit_list import UnitListView
-from views.users.create_user_view import CreateUserView
-from views.users.list_user_view import ListUserView
-from views.users.create_role_view import CreateRoleView
-from views.users.list_role_view import ListRoleView
-from views.shops.create_shop_view import CreateShopView
-from views.shops.list_shop_view import ListShopView
-from views.shopOwner.create_shop_owner_view import CreateShopOwnerView
-from views.shopOwner.lisr_shop_owner_view import ListShopOwnerView
-from views.shopRenters.create_renter_view import CreateShopRenterView
-from views.shopRenters.list_renter_view import ShopRenterListView
-from views.shopAllocation.create_shop_allocation_view import CreateShopAllocationView
-from views.shopAllocation.list_shop_allocation_view import ListShopAllocationView
-from views.bankAccount.create_bank_account_view import CreateBankAccountView
-from views.bankAccount.list_bank_account_view import ListBankAccountView
-from views.journalVoucher.create_journal_voucher import CreateJournalVoucherView
-from views.journalVoucher.list_journal_voucher_view import ListJournalVoucherView
-from views.utilities.utilities_list import ListOfUtilitySettingsView
-from views.utilities.list_utilities_view import ListUtilitiesView
-from views.utilities.create_utilities import CreateUtilitySettingView
-from views.role_permission.set_role_permission import SetRolePermissionView
-from views.role_permission.role_permission_list import RolePermissionDetails
-from views.billInfo.create_bill import CreateBillInfoView
-from views.billInfo.bill_info_list import BillInfoListView
 from PIL import Image, ImageTk
 import os
 from models.role_permissions import RolePermission
@@ -38,25 +11,10 @@ from models.user import User
 from utils.database import Session
 from models.url_top_menu import UrlTopMenu
 from models.url_sub_menu import UrlSubMenu
-from views.billInfo.create_particular import CreateParticularView
-from views.billInfo.particular_list import ParticularListView
-from views.accounting.trial_balance import TrialBalanceView
-from views.accounting.ledger_balance import LedgerBalanceView
-from views.accounting.balance_sheet import BalanceSheetView
-from views.accounting.profit_loss import ProfitLossView
-from views.billCollection.create_bill_collection import CreateBillCollectionView
+from controllers.menu_controller import MenuController
 from controllers.accounting_controller import AccountingController
-from views.billCollection.bill_collection_list import CollectionListView
-from views.accounting.shop_owner_due_report import ShopOwnerDueReportView
-from views.accounting.shop_renter_due_report import ShopRenterDueReportView
-from views.category.create_category import CreateCategoryView
-from views.category.category_list import CategoryListView
-from views.product.create_product import CreateProductView
-from views.product.product_list import ProductListView
 from utils.toltip import ToolTip
-from views.accounting.tenant_ledger import TenantLedgerView
-from views.demand.demand_create import DemandCreateView
-from views.demand.demand_list import DemandListView
+from utils.sql_profiler import profiled
 # from sqlalchemy.orm import Session
 
 
@@ -80,9 +38,13 @@ class DashboardView(ttk.Frame):
         # Show welcome message
         self.show_welcome()
 
+        # Import the most used views while the user reads the dashboard
+        self.after_idle(prewarm)
+
         # Render internal menu
         # self.render_internal_menu(self.container)
     
+    @profiled("DashboardView.create_menu")
     def create_menu(self):
         """Creates the main menu bar with role-based access control."""
         try:
@@ -99,34 +61,16 @@ class DashboardView(ttk.Frame):
             menubar = Menu(self.parent)
             self.parent.config(menu=menubar)
             
-            # Get user role and permissions
-            user_role = self.get_user_role()
-            user_permissions = self.get_user_permissions(user_role)
-            # print(f"User role: {user_role} , Permissions: {user_permissions}")
-           
-
-        #   Dynamic Menu
-            menus = self.get_url_top_menu()
-            print(f"Creating menu for {len(menus) if menus else 0} top menus")
-            # print(menus)
+        #   Dynamic Menu, filtered by the user's role
+            menus = self.get_menu_tree()
             if menus:
-                for i, mt in enumerate(menus):
-                    print(f"Processing menu {i+1}: {mt.menu_name}")
+                for mt in menus:
                     topMenu = Menu(menubar, tearoff=0)
                     menubar.add_cascade(label=mt.menu_name, menu=topMenu)
-                    submenus = self.get_url_sub_menu(mt.id)
-                    print(f"Adding {len(submenus)} submenus to {mt.menu_name}")
-                    for sub in submenus:
-                        try:
-                            # Convert command name to lowercase and replace spaces with underscores
-                            method_name = sub.command_name.lower().replace(' ', '_')
-                            print(f"Looking for method: {method_name}")
-                            menu_action = getattr(self, method_name)
+                    for sub in mt.items:
+                        menu_action = self.menu_action(sub)
+                        if menu_action:
                             topMenu.add_command(label=sub.sub_menu_name, command=menu_action)
-                            print(f"Added submenu: {sub.sub_menu_name}")
-                        except AttributeError:
-                            print(f"Warning: Method {method_name} not found for menu item {sub.sub_menu_name}")
-                            continue
             else:
                 print("No top menus found in database")
         except Exception as e:
@@ -134,6 +78,26 @@ class DashboardView(ttk.Frame):
             import traceback
             traceback.print_exc()
     
+    def get_menu_tree(self):
+        """Menu tree of the current user's role, cached by MenuController."""
+        try:
+            role_id = self.current_user.role_id if self.current_user else None
+            return MenuController.menu_tree(role_id)
+        except Exception as e:
+            print(f"Error loading menu tree: {e}")
+            import traceback
+            traceback.print_exc()
+            return ()
+
+    def menu_action(self, item):
+        """Bound method for a sub menu, None when the view has no such method."""
+        menu_action = getattr(self, item.method_name, None)
+        if menu_action is None and item.method_name in VIEWS:
+            menu_action = lambda key=item.method_name: self.open_view(key)
+        if menu_action is None:
+            print(f"Warning: Method {item.method_name} not found for menu item {item.sub_menu_name}")
+        return menu_action
+
     def get_user_role(self):
         """
         Retrieve the user's role from the database.
@@ -179,49 +143,6 @@ class DashboardView(ttk.Frame):
             default_permissions = RolePermission.get_default_permissions()
             return default_permissions['staff']
     
-    def get_url_top_menu(self):
-        try:
-            print("Getting top menus...")
-            session = Session()
-            # top_menu = session.query(UrlTopMenu).all()
-            # print(f"top menu: {top_menu}")
-
-            menu_top = session.query(UrlTopMenu).order_by(UrlTopMenu.menu_order).all() 
-            print(f"Found {len(menu_top)} top menus:")
-            for menu in menu_top:
-                print(f"  - {menu.menu_name} (ID: {menu.id}, Order: {menu.menu_order})")
-            session.close()
-            return menu_top
-            
-        except Exception as e:
-            print(f"Error getting top menu: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
-    
-    def get_url_sub_menu(self,id):
-        try:
-            print(f"Getting sub menus for top menu ID: {id}")
-            session = Session()
-            # top_menu = session.query(UrlTopMenu).all()
-            # print(f"top menu: {top_menu}")
-
-            menu_top = session.query(UrlSubMenu).filter_by(top_menu_id=id).order_by(UrlSubMenu.sub_menu_order).all()
-            print(f"Found {len(menu_top)} sub menus for top menu {id}:")
-            for submenu in menu_top:
-                print(f"  - {submenu.sub_menu_name} (Command: {submenu.command_name})")
-            session.close()
-            return menu_top
-            
-        except Exception as e:
-            print(f"Error getting sub menu: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
-    
-
-
-
     # def show_welcome(self):
     #     """Shows welcome message and dashboard-style top menus."""
     #     try:
@@ -324,71 +245,94 @@ class DashboardView(ttk.Frame):
     #     ).pack()
     
 
+    def open_view(self, key, **kwargs):
+        """
+        Opens a registered view, importing its module on first use.
+
+        Each view is open at most once; choosing it again raises the window.
+        """
+        try:
+            view_class = load_view(key)
+        except Exception as e:
+            print(f"Error loading view {key}: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+        entry = VIEWS[key]
+        if kwargs:
+            # Opened for a particular record, so not shared
+            return self.window_manager.create_window(entry.title, view_class, **kwargs)
+        return self.window_manager.create_window(entry.title, view_class, key=key, keep_alive=entry.keep_alive, **kwargs)
+
+    def destroy(self):
+        self.window_manager.destroy()
+        super().destroy()
+
     # !MENU FUNTIONS START
 
     def create_user(self):
         """Opens create user window."""
-        self.window_manager.create_window("Create User", CreateUserView)
+        self.open_view("create_user")
     
     def list_users(self):
         """Opens list users window."""
-        self.window_manager.create_window("User List", ListUserView)
+        self.open_view("list_users")
     
     def create_role(self):
         """Opens create role window."""
-        self.window_manager.create_window("New Role Form", CreateRoleView)
+        self.open_view("create_role")
 
     def role_list(self):
         """Opens create role window."""
-        self.window_manager.create_window("Role List", ListRoleView)
+        self.open_view("role_list")
 
     def user_role_permission(self):
         """Opens create role window."""
-        self.window_manager.create_window("Set User Role Permission", SetRolePermissionView)
+        self.open_view("user_role_permission")
 
     def user_role_permission_details(self):
         """Opens create role window."""
-        self.window_manager.create_window("User Role Permission Details", RolePermissionDetails)
+        self.open_view("user_role_permission_details")
 
 
 
     # !SHOP FUNTIONS START
     def create_shop(self):
         """Opens create shop window."""
-        self.window_manager.create_window("Create Shop", CreateShopView)
+        self.open_view("create_shop")
     
     def list_shops(self):
         """Opens list shops window."""
-        self.window_manager.create_window("Shop List", ListShopView)
+        self.open_view("list_shops")
 
     def create_shop_owner(self):
         """Opens create shop owner window."""
-        self.window_manager.create_window("Create Shop Owner", CreateShopOwnerView)
+        self.open_view("create_shop_owner")
     
     def list_shop_owners(self):
         """Opens list shop owners window."""
-        self.window_manager.create_window("Shop Owner List", ListShopOwnerView)
+        self.open_view("list_shop_owners")
 
     def create_shop_renter(self):
         """Opens create shop renter window."""
-        self.window_manager.create_window("Create Shop Renter", CreateShopRenterView)
+        self.open_view("create_shop_renter")
     
     def list_shop_renters(self):
         """Opens list shop renters window."""
-        self.window_manager.create_window("Shop Renter List", ShopRenterListView)
+        self.open_view("list_shop_renters")
 
     def create_shop_allocation(self):
         """Opens create shop allocation window."""
-        self.window_manager.create_window("Create Shop Allocation", CreateShopAllocationView)
+        self.open_view("create_shop_allocation")
     
     def list_shop_allocations(self):
         """Opens list shop allocations window."""
-        self.window_manager.create_window("Shop Allocation List", ListShopAllocationView)
+        self.open_view("list_shop_allocations")
     
     # !BANK ACCOUNT FUNTIONS START
     def create_bank_account(self):
         """Opens list shop allocations window."""
-        self.window_manager.create_window("New Bank Account Form", CreateBankAccountView)
+        self.open_view("create_bank_account")
 
     def on_logout(self):
         """Logs out the user."""
@@ -397,38 +341,38 @@ class DashboardView(ttk.Frame):
     
     def list_bank_accounts(self):
         """Opens list bank accounts window."""
-        self.window_manager.create_window("Bank Account List", ListBankAccountView)
+        self.open_view("list_bank_accounts")
         print("list bank accounts called")
         
     def create_journal_voucher(self):
         """Opens create journal voucher window."""
-        self.window_manager.create_window("Create Journal Voucher", CreateJournalVoucherView)
+        self.open_view("create_journal_voucher")
         print("create journal voucher called")
 
     def list_journal_vouchers(self):
         """Opens list journal vouchers window."""
-        self.window_manager.create_window("List Journal Vouchers", ListJournalVoucherView)
+        self.open_view("list_journal_vouchers")
         print("list journal vouchers called")
 
     # !UTILITIES FUNTIONS START
     def create_utilities(self):
         """Opens Create Utility Setting window."""
-        self.window_manager.create_window("Create Utility Setting", CreateUtilitySettingView)
+        self.open_view("create_utilities")
         # print("list journal vouchers called")
 
     def list_utilities(self):
         """Opens list of utility settings window."""
-        self.window_manager.create_window("Utilities List", ListUtilitiesView)
+        self.open_view("list_utilities")
         # print("list journal vouchers called")
 
     def create_particular(self):
         """Opens create particular window."""
-        self.window_manager.create_window("Create Particular", CreateParticularView)
+        self.open_view("create_particular")
         # print("list journal vouchers called")
 
     def list_particular(self):
         """Opens list of particular window."""
-        self.window_manager.create_window("List Particular", ParticularListView)
+        self.open_view("list_particular")
         # print("list journal vouchers called")
 
     def password_change_form(self):
@@ -450,11 +394,11 @@ class DashboardView(ttk.Frame):
 
     def create_bill_info(self):
         """Opens create bill info window."""
-        self.window_manager.create_window("Create Bill Info", CreateBillInfoView)
+        self.open_view("create_bill_info")
     
     def list_bill_info(self):
         """Opens list bill info window."""
-        self.window_manager.create_window("List Bill Info", BillInfoListView)
+        self.open_view("list_bill_info")
 
     # def create_bill_particular(self):
     #     """Opens create bill particular window."""
@@ -469,43 +413,43 @@ class DashboardView(ttk.Frame):
 
     def product_category(self):
         """Opens create product category window."""
-        self.window_manager.create_window("Product Category", CreateCategoryView)
+        self.open_view("product_category")
 
     def product_category_list(self):
         """Opens list product category window."""
-        self.window_manager.create_window("Product Category List", CategoryListView)
+        self.open_view("product_category_list")
 
     def create_product(self):
         """Opens list bill info window."""
-        self.window_manager.create_window("Product List", CreateProductView)
+        self.open_view("create_product")
 
     def product_details_list(self):
         """Opens list bill info window."""
-        self.window_manager.create_window("Product List", ProductListView)
+        self.open_view("product_details_list")
 
     def demand_product(self):
         """Opens Demand Product window."""
-        self.window_manager.create_window("Demand Product", DemandCreateView)
+        self.open_view("demand_product")
 
     def demand_product_list(self):
         """Opens Demand Product List window."""
-        self.window_manager.create_window("Demand Product List", DemandListView)
+        self.open_view("demand_product_list")
 
     def create_unit(self):
         """Opens Create Unit window."""
-        self.window_manager.create_window("Create Unit", CreateUnitView)
+        self.open_view("create_unit")
 
     def unit_list(self):
         """Opens Unit List window."""
-        self.window_manager.create_window("Unit List", UnitListView)
+        self.open_view("unit_list")
 
     def product_purchase(self):
         """Opens Product Purchase window."""
-        self.window_manager.create_window("Purchase View", Purchase)
+        self.open_view("product_purchase")
 
     def product_purchase_list(self):
         """Opens Product Purchase List window."""
-        self.window_manager.create_window("Purchase List", PurchaseListView)
+        self.open_view("product_purchase_list")
 
     def product_issues(self):
         """Opens Product Issues window."""
@@ -523,7 +467,7 @@ class DashboardView(ttk.Frame):
 
     def stock_report(self):
         """Opens Stock Report window."""
-        # self.window_manager.create_window("List Bill Info", BillInfoListView)
+        self.open_view("stock_report")
 
     def stock_report_list(self):
         """Opens Stock Report List window."""
@@ -531,40 +475,48 @@ class DashboardView(ttk.Frame):
 
     def trial_balance(self):
         """Opens trial balance window."""
-        self.window_manager.create_window("Trial Balance", TrialBalanceView)
+        self.open_view("trial_balance")
     
     def ledger_balance(self):
         """Opens ledger balance window."""
-        self.window_manager.create_window("Ledger Balance", LedgerBalanceView)
+        self.open_view("ledger_balance")
 
     def balance_sheet(self):
         """Opens balance sheet window."""
-        self.window_manager.create_window("Balance Sheet", BalanceSheetView)
+        self.open_view("balance_sheet")
     
     def shop_owner_due_report(self):
         """Opens due report window."""
-        self.window_manager.create_window("Shop Owner Due Report", ShopOwnerDueReportView)
+        self.open_view("shop_owner_due_report")
 
     def shop_renter_due_report(self):
         """Opens due report window."""
-        self.window_manager.create_window("Shop Renter Due Report", ShopRenterDueReportView)
+        self.open_view("shop_renter_due_report")
 
     
     def profit_loss(self):
         """Opens profit loss window."""
-        self.window_manager.create_window("Profit Loss", ProfitLossView)
+        self.open_view("profit_loss")
     
     def bill_collection(self):
         """Opens bill collection window."""
-        self.window_manager.create_window("Bill Collection", CreateBillCollectionView)
+        self.open_view("bill_collection")
 
     def bill_collection_list(self):
         """Opens bill collection window."""
-        self.window_manager.create_window("Bill Collection List", CollectionListView)
+        self.open_view("bill_collection_list")
     
     def tenant_ledger(self):
         """Opens tenant ledger window."""
-        self.window_manager.create_window("Tenant Ledger", TenantLedgerView)
+        self.open_view("tenant_ledger")
+
+    def bill_run(self):
+        """Opens monthly bill run window."""
+        self.open_view("bill_run")
+
+    def sql_profile(self):
+        """Opens SQL profile diagnostics window."""
+        self.open_view("sql_profile")
     
     # *MENU FUNTIONS END
 
@@ -599,11 +551,7 @@ class DashboardView(ttk.Frame):
         Renders icon-only internal menu at the top of the window.
         """
         try:
-            # top_menus = self.get_url_top_menu()
-            session = Session()
-            top_menus = session.query(UrlTopMenu).order_by(UrlTopMenu.menu_order).all() 
-            print(f"Found Top {len(top_menus)} top menus:")
-            session.close()
+            top_menus = self.get_menu_tree()
             # Create dedicated menu bar frame
             menu_bar = ttk.Frame(parent_frame, height=40, style="Primary.TFrame")
             menu_bar.pack(fill="x", pady=(0, 5))
@@ -647,20 +595,14 @@ class DashboardView(ttk.Frame):
         # Create popup menu
         menu = Menu(self.parent, tearoff=0)
         
-        # Get submenus for this top menu
-        submenus = self.get_url_sub_menu(top_menu.id)
-        
         # Add each submenu as a menu item
-        for sub in submenus:
-            try:
-                method_name = sub.command_name.lower().replace(' ', '_')
-                menu_action = getattr(self, method_name)
+        for sub in top_menu.items:
+            menu_action = self.menu_action(sub)
+            if menu_action:
                 menu.add_command(
                     label=sub.sub_menu_name, 
                     command=menu_action
                 )
-            except AttributeError:
-                print(f"Method {method_name} not found for submenu {sub.sub_menu_name}")
         
         # Show the menu at the current mouse position
         menu.tk_popup(self.winfo_pointerx(), self.winfo_pointery())
@@ -668,6 +610,7 @@ class DashboardView(ttk.Frame):
         # Bind to close menu when clicking elsewhere
         menu.bind("<FocusOut>", lambda e: menu.destroy())
     
+    @profiled("DashboardView.show_welcome")
     def show_welcome(self):
         """Shows welcome message and dashboard-style top menus."""
         try:
@@ -687,7 +630,7 @@ class DashboardView(ttk.Frame):
             dashboard_frame = ttk.Frame(welcome_frame)
             dashboard_frame.pack()
 
-            top_menus = self.get_url_top_menu()
+            top_menus = self.get_menu_tree()
             if top_menus:
                 for i, mt in enumerate(top_menus):
                     # Box per top menu
@@ -709,19 +652,15 @@ class DashboardView(ttk.Frame):
                         icon_label.pack(pady=(0, 5))
 
                     # Submenus as buttons
-                    submenus = self.get_url_sub_menu(mt.id)
-                    for sub in submenus:
-                        try:
-                            method_name = sub.command_name.lower().replace(' ', '_')
-                            menu_action = getattr(self, method_name)
+                    for sub in mt.items:
+                        menu_action = self.menu_action(sub)
+                        if menu_action:
                             ttk.Button(
                                 menu_box, 
                                 text=sub.sub_menu_name, 
                                 command=menu_action,
                                 width=20
                             ).pack(pady=2, fill='x')
-                        except AttributeError:
-                            print(f"Method {method_name} not found for submenu {sub.sub_menu_name}")
             else:
                 # Show a simple welcome message if no menus are available
                 ttk.Label(
@@ -4,9 +4,12 @@ from ttkbootstrap.dialogs import Messagebox
 from utils.database import Session
 from models.demand_product import DemandProduct
 from models.demand_details import DemandDetails
+from controllers.sequence_controller import SequenceController, DEMAND_NO
 from models.shop_profile import ShopProfile
 from models.product import Product
 from datetime import datetime
+from utils import reference_data
+from utils.keyset_pager import invalidate_counts
 
 class DemandCreateView(ttk.Frame):
     def __init__(self, parent, existing_demand=None):
@@ -230,20 +233,14 @@ class DemandCreateView(ttk.Frame):
     def load_product_list(self):
         """Load products for combobox"""
         try:
-            session = Session()
-            products = session.query(Product).all()
-            session.close()
-            self.product_mapping = {f"{p.name} (ID: {p.id})": p.id for p in products}
+            self.product_mapping = {f"{p.name} (ID: {p.id})": p.id for p in reference_data.products()}
         except Exception as e:
             Messagebox.show_error(f"Error loading products: {str(e)}", "Error", parent=self)
     
     def load_shop_list(self):
         """Load shops for combobox"""
         try:
-            session = Session()
-            shops = session.query(ShopProfile).all()
-            session.close()
-            self.shop_mapping = {f"{s.shop_name} (ID: {s.id})": s.id for s in shops}
+            self.shop_mapping = {f"{s.shop_name} (ID: {s.id})": s.id for s in reference_data.shops()}
         except Exception as e:
             Messagebox.show_error(f"Error loading shops: {str(e)}", "Error", parent=self)
     
@@ -267,6 +264,13 @@ class DemandCreateView(ttk.Frame):
                 
             if not self.rows:
                 raise Exception("At least one product is required")
+
+            demand_no = demand_no.strip()
+            if not demand_no:
+                demand_no = SequenceController.next_number(DEMAND_NO)
+            elif demand_no.isdigit():
+                # Keep the counter from handing the typed number out later
+                SequenceController.claim(DEMAND_NO, demand_no)
                 
             # Validate products
             for i, row in enumerate(self.rows):
@@ -307,7 +311,8 @@ class DemandCreateView(ttk.Frame):
                     session.add(detail)
             
             session.commit()
-            Messagebox.show_info("Success", "Demand created successfully!", parent=self)
+            invalidate_counts("demand_list")
+            Messagebox.show_info("Success", f"Demand {demand_no} created successfully!", parent=self)
             
             # Clear form
             self.clear_form()
@@ -3,21 +3,27 @@ from ttkbootstrap.constants import *
 from ttkbootstrap.dialogs import Messagebox
 from utils.database import Session
 from models.demand_product import DemandProduct
+from models.demand_details import DemandDetails
 from models.shop_profile import ShopProfile
 from views.demand.demand_show import DemandShowView
 from datetime import datetime
+from sqlalchemy.orm import contains_eager
 import re
+from utils.keyset_pager import KeysetListView
+from utils import reference_data
+from controllers.stock_controller import StockController
+
+class DemandListView(KeysetListView):
+    date_column = DemandProduct.demand_date
+    id_column = DemandProduct.id
+    count_name = "demand_list"
+    page_size = 10
 
-class DemandListView(ttk.Frame):
     def __init__(self, parent):
         super().__init__(parent, padding=10)
         self.parent = parent
         self.pack(fill="both", expand=True)
-        
-        # Pagination variables
-        self.current_page = 1
-        self.page_size = 10
-        self.total_records = 0
+        self.on_load_error = lambda e: Messagebox.show_error(f"Error loading demands: {str(e)}", "Error", parent=self)
         
         # Create UI
         self.create_demand_list()
@@ -240,11 +246,7 @@ class DemandListView(ttk.Frame):
     def load_shops(self):
         """Load shops into the filter combobox"""
         try:
-            session = Session()
-            shops = session.query(ShopProfile).all()
-            session.close()
-            
-            shop_names = [f"{s.shop_name} (ID: {s.id})" for s in shops]
+            shop_names = [f"{s.shop_name} (ID: {s.id})" for s in reference_data.shops()]
             shop_names.insert(0, "All Shops")
             self.shop_cb["values"] = shop_names
             self.shop_cb.current(0)
@@ -254,115 +256,67 @@ class DemandListView(ttk.Frame):
 
 
     def load_demands(self):
-        """Load demands from the database with filters"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Load the first page of demands with the current filters"""
+        self.reload()
 
-        session = Session()
-        try:
-            # Build base query
-            query = session.query(DemandProduct).join(ShopProfile)
+    def filter_values(self):
+        """Current shop, status and date range filters"""
+        shop_id = None
+        selected_shop = self.shop_var.get()
+        if selected_shop and selected_shop != "All Shops":
+            match = re.search(r"\(ID: (\d+)\)", selected_shop)
+            if match:
+                shop_id = int(match.group(1))
 
-            # --- Shop Filter ---
-            selected_shop = self.shop_var.get()
-            if selected_shop and selected_shop != "All Shops":
-                match = re.search(r"\(ID: (\d+)\)", selected_shop)
-                if match:
-                    shop_id = int(match.group(1))
-                    query = query.filter(DemandProduct.shop_id == shop_id)
+        dates = []
+        for entry in (self.from_date, self.to_date):
+            try:
+                dates.append(datetime.strptime(entry.entry.get(), "%Y-%m-%d").date())
+            except ValueError:
+                dates.append(None)  # Invalid format
+        return shop_id, self.status_var.get(), dates[0], dates[1]
 
-            # --- Status Filter ---
-            selected_status = self.status_var.get()
-            status_map = {"Pending": 1, "Approved": 2, "Rejected": 3}
-            if selected_status in status_map:
-                query = query.filter(DemandProduct.approved_status == status_map[selected_status])
+    def build_query(self, session, filters):
+        """Demands matching the filters (runs on a worker thread)"""
+        shop_id, selected_status, from_date, to_date = filters
+        # The shop comes from the same join, not a lazy load per row in row_values
+        query = session.query(DemandProduct).join(ShopProfile).options(contains_eager(DemandProduct.shop))
 
-            # --- Date Range Filter ---
-            from_date = self.from_date.entry.get()
-            to_date = self.to_date.entry.get()
+        # --- Shop Filter ---
+        if shop_id:
+            query = query.filter(DemandProduct.shop_id == shop_id)
 
-            if from_date:
-                try:
-                    from_date_obj = datetime.strptime(from_date, "%Y-%m-%d").date()
-                    query = query.filter(DemandProduct.demand_date >= from_date_obj)
-                except ValueError:
-                    pass  # Invalid format
+        # --- Status Filter ---
+        status_map = {"Pending": 1, "Approved": 2, "Rejected": 3}
+        if selected_status in status_map:
+            query = query.filter(DemandProduct.approved_status == status_map[selected_status])
 
-            if to_date:
-                try:
-                    to_date_obj = datetime.strptime(to_date, "%Y-%m-%d").date()
-                    query = query.filter(DemandProduct.demand_date <= to_date_obj)
-                except ValueError:
-                    pass
+        # --- Date Range Filter ---
+        if from_date:
+            query = query.filter(DemandProduct.demand_date >= from_date)
+        if to_date:
+            query = query.filter(DemandProduct.demand_date <= to_date)
+        return query
 
-            # Get total count
-            self.total_records = query.count()
-            total_pages = max(1, (self.total_records + self.page_size - 1) // self.page_size)
+    def row_values(self, demand):
+        """Treeview values and tags for one demand (runs on a worker thread)"""
+        shop = demand.shop
+        shop_name = f"{shop.shop_name} (ID: {shop.id})" if shop else "N/A"
 
-            # Apply pagination
-            offset = (self.current_page - 1) * self.page_size
-            demands = query.order_by(DemandProduct.created_by.desc()) \
-                        .offset(offset) \
-                        .limit(self.page_size) \
-                        .all()
-
-            print(f"Loaded {len(demands)} demands")
-
-            # Populate treeview
-            for demand in demands:
-                shop = demand.shop
-                shop_name = f"{shop.shop_name} (ID: {shop.id})" if shop else "N/A"
-
-                status_str = {1: "Pending", 2: "Approved", 3: "Rejected"}.get(demand.approved_status, "Pending")
-                status_style = "success" if status_str == "Approved" else "warning" if status_str == "Pending" else "danger"
-
-                self.tree.insert(
-                    "", 
-                    "end", 
-                    values=(
-                        demand.id,
-                        shop_name,
-                        demand.demand_date.strftime("%Y-%m-%d"),
-                        demand.demand_no or "N/A",
-                        f"₹{demand.sub_total:.2f}",
-                        f"₹{demand.discount:.2f}",
-                        f"₹{demand.grand_total:.2f}",
-                        status_str
-                    ),
-                    tags=(demand.id, status_style)
-                )
+        status_str = {1: "Pending", 2: "Approved", 3: "Rejected"}.get(demand.approved_status, "Pending")
+        status_style = "success" if status_str == "Approved" else "warning" if status_str == "Pending" else "danger"
 
-            self.update_pagination_controls(total_pages)
-
-        except Exception as e:
-            Messagebox.show_error(f"Error loading demands: {str(e)}", "Error", parent=self)
-        finally:
-            session.close()
-
-    def update_pagination_controls(self, total_pages):
-        self.page_label.config(text=f"Page {self.current_page} of {total_pages}")
-        self.first_btn.config(state="normal" if self.current_page > 1 else "disabled")
-        self.prev_btn.config(state="normal" if self.current_page > 1 else "disabled")
-        self.next_btn.config(state="normal" if self.current_page < total_pages else "disabled")
-        self.last_btn.config(state="normal" if self.current_page < total_pages else "disabled")
-    
-    def change_page(self, page):
-        if page != self.current_page:
-            self.current_page = page
-            self.load_demands()
-    
-    def prev_page(self):
-        if self.current_page > 1:
-            self.change_page(self.current_page - 1)
-    
-    def next_page(self):
-        total_pages = max(1, (self.total_records + self.page_size - 1) // self.page_size)
-        if self.current_page < total_pages:
-            self.change_page(self.current_page + 1)
-    
-    def last_page(self):
-        total_pages = max(1, (self.total_records + self.page_size - 1) // self.page_size)
-        self.change_page(total_pages)
+        values = (
+            demand.id,
+            shop_name,
+            demand.demand_date.strftime("%Y-%m-%d"),
+            demand.demand_no or "N/A",
+            f"₹{demand.sub_total:.2f}",
+            f"₹{demand.discount:.2f}",
+            f"₹{demand.grand_total:.2f}",
+            status_str
+        )
+        return values, (demand.id, status_style)
     
     def on_selection_change(self, event):
         selected = self.tree.selection()
@@ -438,6 +392,9 @@ class DemandListView(ttk.Frame):
             if demand:
                 demand.approved_status = new_status
                 demand.approved_at = datetime.now()
+                if new_status == 2:
+                    # Approved demands are issued out of stock
+                    StockController.issue_demand(session, demand_id, demand.approved_at)
                 session.commit()
                 
                 values = list(self.tree.item(row_id, "values"))
@@ -480,7 +437,8 @@ class DemandListView(ttk.Frame):
             demand = session.query(DemandProduct).get(demand_id)
             
             if demand:
-                # Delete associated details first
+                # Return any issued stock, then delete associated details
+                StockController.cancel_demand_issues(session, demand_id)
                 session.query(DemandDetails).filter_by(demand_id=demand_id).delete()
                 
                 # Delete the demand
@@ -496,6 +454,7 @@ class DemandListView(ttk.Frame):
                 self.delete_btn.config(state="disabled")
                 
                 # Reload data
+                self.invalidate_count()
                 self.load_demands()
                 
                 Messagebox.show_info(
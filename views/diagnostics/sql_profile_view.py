@@ -0,0 +1,88 @@
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from ttkbootstrap.dialogs import Messagebox
+from utils.sql_profiler import profiler
+
+
+class SqlProfileView(ttk.Frame):
+    """Per-action query counts, timings and N+1 suspects collected by utils.sql_profiler."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+
+        style = ttk.Style()
+        style.configure("TFrame", background="white")
+        style.configure("TLabel", background="white")
+
+        self.status_label = ttk.Label(self, text="", bootstyle="secondary")
+        self.status_label.pack(fill="x", padx=10, pady=(10, 5))
+
+        columns = ("Action", "Runs", "Queries", "Max Queries", "SQL ms", "Max Run ms", "N+1")
+        self.tree = ttk.Treeview(self, bootstyle="primary", columns=columns, show="headings", height=10)
+        widths = {"Action": 220, "Runs": 50, "Queries": 70, "Max Queries": 90,
+                  "SQL ms": 80, "Max Run ms": 90, "N+1": 50}
+        for column in columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=widths[column], anchor="w" if column == "Action" else "center")
+        self.tree.pack(fill="both", expand=True, padx=10)
+        self.tree.bind("<<TreeviewSelect>>", self.show_suspects)
+
+        ttk.Label(self, text="N+1 suspects for the selected action", font=("Helvetica", 10, "bold")).pack(
+            anchor="w", padx=10, pady=(10, 0)
+        )
+        self.suspect_text = ttk.Text(self, height=8, wrap="word")
+        self.suspect_text.pack(fill="both", expand=True, padx=10, pady=5)
+
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill="x", padx=10, pady=10)
+        ttk.Button(button_frame, text="Refresh", command=self.load_stats, bootstyle="primary").pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Reset", command=self.reset_stats, bootstyle="warning").pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Save to Log", command=self.save_log, bootstyle="success").pack(side="left", padx=5)
+
+        self.stats = {}
+        self.load_stats()
+
+    def load_stats(self):
+        self.tree.delete(*self.tree.get_children())
+        self.suspect_text.delete("1.0", "end")
+        if not profiler.enabled:
+            self.status_label.config(text="Profiling is off. Set profile = true in database.ini (or GCM_DB_PROFILE=1) and restart.")
+        else:
+            self.status_label.config(text=f"N+1 threshold: {profiler.threshold} repeats of one statement in a single action")
+
+        self.stats = {}
+        for stats in profiler.snapshot():
+            self.stats[stats.name] = stats
+            self.tree.insert("", "end", iid=stats.name, values=(
+                stats.name,
+                stats.runs,
+                stats.queries,
+                stats.max_queries,
+                f"{stats.sql_ms:.1f}",
+                f"{stats.max_sql_ms:.1f}",
+                len(stats.suspects),
+            ))
+
+    def show_suspects(self, event=None):
+        self.suspect_text.delete("1.0", "end")
+        selected = self.tree.selection()
+        if not selected or selected[0] not in self.stats:
+            return
+        suspects = self.stats[selected[0]].suspects
+        if not suspects:
+            self.suspect_text.insert("end", "No repeated statements.")
+            return
+        for shape, count in sorted(suspects.items(), key=lambda item: item[1], reverse=True):
+            self.suspect_text.insert("end", f"x{count}  {shape}\n\n")
+
+    def reset_stats(self):
+        profiler.reset()
+        self.load_stats()
+
+    def save_log(self):
+        try:
+            path = profiler.dump()
+            Messagebox.show_info(f"SQL profile written to {path}", "Saved", parent=self)
+        except Exception as e:
+            Messagebox.show_error(f"Error writing SQL profile: {str(e)}", "Error", parent=self)
@@ -9,6 +9,7 @@ from models.acc_head_of_accounts import AccHeadOfAccounts
 from models.BankAccount import BankAccount
 from utils.database import Session
 from controllers.accounting_controller import AccountingController
+from utils import reference_data
 
 
 class CreateJournalVoucherView(ttk.Frame):
@@ -47,13 +48,8 @@ class CreateJournalVoucherView(ttk.Frame):
     def load_heads(self):
         """Load heads from acc_head_of_accounts table"""
         try:
-            session = Session()
-            heads = session.query(AccHeadOfAccounts).filter_by(isActive=1).all()
-            
             # Create a dictionary of head names and IDs
-            self.heads_dict = {head.head_name: head.id for head in heads}
-            
-            session.close()
+            self.heads_dict = {head.head_name: head.id for head in reference_data.heads()}
         except Exception as e:
             print(f"Error loading heads: {str(e)}")
             self.heads_dict = {}
@@ -61,13 +57,8 @@ class CreateJournalVoucherView(ttk.Frame):
     def load_banks(self):
         """Load heads from acc_head_of_accounts table"""
         try:
-            session = Session()
-            banks = BankAccount.get_banks()
-            print(f"Banks: {banks}")
-            # Create a dictionary of head names and IDs
-            self.bank_dict = {bank.bank_name: bank.id for bank in banks}
-            
-            session.close()
+            # Create a dictionary of bank names and IDs
+            self.bank_dict = {bank.bank_name: bank.id for bank in reference_data.banks()}
         except Exception as e:
             print(f"Error loading heads: {str(e)}")
             self.bank_dict = {}
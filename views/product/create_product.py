@@ -5,6 +5,7 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import StringVar, messagebox
 from utils.database import Session
+from utils import reference_data
 
 class CreateProductView(ttk.Frame):
     def __init__(self, parent, existing_product=None):
@@ -163,14 +164,10 @@ class CreateProductView(ttk.Frame):
 
     def load_units(self):
         try:
-            session = Session()
-            units = session.query(Unit).filter_by(status=1).all()
-            print('units',units)
-            
+            units = reference_data.units()
             unit_names = [unit.unit_name for unit in units]
             self.product_unit_combobox['values'] = unit_names
             self.unit_mapping = {unit.unit_name: str(unit.id) for unit in units}  # name -> id
-            session.close()
         except Exception as e:
             print(f"Error loading units: {str(e)}")
             ttk.dialogs.Messagebox.show_error(message=f"Error loading units: {str(e)}", title="Error", parent=self)
@@ -282,6 +279,7 @@ class CreateProductView(ttk.Frame):
                 message = "Product added successfully!"
             
             session.commit()
+            reference_data.refresh(reference_data.PRODUCTS)
             session.close()
 
             ttk.dialogs.Messagebox.show_info(message=message, title="Success", parent=self)
@@ -5,6 +5,7 @@ from ttkbootstrap.dialogs import Messagebox
 from models.category import Category
 from models.unit import Unit
 from utils.database import Session
+from utils import reference_data
 from views.category.create_category import CreateCategoryView
 from views.product.create_product import CreateProductView
 
@@ -189,6 +190,7 @@ class ProductListView(ttk.Frame):
                 if result == "Yes":
                     session.delete(product_to_delete)
                     session.commit()
+                    reference_data.refresh(reference_data.PRODUCTS)
                     self.load_products()
 
                     Messagebox.show_info(
@@ -6,8 +6,11 @@ from datetime import datetime
 from utils.database import Session
 from models.product_purchase import ProductPurchase
 from models.purchase_details import PurchaseDetails
+from controllers.sequence_controller import SequenceController, PURCHASE_NO
 from models.product import Product
 from models.shop_profile import ShopProfile
+from utils import reference_data
+from utils.keyset_pager import invalidate_counts
 
 class Purchase(ttk.Frame):
     def __init__(self, parent, existing_purchase=None):
@@ -241,16 +244,10 @@ class Purchase(ttk.Frame):
         self.grand_total.set(max(0, subtotal - discount))
 
     def load_product_list(self):
-        session = Session()
-        products = session.query(Product).all()
-        session.close()
-        self.product_mapping = {f"{p.name} (ID: {p.id})": p.id for p in products}
+        self.product_mapping = {f"{p.name} (ID: {p.id})": p.id for p in reference_data.products()}
 
     def load_shop_list(self):
-        session = Session()
-        shops = session.query(ShopProfile).all()
-        session.close()
-        self.shop_mapping = {f"{s.shop_name} (ID: {s.id})": s.id for s in shops}
+        self.shop_mapping = {f"{s.shop_name} (ID: {s.id})": s.id for s in reference_data.shops()}
 
     def set_shop_combobox_values(self):
         self.shop_combobox['values'] = list(self.shop_mapping.keys())
@@ -279,6 +276,7 @@ class Purchase(ttk.Frame):
             new_purchase = ProductPurchase(
                 shop_id=shop_id,
                 purchase_date=datetime.strptime(purchase_date, "%Y-%m-%d"),
+                purchase_no=SequenceController.next_number(PURCHASE_NO),
                 sub_total=subtotal,
                 discount=discount,
                 grand_total=grand_total,
@@ -308,7 +306,8 @@ class Purchase(ttk.Frame):
                 session.add(detail)
 
             session.commit()
-            Messagebox.show_info("Success", "Purchase saved successfully!", parent=self)
+            invalidate_counts("purchase_list")
+            Messagebox.show_info("Success", f"Purchase {new_purchase.purchase_no} saved successfully!", parent=self)
 
             # Clear form after successful submission
             self.clear_form()
@@ -8,17 +8,22 @@ from models.purchase_details import PurchaseDetails
 from models.product import Product
 from views.purchase.purchase_view import PurchaseShowView
 from datetime import datetime
+from sqlalchemy.orm import contains_eager
+from utils.keyset_pager import KeysetListView
+from controllers.stock_controller import SOURCE_PURCHASE, StockController
+from utils import reference_data
+
+class PurchaseListView(KeysetListView):
+    date_column = ProductPurchase.purchase_date
+    id_column = ProductPurchase.id
+    count_name = "purchase_list"
+    page_size = 10
 
-class PurchaseListView(ttk.Frame):
     def __init__(self, parent):
         super().__init__(parent, padding=10)
         self.parent = parent
         self.pack(fill="both", expand=True)
-        
-        # Pagination variables
-        self.current_page = 1
-        self.page_size = 10
-        self.total_records = 0
+        self.on_load_error = lambda e: Messagebox.show_error(f"Error loading purchases: {str(e)}", "Error", parent=self)
         
         # Create styles
         self.create_styles()
@@ -280,11 +285,7 @@ class PurchaseListView(ttk.Frame):
     def load_shops(self):
         """Load shops into the filter combobox"""
         try:
-            session = Session()
-            shops = session.query(ShopProfile).all()
-            session.close()
-            
-            shop_names = [f"{s.shop_name} (ID: {s.id})" for s in shops]
+            shop_names = [f"{s.shop_name} (ID: {s.id})" for s in reference_data.shops()]
             shop_names.insert(0, "All Shops")
             self.shop_cb["values"] = shop_names
             self.shop_cb.current(0)
@@ -293,123 +294,61 @@ class PurchaseListView(ttk.Frame):
             Messagebox.show_error(f"Error loading shops: {str(e)}", "Error", parent=self)
 
     def load_purchases(self):
-        """Load purchases from the database with filters"""
-        # Clear existing data
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        try:
-            session = Session()
-            
-            # Build query
-            query = session.query(ProductPurchase).join(ShopProfile)
-            
-            # Apply shop filter
-            selected_shop = self.shop_var.get()
-            if selected_shop and selected_shop != "All Shops":
-                shop_id = selected_shop.split("(ID: ")[1].rstrip(")")
-                query = query.filter(ProductPurchase.shop_id == shop_id)
-            
-            # Apply status filter
-            selected_status = self.status_var.get()
-            if selected_status != "All":
-                query = query.filter(ProductPurchase.status == selected_status)
-            
-            # Apply date range filter
-            from_date = self.from_date.entry.get()
-            to_date = self.to_date.entry.get()
-            
-            if from_date:
-                query = query.filter(ProductPurchase.purchase_date >= from_date)
-            if to_date:
-                query = query.filter(ProductPurchase.purchase_date <= to_date)
-            
-            # Get total count for pagination
-            self.total_records = query.count()
-            total_pages = max(1, (self.total_records + self.page_size - 1) // self.page_size)
-            
-            # Apply pagination
-            offset = (self.current_page - 1) * self.page_size
-            purchases = query.order_by(ProductPurchase.purchase_date.desc()) \
-                            .offset(offset) \
-                            .limit(self.page_size) \
-                            .all()
-            
-            # Populate treeview
-            for purchase in purchases:
-                shop = purchase.shop
-                shop_name = f"{shop.shop_name} (ID: {shop.id})" if shop else "N/A"
-                
-                status_style = ""
-                if purchase.status == "Approved":
-                    status_style = "Approved.TLabel"
-                elif purchase.status == "Rejected":
-                    status_style = "Rejected.TLabel"
-                else:
-                    status_style = "Pending.TLabel"
-                
-                self.tree.insert(
-                    "", 
-                    "end", 
-                    values=(
-                        purchase.id,
-                        shop_name,
-                        purchase.purchase_date.strftime("%Y-%m-%d"),
-                        f"₹{purchase.sub_total:.2f}",
-                        f"₹{purchase.discount:.2f}",
-                        f"₹{purchase.grand_total:.2f}",
-                        purchase.status
-                    ),
-                    tags=(purchase.id, status_style)
-                )
-                
-            session.close()
-            
-            # Apply tags for status styling
-            for item in self.tree.get_children():
-                tags = self.tree.item(item, "tags")
-                if tags and len(tags) > 1:
-                    self.tree.item(item, tags=tags)
-            
-            # Update pagination controls
-            self.update_pagination_controls(total_pages)
-            
-        except Exception as e:
-            Messagebox.show_error(f"Error loading purchases: {str(e)}", "Error", parent=self)
-    
-    def update_pagination_controls(self, total_pages):
-        """Update pagination buttons and label"""
-        # Update page label
-        self.page_label.config(text=f"Page {self.current_page} of {total_pages}")
-        
-        # Update button states
-        self.first_btn.config(state="normal" if self.current_page > 1 else "disabled")
-        self.prev_btn.config(state="normal" if self.current_page > 1 else "disabled")
-        self.next_btn.config(state="normal" if self.current_page < total_pages else "disabled")
-        self.last_btn.config(state="normal" if self.current_page < total_pages else "disabled")
-    
-    def change_page(self, page):
-        """Change to a specific page"""
-        if page != self.current_page:
-            self.current_page = page
-            self.load_purchases()
-    
-    def prev_page(self):
-        """Go to previous page"""
-        if self.current_page > 1:
-            self.change_page(self.current_page - 1)
-    
-    def next_page(self):
-        """Go to next page"""
-        # Calculate total pages
-        total_pages = max(1, (self.total_records + self.page_size - 1) // self.page_size)
-        if self.current_page < total_pages:
-            self.change_page(self.current_page + 1)
-    
-    def last_page(self):
-        """Go to last page"""
-        total_pages = max(1, (self.total_records + self.page_size - 1) // self.page_size)
-        self.change_page(total_pages)
+        """Load the first page of purchases with the current filters"""
+        self.reload()
+
+    def filter_values(self):
+        """Current shop, status and date range filters"""
+        shop_id = None
+        selected_shop = self.shop_var.get()
+        if selected_shop and selected_shop != "All Shops":
+            shop_id = selected_shop.split("(ID: ")[1].rstrip(")")
+        return shop_id, self.status_var.get(), self.from_date.entry.get(), self.to_date.entry.get()
+
+    def build_query(self, session, filters):
+        """Purchases matching the filters (runs on a worker thread)"""
+        shop_id, selected_status, from_date, to_date = filters
+        # The shop comes from the same join, not a lazy load per row in row_values
+        query = session.query(ProductPurchase).join(ShopProfile).options(contains_eager(ProductPurchase.shop))
+        
+        # Apply shop filter
+        if shop_id:
+            query = query.filter(ProductPurchase.shop_id == shop_id)
+        
+        # Apply status filter
+        if selected_status != "All":
+            query = query.filter(ProductPurchase.status == selected_status)
+        
+        # Apply date range filter
+        if from_date:
+            query = query.filter(ProductPurchase.purchase_date >= from_date)
+        if to_date:
+            query = query.filter(ProductPurchase.purchase_date <= to_date)
+        return query
+
+    def row_values(self, purchase):
+        """Treeview values and tags for one purchase (runs on a worker thread)"""
+        shop = purchase.shop
+        shop_name = f"{shop.shop_name} (ID: {shop.id})" if shop else "N/A"
+        
+        status_style = ""
+        if purchase.status == "Approved":
+            status_style = "Approved.TLabel"
+        elif purchase.status == "Rejected":
+            status_style = "Rejected.TLabel"
+        else:
+            status_style = "Pending.TLabel"
+        
+        values = (
+            purchase.id,
+            shop_name,
+            purchase.purchase_date.strftime("%Y-%m-%d"),
+            f"₹{purchase.sub_total:.2f}",
+            f"₹{purchase.discount:.2f}",
+            f"₹{purchase.grand_total:.2f}",
+            purchase.status
+        )
+        return values, (purchase.id, status_style)
     
     def on_selection_change(self, event):
         """Handle selection change in treeview"""
@@ -504,6 +443,9 @@ class PurchaseListView(ttk.Frame):
             
             if purchase:
                 purchase.status = statusInNumber
+                if statusInNumber == 1:
+                    # Approved purchases are received into stock
+                    StockController.record_purchase(session, purchase_id)
                 session.commit()
                 
                 # Update treeview
@@ -539,6 +481,8 @@ class PurchaseListView(ttk.Frame):
             purchase = session.query(ProductPurchase).get(purchase_id)
             
             if purchase:
+                StockController.remove_movements(session, SOURCE_PURCHASE, purchase_id)
+
                 # Delete associated purchase details first
                 session.query(PurchaseDetails).filter_by(purchase_id=purchase_id).delete()
                 
@@ -548,6 +492,7 @@ class PurchaseListView(ttk.Frame):
                 
                 # Remove from treeview
                 self.tree.delete(row_id)
+                self.invalidate_count()
                 
                 # Disable buttons since selection is gone
                 self.view_btn.config(state="disabled")
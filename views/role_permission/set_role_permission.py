@@ -2,8 +2,7 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from models.user_role import UserRole
 from utils.database import Session
-from models.url_top_menu import UrlTopMenu
-from models.url_sub_menu import UrlSubMenu
+from controllers.menu_controller import MenuController
 from models.business_role_content import BusinessRoleContent
 
 class SetRolePermissionView(ttk.Frame):
@@ -99,7 +98,7 @@ class SetRolePermissionView(ttk.Frame):
             width=15
         ).pack(side="left", padx=5)
 
-        top_menus = self.get_url_top_menu()
+        top_menus = self.get_menu_tree()
 
         # Create a canvas with scrollbar for the menu container
         canvas_frame = ttk.Frame(self)
@@ -142,8 +141,7 @@ class SetRolePermissionView(ttk.Frame):
                 bootstyle="dark").pack(anchor="w", pady=(0, 5))
             
             # Sub Menu
-            sub_menus = self.get_url_sub_menu(top_menu.id)
-            for sub_menu in sub_menus:
+            for sub_menu in top_menu.items:
                 check_var = ttk.BooleanVar(value=False)
                 # Store the checkbox variable with sub menu ID
                 self.checkbox_vars[sub_menu.id] = check_var
@@ -181,35 +179,14 @@ class SetRolePermissionView(ttk.Frame):
         session.close()
         return options
     
-    # Url SUb Menu2
-    def get_url_top_menu(self):
+    def get_menu_tree(self):
+        """Every top menu with its sub menus, whatever the role."""
         try:
-            print("dynamic menu called")
-            session = Session()
-            # top_menu = session.query(UrlTopMenu).all()
-            # print(f"top menu: {top_menu}")
-
-            menu_top = session.query(UrlTopMenu).order_by(UrlTopMenu.menu_order).all() 
-            session.close()
-            return menu_top
-            
-        except Exception:
-            print("somerhing goes wrong!")
-        
-    def get_url_sub_menu(self,id):
-        try:
-            print("dynamic menu called")
-            session = Session()
-            # top_menu = session.query(UrlTopMenu).all()
-            # print(f"top menu: {top_menu}")
+            return MenuController.menu_tree()
+        except Exception as e:
+            print(f"Error loading menu tree: {str(e)}")
+            return ()
 
-            menu_top = session.query(UrlSubMenu).filter_by(top_menu_id=id).all()
-            session.close()
-            return menu_top
-            
-        except Exception:
-            print("somerhing goes wrong!")
-    
     def on_role_selected(self, event):
         """Handle role selection change"""
         selected_role_name = self.role_combobox.get()
@@ -263,6 +240,8 @@ class SetRolePermissionView(ttk.Frame):
                 ))
             session.commit()
             session.close()
+            # Users of this role get the new menu on their next dashboard
+            MenuController.invalidate(selected_role_id)
             self.select_all_checkboxes(False)
             
             ttk.dialogs.Messagebox.show_info(
@@ -6,6 +6,7 @@ from models.shop_allocation import ShopAllocation
 from models.shop_profile import ShopProfile
 from models.shop_renter_profile import ShopRenterProfile
 from utils.database import Session
+from utils import reference_data
 
 
 class CreateShopAllocationView(ttk.Frame):
@@ -150,12 +151,9 @@ class CreateShopAllocationView(ttk.Frame):
     def populate_shop_profiles(self):
         """Populate the shop profile dropdown with available shops from the database."""
         try:
-            session = Session()
-            shops = session.query(ShopProfile).all()
-
             self.shop_profile_map.clear()
             shop_names = []
-            for shop in shops:
+            for shop in reference_data.shops():
                 display_name = f"{shop.shop_name} (Floor: {shop.floor_no}, No: {shop.shop_no})"
                 self.shop_profile_map[display_name] = shop.id
                 shop_names.append(display_name)
@@ -167,8 +165,6 @@ class CreateShopAllocationView(ttk.Frame):
                 self.shop_profile_id.set(self.shop_profile_map[shop_names[0]])  # Store ID
 
             self.shop_profile_dropdown.bind("<<ComboboxSelected>>", self.on_shop_profile_select)
-
-            session.close()
         except Exception as e:
             ttk.dialogs.Messagebox.show_error(message=f"Error fetching shop profiles: {str(e)}", title="Error", parent=self)
 
@@ -183,15 +179,12 @@ class CreateShopAllocationView(ttk.Frame):
     def populate_renter_profiles(self):
         """Populate the renter profile dropdown with available renters from the database."""
         try:
-            session = Session()
-            renters = session.query(ShopRenterProfile).all()
-            
             # Clear existing map
             self.renter_profile_map.clear()
             
             # Create renter names and populate map
             renter_names = []
-            for renter in renters:
+            for renter in reference_data.tenants():
                 # Create a unique display name
                 display_name = f"{renter.renter_name} (Phone: {renter.phone})"
                 self.renter_profile_map[display_name] = renter.id
@@ -207,8 +200,6 @@ class CreateShopAllocationView(ttk.Frame):
             
             # Bind selection event
             self.renter_profile_dropdown.bind("<<ComboboxSelected>>", self.on_renter_profile_select)
-
-            session.close()
         except Exception as e:
             ttk.dialogs.Messagebox.show_error(message=f"Error fetching renter profiles: {str(e)}", title="Error", parent=self)
 
@@ -9,6 +9,7 @@ import threading
 import os
 
 from utils.image_uploader import file_to_base64
+from utils import reference_data
 
 class CreateShopRenterView(ttk.Frame):
     def __init__(self, parent, existing_renter=None):
@@ -196,6 +197,7 @@ class CreateShopRenterView(ttk.Frame):
                 message = "Shop renter added successfully!"
             
             session.commit()
+            reference_data.refresh(reference_data.TENANTS)
             session.close()
 
             ttk.dialogs.Messagebox.show_info(message=message, title="Success", parent=self)
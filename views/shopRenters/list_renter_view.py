@@ -2,6 +2,8 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from models.shop_renter_profile import ShopRenterProfile
 from utils.database import Session
+from utils.virtual_tree import VirtualTreeview, FilterBar
+from utils import reference_data
 from views.shopRenters.create_renter_view import CreateShopRenterView
 
 
@@ -16,13 +18,46 @@ class ShopRenterListView(ttk.Frame):
         columns = ("ID", "Renter Name", "Email", "Phone", "Active Status", "Actions")
         
         # Create the Treeview widget
-        self.tree = ttk.Treeview(
+        self.tree = VirtualTreeview(
             self,
+            query_fn=lambda session: session.query(
+                ShopRenterProfile.id,
+                ShopRenterProfile.renter_name,
+                ShopRenterProfile.email,
+                ShopRenterProfile.phone,
+                ShopRenterProfile.active_status
+            ),
+            row_values=lambda renter: (
+                renter.id,
+                renter.renter_name,
+                renter.email,
+                renter.phone,
+                "Active" if renter.active_status == 1 else "Inactive",
+                "Edit | Delete"
+            ),
+            sort_columns={
+                "ID": ShopRenterProfile.id,
+                "Renter Name": ShopRenterProfile.renter_name,
+                "Email": ShopRenterProfile.email,
+                "Phone": ShopRenterProfile.phone,
+                "Active Status": ShopRenterProfile.active_status,
+            },
+            filter_columns={
+                "Renter Name": ShopRenterProfile.renter_name,
+                "Email": ShopRenterProfile.email,
+                "Phone": ShopRenterProfile.phone,
+            },
+            order_by=(ShopRenterProfile.id,),
             bootstyle="primary",
             columns=columns,
             show="headings",
             height=15
         )
+        self.tree.on_error = lambda e: ttk.dialogs.Messagebox.show_error(
+            message=f"Error loading shop renters: {str(e)}",
+            title="Error",
+            parent=self
+        )
 
         # Configure the columns
         self.tree.heading("ID", text="ID")
@@ -58,6 +93,7 @@ class ShopRenterListView(ttk.Frame):
         self.tree.configure(xscrollcommand=xscrollbar.set)
 
         # Pack widgets
+        FilterBar(self, self.tree).pack(side="top", fill="x", pady=(0, 5))
         self.tree.pack(side="top", fill="both", expand=True)
         yscrollbar.pack(side="right", fill="y")
         xscrollbar.pack(side="bottom", fill="x")
@@ -73,39 +109,8 @@ class ShopRenterListView(ttk.Frame):
 
 
     def load_renters(self):
-        """Loads the shop renters from the database and displays them in the Treeview."""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        try:
-            session = Session()
-            renters = session.query(ShopRenterProfile).all()
-
-            for renter in renters:
-                active_status = "Active" if renter.active_status == 1 else "Inactive"
-                # Insert renter data into the Treeview
-                self.tree.insert(
-                    "",
-                    "end",
-                    values=(
-                        renter.id,
-                        renter.renter_name,
-                        renter.email,
-                        renter.phone,
-                        active_status,
-                        "Edit | Delete"
-                    )
-                )
-
-            session.close()
-
-        except Exception as e:
-            ttk.dialogs.Messagebox.show_error(
-                message=f"Error loading shop renters: {str(e)}",
-                title="Error",
-                parent=self
-            )
+        """Reloads the shop renters a page at a time into the Treeview."""
+        self.tree.reload()
 
     def on_double_click(self, event):
         """Handle double-click event to edit renter."""
@@ -177,6 +182,7 @@ class ShopRenterListView(ttk.Frame):
                 if renter:
                     session.delete(renter)
                     session.commit()
+                    reference_data.refresh(reference_data.TENANTS)
                     session.close()
 
                     # Reload the list
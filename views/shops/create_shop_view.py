@@ -3,6 +3,7 @@ from ttkbootstrap.constants import *
 from models.shop_profile import ShopProfile
 from models.shop_owner_profile import ShopOwnerProfile  # Assuming you have this model
 from utils.database import Session
+from utils import reference_data
 from ttkbootstrap.dialogs import Messagebox
 
 
@@ -342,6 +343,7 @@ class CreateShopView(ttk.Frame):
                 session.add(new_shop)
             
             session.commit()
+            reference_data.refresh(reference_data.SHOPS)
             session.close()
             
             if self.existing_shop:
@@ -4,6 +4,8 @@ from ttkbootstrap.dialogs import Messagebox
 from models.shop_profile import ShopProfile
 from models.shop_owner_profile import ShopOwnerProfile
 from utils.database import Session
+from utils.virtual_tree import VirtualTreeview, FilterBar
+from utils import reference_data
 from views.shops.create_shop_view import CreateShopView
 import tkinter as tk
 
@@ -38,13 +40,47 @@ class ListShopView(ttk.Frame):
             "Status",
             "Elect Demand Charge"
         )
-        self.tree = ttk.Treeview(
+        self.tree = VirtualTreeview(
             self,
+            query_fn=lambda session: session.query(ShopProfile),
+            row_values=lambda shop: (
+                shop.id,
+                shop.shop_name,
+                shop.floor_no,
+                shop.shop_no,
+                shop.descreption,
+                shop.rent_amount,
+                shop.rent_type,
+                shop.active_status,
+                shop.elect_demand_chrge
+            ),
+            row_tags=lambda shop: (shop.id,),  # Store shop ID in tag
+            sort_columns={
+                "ID": ShopProfile.id,
+                "Shop Name": ShopProfile.shop_name,
+                "Shop Number": ShopProfile.floor_no,
+                "Floor Number": ShopProfile.shop_no,
+                "Rent Amount": ShopProfile.rent_amount,
+                "Shop Type": ShopProfile.rent_type,
+                "Status": ShopProfile.active_status,
+            },
+            filter_columns={
+                "Shop Name": ShopProfile.shop_name,
+                "Shop Number": ShopProfile.floor_no,
+                "Floor Number": ShopProfile.shop_no,
+                "Shop Type": ShopProfile.rent_type,
+            },
+            order_by=(ShopProfile.id,),
             bootstyle="primary",
             columns=columns,
             show="headings",
             height=15
         )
+        self.tree.on_error = lambda e: ttk.dialogs.Messagebox.show_error(
+            message=f"Error loading shops: {str(e)}",
+            title="Error",
+            parent=self
+        )
 
         # Configure columns
         for col in columns:
@@ -70,6 +106,7 @@ class ListShopView(ttk.Frame):
         self.tree.configure(xscrollcommand=xscrollbar.set)
 
         # Pack widgets
+        FilterBar(self, self.tree).pack(side="top", fill="x", pady=(0, 5))
         self.tree.pack(side="top", fill="both", expand=True)
         yscrollbar.pack(side="right", fill="y")
         xscrollbar.pack(side="bottom", fill="x")
@@ -212,6 +249,7 @@ class ListShopView(ttk.Frame):
 
             session.delete(shop)
             session.commit()
+            reference_data.refresh(reference_data.SHOPS)
             session.close()
 
             # Refresh the list
@@ -245,45 +283,12 @@ class ListShopView(ttk.Frame):
         )
 
     def load_shops(self):
-        """Load shops from database and populate Treeview."""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        try:
-            session = Session()
-            shops = session.query(ShopProfile).all()
-
-            for shop in shops:
-                item = self.tree.insert(
-                    "",
-                    "end",
-                    values=(
-                        shop.id,
-                        shop.shop_name,
-                        shop.floor_no,
-                        shop.shop_no,
-                        shop.descreption,
-                        shop.rent_amount,
-                        shop.rent_type,
-                        shop.active_status,
-                        shop.elect_demand_chrge
-                    )
-                )
-                self.tree.item(item, tags=(shop.id,))  # Store shop ID in tag
+        """Reload shops a page at a time into the Treeview."""
+        self.tree.reload()
 
-            session.close()
-
-            # Bind click events
-            self.tree.bind("<Button-1>", self.on_item_click)
-            self.tree.bind("<Double-1>", self.on_item_double_click)
-
-        except Exception as e:
-            ttk.dialogs.Messagebox.show_error(
-                message=f"Error loading shops: {str(e)}",
-                title="Error",
-                parent=self
-            )
+        # Bind click events
+        self.tree.bind("<Button-1>", self.on_item_click)
+        self.tree.bind("<Double-1>", self.on_item_double_click)
 
     def on_item_double_click(self, event):
         """Open CreateShopView with data when clicking on Edit."""
@@ -341,6 +346,7 @@ class ListShopView(ttk.Frame):
                 if result == "Yes":
                     session.delete(shop_to_delete)
                     session.commit()
+                    reference_data.refresh(reference_data.SHOPS)
                     
                     # Refresh shop list
                     self.load_shops()
@@ -377,6 +383,7 @@ class ListShopView(ttk.Frame):
                 if shop_to_delete:
                     session.delete(shop_to_delete)
                     session.commit()
+                    reference_data.refresh(reference_data.SHOPS)
                     
                     # Refresh shop list
                     self.load_shops()
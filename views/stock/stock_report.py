@@ -0,0 +1,113 @@
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from ttkbootstrap.dialogs import Messagebox
+from datetime import date, datetime
+from controllers.stock_controller import StockController
+from utils.query_executor import run_in_background
+
+
+class StockReportView(ttk.Frame):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+
+        # Configure styles
+        style = ttk.Style()
+        style.configure("TFrame", background="white")
+        style.configure("TLabel", background="white")
+        style.configure("TButton", font=("Helvetica", 10))
+
+        self.main_container = ttk.Frame(self)
+        self.main_container.pack(fill="both", expand=True, anchor="n")
+
+        self.create_form()
+
+    def create_form(self):
+        """Creates the stock report form."""
+        form_frame = ttk.Frame(self.main_container)
+        form_frame.pack(fill="x", pady=(10, 0), anchor="n")
+
+        ttk.Label(
+            form_frame,
+            text="Stock Report",
+            font=("Helvetica", 16, "bold"),
+            bootstyle="primary"
+        ).pack(pady=(0, 10), anchor="center")
+
+        input_row = ttk.Frame(form_frame)
+        input_row.pack(padx=10)
+
+        label_style = {"bootstyle": "primary", "font": ("Helvetica", 10)}
+
+        ttk.Label(input_row, text="From Date:", **label_style).grid(row=0, column=0, padx=5, pady=(0, 2), sticky="w")
+        self.from_date_picker = ttk.DateEntry(
+            input_row, dateformat="%Y-%m-%d", firstweekday=6, bootstyle="primary", width=20,
+            startdate=date.today().replace(day=1)
+        )
+        self.from_date_picker.grid(row=1, column=0, padx=5, pady=(0, 10), sticky="w")
+
+        ttk.Label(input_row, text="To Date:", **label_style).grid(row=0, column=1, padx=5, pady=(0, 2), sticky="w")
+        self.to_date_picker = ttk.DateEntry(
+            input_row, dateformat="%Y-%m-%d", firstweekday=6, bootstyle="primary", width=20
+        )
+        self.to_date_picker.grid(row=1, column=1, padx=5, pady=(0, 10), sticky="w")
+
+        self.search_button = ttk.Button(
+            form_frame,
+            text="Search",
+            command=self.search_stock,
+            bootstyle="primary-outline",
+            width=20
+        )
+        self.search_button.pack(pady=(0, 10), anchor="center")
+
+        # Report table
+        table_frame = ttk.Frame(self.main_container)
+        table_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        columns = ("sl", "product", "unit", "opening", "received", "issued", "closing")
+        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=15, bootstyle="primary")
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        widths = {"sl": 50, "product": 220, "unit": 80}
+        for col in columns:
+            self.tree.heading(col, text=col.capitalize())
+            self.tree.column(col, width=widths.get(col, 90), anchor="w" if col == "product" else "center")
+
+        self.search_stock()
+
+    def search_stock(self):
+        try:
+            from_date = datetime.strptime(self.from_date_picker.entry.get(), "%Y-%m-%d").date()
+            to_date = datetime.strptime(self.to_date_picker.entry.get(), "%Y-%m-%d").date()
+        except ValueError:
+            Messagebox.show_error(message="Please pick valid dates.", title="Error", parent=self)
+            return
+        if from_date > to_date:
+            Messagebox.show_error(message="From Date is after To Date.", title="Error", parent=self)
+            return
+
+        def fetch(session):
+            # Close any finished months first so the report reads snapshots
+            StockController.ensure_snapshots(to_date)
+            return StockController.stock_report(session, from_date, to_date)
+
+        self.search_button.config(state="disabled")
+        run_in_background(self, fetch, self.render_report, self.on_search_failed)
+
+    def on_search_failed(self, error):
+        self.search_button.config(state="normal")
+        Messagebox.show_error(message=f"Error loading stock report: {str(error)}", title="Error", parent=self)
+
+    def render_report(self, rows):
+        self.search_button.config(state="normal")
+        self.tree.delete(*self.tree.get_children())
+        totals = [0, 0, 0, 0]
+        for i, (product_id, name, unit_name, opening, received, issued, closing) in enumerate(rows, start=1):
+            self.tree.insert("", "end", values=(i, name, unit_name, opening, received, issued, closing))
+            for index, value in enumerate((opening, received, issued, closing)):
+                totals[index] += value
+        self.tree.insert("", "end", values=("", "Total", "", *totals))
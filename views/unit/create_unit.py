@@ -3,6 +3,7 @@ from ttkbootstrap.constants import *
 from tkinter import StringVar, messagebox
 from models.unit import Unit
 from utils.database import Session
+from utils import reference_data
 
 class CreateUnitView(ttk.Frame):
     def __init__(self, parent, existing_unit=None):
@@ -116,6 +117,7 @@ class CreateUnitView(ttk.Frame):
                 message = "Unit added successfully!"
             
             session.commit()
+            reference_data.refresh(reference_data.UNITS)
             session.close()
 
             ttk.dialogs.Messagebox.show_info(message=message, title="Success", parent=self)
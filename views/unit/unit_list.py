@@ -3,6 +3,7 @@ from ttkbootstrap.constants import *
 from ttkbootstrap.dialogs import Messagebox
 from models.unit import Unit
 from utils.database import Session
+from utils import reference_data
 from views.unit.create_unit import CreateUnitView
 
 
@@ -172,6 +173,7 @@ class UnitListView(ttk.Frame):
                 if result == "Yes":
                     session.delete(unit_to_delete)
                     session.commit()
+                    reference_data.refresh(reference_data.UNITS)
                     self.load_units()
 
                     Messagebox.show_info(
@@ -376,12 +376,13 @@ class CreateUserView(ttk.Frame):
                 phone=phone,
                 password=hashed_password,
                 role_id=role.id,
-                avatar=self.avatar_bytes if hasattr(self, 'avatar_bytes') else None,
                 ptext=password,  # Store plaintext password temporarily
                 created_by=current_user_id,  # Set created by logged in user
                 update_by=None,
                 active_status=1
             )
+            if getattr(self, 'avatar_bytes', None):
+                new_user.set_avatar(self.avatar_bytes)  # also makes the list thumbnail
             
             session.add(new_user)
             session.commit()
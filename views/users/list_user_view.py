@@ -1,7 +1,10 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from models.user import User
+from models.user_role import UserRole
 from utils.database import Session
+from utils.virtual_tree import VirtualTreeview, FilterBar
+from utils.avatar_cache import get_avatar_photo, invalidate_avatar
 import io
 from PIL import Image, ImageTk
 import tkinter as tk
@@ -326,6 +329,7 @@ class UserOptionsDialog(tk.Toplevel):
                 
                 # Commit changes
                 session.commit()
+                invalidate_avatar(self.user.id)
                 
                 ttk.dialogs.Messagebox.show_info("User updated successfully!", title="Success")
                 edit_window.destroy()
@@ -366,8 +370,8 @@ class UserOptionsDialog(tk.Toplevel):
                     messagebox.showerror("Error", "Avatar file is too large. Maximum size is 5MB.")
                     return
                 
-                # Update user's avatar
-                self.user.avatar = avatar_bytes
+                # Update user's avatar and its list thumbnail
+                self.user.set_avatar(avatar_bytes)
                 
                 # Display new avatar
                 image = Image.open(io.BytesIO(avatar_bytes))
@@ -475,6 +479,8 @@ class ListUserView(ttk.Frame):
         style.configure("TButton", font=("Helvetica", 10))
         style.configure("Treeview", font=("Helvetica", 10))
         style.configure("Treeview.Heading", font=("Helvetica", 10, "bold"))
+        # Rows tall enough for the 32px avatar thumbnails
+        style.configure("UserList.Treeview", font=("Helvetica", 10), rowheight=36)
         
         # Create user list
         self.create_user_list()
@@ -482,33 +488,68 @@ class ListUserView(ttk.Frame):
     def create_user_list(self):
         """Creates the user list view."""
         # Create treeview with comprehensive columns
-        columns = ("Serial", "Username", "Full Name", "Email", "Phone", "Avatar", "Role", "Status")
-        self.tree = ttk.Treeview(
+        # The avatar thumbnail is the row image, shown in the tree column (#0)
+        columns = ("ID", "Username", "Full Name", "Email", "Phone", "Role", "Status")
+        self.tree = VirtualTreeview(
             self,
+            query_fn=self.fetch_users,
+            row_values=lambda user: (
+                user.id,
+                user.login_id,
+                user.usr_full_name,
+                user.email,
+                user.phone,
+                user.role_name or "No Role",
+                "Active" if user.active_status == 1 else "Inactive"
+            ),
+            sort_columns={
+                "ID": User.id,
+                "Username": User.login_id,
+                "Full Name": User.usr_full_name,
+                "Email": User.email,
+                "Role": UserRole.name,
+                "Status": User.active_status,
+            },
+            filter_columns={
+                "Username": User.login_id,
+                "Full Name": User.usr_full_name,
+                "Email": User.email,
+                "Phone": User.phone,
+                "Role": UserRole.name,
+            },
+            order_by=(User.id,),
+            row_image=lambda user: (user.id, user.avatar_hash, user.avatar_thumb) if user.avatar_hash else None,
+            image_loader=lambda data: get_avatar_photo(*data),
             bootstyle="dark",
             columns=columns,
-            show="headings",
-            height=15
+            show=("tree", "headings"),
+            height=15,
+            style="UserList.Treeview"
+        )
+        self.tree.on_error = lambda e: ttk.dialogs.Messagebox.show_error(
+            message=f"Error loading users: {str(e)}",
+            title="Error",
+            parent=self
         )
         
         # Configure columns
-        self.tree.heading("Serial", text="Serial")
+        self.tree.heading("#0", text="Avatar")
+        self.tree.column("#0", width=50, stretch=False, anchor="center")
+        self.tree.heading("ID", text="ID")
         self.tree.heading("Username", text="Username")
         self.tree.heading("Full Name", text="Full Name")
         self.tree.heading("Email", text="Email")
         self.tree.heading("Phone", text="Phone")
-        self.tree.heading("Avatar", text="Avatar")
         self.tree.heading("Role", text="Role")
         self.tree.heading("Status", text="Status")
         
         # Column widths and alignments
         column_widths = {
-            "Serial": 50,
+            "ID": 50,
             "Username": 100,
             "Full Name": 150,
             "Email": 200,
             "Phone": 120,
-            "Avatar": 100,
             "Role": 100,
             "Status": 80
         }
@@ -526,6 +567,7 @@ class ListUserView(ttk.Frame):
         self.tree.configure(yscrollcommand=scrollbar.set)
         
         # Pack widgets
+        FilterBar(self, self.tree).pack(side="top", fill="x", pady=(0, 5))
         self.tree.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
@@ -570,65 +612,20 @@ class ListUserView(ttk.Frame):
         except Exception as e:
             ttk.dialogs.Messagebox.show_error(f"Error loading user: {str(e)}", title="Error")
     
+    def fetch_users(self, session):
+        """Users with their role name and stored thumbnail, never the avatar itself (runs on a worker thread)."""
+        return session.query(
+            User.id,
+            User.login_id,
+            User.usr_full_name,
+            User.email,
+            User.phone,
+            User.avatar_hash,
+            User.avatar_thumb,
+            UserRole.name.label("role_name"),
+            User.active_status
+        ).outerjoin(UserRole, UserRole.id == User.role_id).where(User.id != 1)
+
     def load_users(self):
-        """Load users from database."""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        try:
-            session = Session()
-            users = session.query(User).where(User.id !=1).all()
-            
-            # Store references to prevent garbage collection
-            self.avatar_images = []
-            
-            for index, user in enumerate(users, 1):
-                # Process avatar
-                avatar_photo = None
-                if user.avatar:
-                    try:
-                        # Convert bytes to PIL Image
-                        image = Image.open(io.BytesIO(user.avatar))
-                        
-                        # Resize image to fit in the column
-                        image.thumbnail((80, 80), Image.LANCZOS)
-                        
-                        # Convert to PhotoImage
-                        avatar_photo = ImageTk.PhotoImage(image)
-                        self.avatar_images.append(avatar_photo)
-                    except Exception:
-                        avatar_photo = None
-                
-                # Determine status text
-                status_text = "Active" if user.active_status == 1 else "Inactive"
-                
-                # Insert row
-                item = self.tree.insert(
-                    "",
-                    "end",
-                    values=(
-                        index, 
-                        user.login_id,
-                        user.usr_full_name,
-                        user.email,
-                        user.phone,
-                        user.avatar,
-                        user.role.name if user.role else "No Role",
-                        status_text
-                    )
-                )
-                
-                # Add avatar image if available
-                if avatar_photo:
-                    self.tree.set(item, "Avatar", "")
-                    self.tree.item(item, image=avatar_photo)
-            
-            session.close()
-            
-        except Exception as e:
-            ttk.dialogs.Messagebox.show_error(
-                message=f"Error loading users: {str(e)}",
-                title="Error",
-                parent=self
-            )
+        """Reload users a page at a time from the database."""
+        self.tree.reload()
@@ -163,6 +163,8 @@ class CreateUtilitySettingView(ttk.Frame):
             
             session.commit()
             session.close()
+            # Billing reads tariffs from memory; drop them once the change is committed.
+            UtilitySetting.invalidate_tariffs()
 
             ttk.dialogs.Messagebox.show_info(message=message, title="Success", parent=self)
             self.clear_form()